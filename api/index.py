@@ -15,10 +15,12 @@ except ImportError:
     pass
 
 from api.utils import get_yaml_data, invalidate_cache, CACHE, get_cached_data
-from api.utils.auth import require_auth
+from api.utils.auth import require_auth, get_auth_cache_stats
+from api.utils.tracing import init_app as init_tracing
 
 app = Flask(__name__)
 CORS(app) # Enable CORS for all routes
+init_tracing(app) # Server-Timing + slow-request log for Supabase queries
 
 # Import Blueprints
 from api.routes.status import status_bp
@@ -57,14 +59,27 @@ def handle_exception(e):
 def health_check():
     return jsonify({"status": "healthy", "version": "2.0.1"})
 
+@app.route("/api/metrics")
+def metrics_endpoint():
+    # Optional bearer token so the scrape endpoint isn't public
+    token = os.environ.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    from api.utils.metrics import render
+    return render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
 @app.route("/api/debug")
 def debug_info():
-    from api.utils.storage import SUPABASE_URL, SUPABASE_SERVICE_KEY, supabase, init_error
+    from api.utils.storage import SUPABASE_URL, SUPABASE_SERVICE_KEY, SUPABASE_BACKEND, supabase, init_error
+    from api.utils.http_transport import get_pool_stats
     return jsonify({
+        "backend": SUPABASE_BACKEND,
         "url_configured": bool(SUPABASE_URL),
         "key_configured": bool(SUPABASE_SERVICE_KEY),
         "client_initialized": bool(supabase),
         "init_error": init_error,
+        "http_pool": supabase.stats() if SUPABASE_BACKEND == 'fake' else get_pool_stats(),
+        "auth_cache": get_auth_cache_stats(),
         "environment": os.environ.get('VERCEL_ENV', 'unknown'),
         "python_version": sys.version
     })
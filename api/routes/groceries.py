@@ -128,10 +128,11 @@ def smart_action():
                 # TD-001: Infer category instead of hardcoding pantry
                 category = GroceryMapper.infer_category(item)
                 
-                storage.StorageEngine.update_inventory_item(category, item, {
-                    'quantity': 1,
-                    'unit': 'count'
-                })
+                storage.StorageEngine.bulk_upsert_inventory([{
+                    'category': category,
+                    'item': item,
+                    'updates': {'quantity': 1, 'unit': 'count'}
+                }])
                 invalidate_cache()
                 return jsonify({"status": "success", "message": f"Item added to {category}"})
             except Exception as e:
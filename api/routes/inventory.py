@@ -76,6 +76,7 @@ def bulk_add_inventory():
         if not items:
             return jsonify({"status": "error", "message": "No items provided"}), 400
             
+        batch = []
         for entry in items:
             category = entry.get('category')
             item = entry.get('item')
@@ -97,8 +98,9 @@ def bulk_add_inventory():
                 if 'added' not in updates:
                     updates['added'] = datetime.now().strftime('%Y-%m-%d')
                 
-            StorageEngine.update_inventory_item(db_category, item, updates)
+            batch.append({'category': db_category, 'item': item, 'updates': updates})
             
+        StorageEngine.bulk_upsert_inventory(batch)
         invalidate_cache('inventory')
         return jsonify({"status": "success", "inventory": StorageEngine.get_inventory()})
     except Exception as e:
@@ -118,6 +120,7 @@ def bulk_update_inventory():
         if not changes:
              return jsonify({"status": "error", "message": "No changes provided"}), 400
 
+        batch = []
         for change in changes:
             category = change.get('category')
             item = change.get('item')
@@ -128,7 +131,7 @@ def bulk_update_inventory():
             elif category == 'frozen_ingredient': db_category = 'freezer_ingredient'
             
             if op == 'remove':
-                StorageEngine.update_inventory_item(db_category, item, delete=True)
+                batch.append({'category': db_category, 'item': item, 'delete': True})
             elif op == 'add':
                 updates = {}
                 # Preserve type and other metadata if sent
@@ -143,8 +146,9 @@ def bulk_update_inventory():
                     if 'quantity' not in updates: updates['quantity'] = 4
                     updates['frozen_date'] = datetime.now().strftime('%Y-%m-%d')
                 
-                StorageEngine.update_inventory_item(db_category, item, updates=updates)
+                batch.append({'category': db_category, 'item': item, 'updates': updates})
 
+        StorageEngine.bulk_upsert_inventory(batch)
         invalidate_cache('inventory')
         return jsonify({"status": "success", "inventory": StorageEngine.get_inventory()})
     except Exception as e:
@@ -1,3 +1,4 @@
+import copy
 import os
 import yaml
 from pathlib import Path
@@ -11,7 +12,17 @@ from api.utils import storage, invalidate_cache
 from api.utils.auth import require_auth
 from scripts import log_execution
 # TD-009: Import extracted service functions
-from api.services.pairing_service import get_paired_suggestions
+from api.services.pairing_service import PairingIndex, get_pairing_index
+from api.services.draft_cache import draft_cache, draft_key
+from api.services.planning_service import (
+    RECENT_RECIPE_WEEKS,
+    PROPOSAL_WEEKS,
+    weeks_before,
+    apply_draft_choices,
+    draft_history,
+    merge_history_week,
+)
+from api.services.pregeneration import proposal_key, provisional_draft_key, take_provisional
 from api.services.meal_service import (
     parse_made_status,
     find_or_create_dinner,
@@ -27,21 +38,27 @@ meals_bp = Blueprint('meals', __name__)
 @require_auth
 def get_paired_recipes_route():
     try:
+        # Single main (?main_id=) or a batch (?main_ids=a,b,c) for the draft wizard
         main_id = request.args.get('main_id')
-        if not main_id or not isinstance(main_id, str):
+        main_ids = [m.strip() for m in request.args.get('main_ids', '').split(',') if m.strip()]
+        if not main_id and not main_ids:
             return jsonify({"status": "error", "message": "Valid main_id required"}), 400
-            
+
         try:
-            history = storage.StorageEngine.get_history()
+            index = get_pairing_index()
         except Exception as e:
-            print(f"Error fetching history: {e}")
-            history = []
-            
-        suggestions = get_paired_suggestions(main_id, history)
-        
+            print(f"Error building pairing index: {e}")
+            index = PairingIndex()
+
+        if main_ids:
+            return jsonify({
+                "status": "success",
+                "pairings": index.top_many(main_ids)
+            })
+
         return jsonify({
             "status": "success",
-            "suggestions": suggestions
+            "suggestions": index.top(main_id)
         })
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -61,18 +78,12 @@ def generate_plan_route():
         week_str = active_plan['week_of']
         data = active_plan['plan_data']
         
-        # 1. Fetch contexts from DB
-        history = storage.StorageEngine.get_history()
+        # 1. Fetch contexts from DB (the recent weeks before this one, plus this week)
+        history = merge_history_week(
+            storage.StorageEngine.get_history(since=weeks_before(week_str, RECENT_RECIPE_WEEKS), before=week_str),
+            week_str, active_plan.get('history_data') or {'week_of': week_str, 'dinners': []})
         # We need the full recipe details for generation (with main_veg, etc.)
-        query = storage.supabase.table("recipes").select("id, name, metadata").eq("household_id", h_id)
-        all_recipes_res = storage.execute_with_retry(query)
-        all_recipes = [
-            {
-                "id": r['id'],
-                "name": r['name'],
-                **(r.get('metadata') or {})
-            } for r in all_recipes_res.data
-        ]
+        all_recipes = storage.StorageEngine.get_recipe_catalog()
         
         # 2. Run Database-First Generation Logic
         # We still pass data directly. input_file=None means skip file writing.
@@ -110,15 +121,30 @@ def generate_plan_route():
             "message": f"Failed to generate plan: {str(e)}"
         }), 500
 
+def _cache_draft(h_id, week_of, data, key, history, live_inventory, new_plan_data, current_history_week):
+    """Cache a draft under `key`, the key of the inputs it was generated from (`history` is left as is)."""
+    draft_cache.set(key, new_plan_data, current_history_week)
+    # Resubmitting the same step starts from the draft just saved; those
+    # inputs regenerate this same draft, so store it under their key too
+    if current_history_week:
+        next_week = copy.deepcopy(current_history_week)
+        apply_draft_choices(next_week, data)
+        # What draft_history will return next time: the saved week, merged
+        next_history = copy.deepcopy(history)
+        next_history['weeks'] = [copy.deepcopy(current_history_week) if w.get('week_of') == week_of else w
+                                 for w in next_history.get('weeks', [])]
+        next_history = merge_history_week(next_history, week_of, next_week)
+        draft_cache.set(
+            draft_key(h_id, week_of, new_plan_data, next_history, storage.get_catalog_fingerprint(),
+                      live_inventory, data.get('exclude_defaults')),
+            new_plan_data, current_history_week)
+
 @meals_bp.route("/api/plan/draft", methods=["POST"])
 @require_auth
 def generate_draft_route():
     try:
         data = request.json or {}
         week_of = data.get('week_of')
-        locked_days = data.get('locked_days', [])
-        selections = data.get('selections', [])
-        leftover_assignments = data.get('leftovers', [])
         
         h_id = storage.get_household_id()
         
@@ -130,109 +156,48 @@ def generate_draft_route():
         
         active_plan = res.data[0]
         plan_data = active_plan['plan_data']
-        history_week = active_plan['history_data'] or {'week_of': week_of, 'dinners': [], 'lunches': {}, 'snacks': {}}
-        
-        # 1b. Selective Replanning: Clear unlocked days from history
-        if 'locked_days' in data:
-            current_dinners = history_week.get('dinners', [])
-            history_week['dinners'] = [d for d in current_dinners if d.get('day') in locked_days]
-
-        # 2. Apply manual selections to history_week
-        # This ensures the generation logic respects these choices
-        days_covered = set()
-        for selection in selections:
-            day = selection.get('day')
-            recipe_id = selection.get('recipe_id')
-            slot = selection.get('slot', 'dinner')
-            recipe_ids = selection.get('recipe_ids')
-            
-            if not day or (not recipe_id and not recipe_ids): continue
-            
-            ids = recipe_ids or [recipe_id]
-            day_abbr = day.lower()[:3]
-            days_covered.add(day_abbr)
-            
-            if slot == 'dinner':
-                # Find and update or add
-                found = False
-                for dinner in history_week.get('dinners', []):
-                    if dinner.get('day') == day_abbr:
-                        dinner['recipe_ids'] = ids
-                        found = True
-                        break
-                if not found:
-                    history_week.setdefault('dinners', []).append({
-                        'day': day_abbr,
-                        'recipe_ids': ids
-                    })
-            elif slot == 'lunch':
-                history_week.setdefault('lunches', {})
-                history_week['lunches'][day_abbr] = {
-                    'recipe_ids': ids,
-                    'recipe_name': selection.get('recipe_name') or (recipe_id.replace('_', ' ').title() if recipe_id else "Multiple Recipes"),
-                    'prep_style': 'manual'
-                }
-            elif slot in ['school_snack', 'home_snack']:
-                history_week.setdefault('snacks', {}).setdefault(day_abbr, {})
-                history_week['snacks'][day_abbr][slot] = selection.get('recipe_name') or recipe_id.replace('_', ' ').title()
-
-        # Apply explicit leftover assignments
-        for assignment in leftover_assignments:
-            day = assignment.get('day', '').lower()[:3]
-            slot = assignment.get('slot', '').lower()
-            item = assignment.get('item', '')
-            if not day or not item: continue
-
-            recipe_id = f"leftover:{item}"
-            
-            if slot == 'dinner':
-                found = False
-                for dinner in history_week.get('dinners', []):
-                    if dinner.get('day') == day:
-                        dinner['recipe_ids'] = [recipe_id]
-                        found = True
-                        break
-                if not found:
-                    history_week.setdefault('dinners', []).append({'day': day, 'recipe_ids': [recipe_id]})
-            elif slot == 'lunch':
-                history_week.setdefault('lunches', {})
-                history_week['lunches'][day] = {
-                    'recipe_ids': [recipe_id],
-                    'recipe_name': item,
-                    'prep_style': 'leftovers'
-                }
-
-        # 3. Fetch all contexts for generation
-        history = storage.StorageEngine.get_history()
-        # Ensure the current history week in the full history object is also updated
-        updated_any = False
-        for w in history.get('weeks', []):
-            if w.get('week_of') == week_of:
-                w['dinners'] = history_week.get('dinners', [])
-                w['lunches'] = history_week.get('lunches', {})
-                w['snacks'] = history_week.get('snacks', {})
-                updated_any = True
-                break
-        if not updated_any:
-            history.setdefault('weeks', []).append(history_week)
-
-        query = storage.supabase.table("recipes").select("id, name, metadata").eq("household_id", h_id)
-        all_recipes_res = storage.execute_with_retry(query)
-        
-        # BUG-002: Fixed fragility with safe parsing and defensive checks
-        all_recipes = []
-        if all_recipes_res.data:
-            for r in all_recipes_res.data:
-                try:
-                    meta = r.get('metadata') or {}
-                    # Use .get() everywhere to avoid KeyErrors
-                    all_recipes.append({"id": r.get('id'), "name": r.get('name') or "Unknown Recipe", **meta})
-                except Exception as ex:
-                    print(f"Warning: Skipping malformed recipe: {ex}")
+        history_week = copy.deepcopy(active_plan['history_data']) or {'week_of': week_of, 'dinners': [], 'lunches': {}, 'snacks': {}}
+        
+        # 1b-2. Locked days, manual selections and leftovers
+        apply_draft_choices(history_week, data)
+
+        # 3. Fetch contexts for generation (recent weeks + this week and any later ones)
+        history = draft_history(week_of, history_week)
+
+        all_recipes = storage.StorageEngine.get_recipe_catalog()
         
         # 3.5 Fetch live inventory for accurate generation
         live_inventory = storage.StorageEngine.get_inventory()
 
+        # 3.6 Same inputs as an earlier draft today: return it instead of
+        # regenerating, unless the user explicitly asked for a new one
+        catalog_version = storage.get_catalog_fingerprint()
+        key = draft_key(h_id, week_of, plan_data, history, catalog_version, live_inventory, data.get('exclude_defaults'))
+        cached = None
+        if not data.get('regenerate'):
+            cached = draft_cache.get(key)
+            if cached is None:
+                # Pre-generated after last week's review (api/services/pregeneration.py),
+                # keyed on the week rather than today
+                cached = take_provisional(week_of, 'draft', provisional_draft_key(
+                    h_id, week_of, plan_data, history, catalog_version, live_inventory, data.get('exclude_defaults')))
+                if cached:
+                    _cache_draft(h_id, week_of, data, key, history, live_inventory, *cached)
+        if cached:
+            new_plan_data, current_history_week = cached
+            if new_plan_data != active_plan['plan_data'] or current_history_week != active_plan['history_data']:
+                storage.StorageEngine.update_meal_plan(
+                    week_of, plan_data=new_plan_data, history_data=current_history_week, status='planning')
+                invalidate_cache()
+            return jsonify({
+                "status": "success",
+                "message": f"Generated draft plan for {week_of}",
+                "plan_data": new_plan_data,
+                "history_data": current_history_week,
+                "cached": True
+            })
+        base_history = copy.deepcopy(history)  # generation updates `history` in place
+
         # 4. Generate the rest of the plan
         new_plan_data, new_history = generate_meal_plan(
             input_file=None, 
@@ -255,7 +220,9 @@ def generate_draft_route():
         )
         
         invalidate_cache()
-            
+
+        _cache_draft(h_id, week_of, data, key, base_history, live_inventory, new_plan_data, current_history_week)
+
         return jsonify({
             "status": "success",
             "message": f"Generated draft plan for {week_of}",
@@ -280,6 +247,66 @@ def generate_draft_route():
             "details": error_trace.splitlines()[-1] if error_trace else str(e)
         }), 500
 
+@meals_bp.route("/api/plan/alternatives", methods=["POST"])
+@require_auth
+def plan_alternatives_route():
+    """
+    Top-K complete dinner plans for the week in one call (beam search), so the
+    wizard can offer alternatives without regenerating the draft K times.
+    Takes the same locked_days / selections / leftovers as the draft.
+    Nothing is saved: the chosen plan goes back through /api/plan/draft as
+    dinner selections.
+    """
+    try:
+        data = request.json or {}
+        week_of = data.get('week_of')
+        try:
+            k = int(data.get('k', 3))
+        except (TypeError, ValueError):
+            return jsonify({"status": "error", "message": "k must be an integer"}), 400
+
+        query = storage.supabase.table("meal_plans").select("plan_data, history_data").eq("household_id", storage.get_household_id()).eq("week_of", week_of)
+        res = storage.execute_with_retry(query)
+        if not res.data:
+            return jsonify({"status": "error", "message": f"Week {week_of} not found"}), 404
+
+        plan_data = res.data[0]['plan_data'] or {}
+        history_week = res.data[0]['history_data'] or {'week_of': week_of, 'dinners': [], 'lunches': {}, 'snacks': {}}
+        apply_draft_choices(history_week, data)
+        history = draft_history(week_of, history_week)
+
+        from scripts.recipe_index import RecipeIndex
+        from scripts.workflow.selection import get_recent_recipes, filter_recipes, _load_inventory_data
+        from scripts.workflow.beam_planner import plan_alternatives
+        recipe_index = storage.StorageEngine.get_catalog_artifact(
+            'recipe_index', lambda: RecipeIndex(storage.StorageEngine.get_recipe_catalog()))
+        inventory = _load_inventory_data(inventory_dict=storage.StorageEngine.get_inventory())
+
+        recent = get_recent_recipes(history, lookback_weeks=RECENT_RECIPE_WEEKS, before=week_of)
+        filtered = filter_recipes(recipe_index, plan_data, recent)
+        alternatives = plan_alternatives(filtered, plan_data, history_week, recipe_index, inventory=inventory, k=k)
+
+        return jsonify({
+            "status": "success",
+            "week_of": week_of,
+            "alternatives": [{
+                "score": alt['score'],
+                "from_scratch_day": alt['dinners'].get('from_scratch_day'),
+                "relaxed_days": alt['relaxed_days'],
+                "dinners": [{
+                    "day": day,
+                    "recipe_id": recipe.get('id'),
+                    "recipe_ids": recipe.get('recipe_ids') or [recipe.get('id')],
+                    "recipe_name": recipe.get('name'),
+                    "meal_type": recipe.get('meal_type'),
+                    "cuisine": recipe.get('cuisine'),
+                } for day, recipe in alt['dinners'].items() if day != 'from_scratch_day']
+            } for alt in alternatives]
+        })
+    except Exception as e:
+        import traceback; traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @meals_bp.route("/api/plan/shopping-list", methods=["GET"])
 @require_auth
 def get_shopping_list_route():
@@ -367,22 +394,26 @@ def create_week():
         
         # 1. Fetch Latest Data for Proposal
         h_id = storage.get_household_id()
-        history = storage.StorageEngine.get_history()
-        query = storage.supabase.table("recipes").select("id, name, metadata").eq("household_id", h_id)
-        all_recipes_res = storage.execute_with_retry(query)
-        all_recipes = [{"id": r['id'], "name": r['name'], **(r.get('metadata') or {})} for r in all_recipes_res.data]
+        history = storage.StorageEngine.get_history(since=weeks_before(week_str, PROPOSAL_WEEKS), before=week_str, fields=['dinners'])
+        all_recipes = storage.StorageEngine.get_recipe_catalog()
         
         # Load config from DB (or fallback to file for now)
         from api.routes.status import _load_config
         config = _load_config()
         
-        # 2. Run Database-First Initialization
-        new_plan_data = create_new_week(
-            week_str, 
-            history_dict=history, 
-            recipes_list=all_recipes, 
-            config_dict=config
-        )
+        # 2. Run Database-First Initialization, unless pre-generated from these same inputs
+        provisional = take_provisional(
+            week_str, 'proposal', proposal_key(h_id, week_str, history, storage.get_catalog_fingerprint(), config))
+        pregenerated = provisional is not None
+        if pregenerated:
+            new_plan_data = provisional[0]
+        else:
+            new_plan_data = create_new_week(
+                week_str, 
+                history_dict=history, 
+                recipes_list=all_recipes, 
+                config_dict=config
+            )
         
         # 3. Initialize in DB
         storage.StorageEngine.update_meal_plan(
@@ -394,7 +425,8 @@ def create_week():
         
         return jsonify({
             "status": "success", 
-            "message": f"Created new week {week_str}"
+            "message": f"Created new week {week_str}",
+            "pregenerated": pregenerated
         })
     except Exception as e:
         import traceback; traceback.print_exc()
@@ -424,7 +456,8 @@ def replan_route():
         
         # 1. Fetch Latest Data from Supabase
         inventory = storage.StorageEngine.get_inventory()
-        history = storage.StorageEngine.get_history()
+        # This week plus the recent ones before it: 'fresh' skips recently made recipes
+        history = storage.StorageEngine.get_history(since=weeks_before(week_str, RECENT_RECIPE_WEEKS))
         # active_plan['plan_data'] and active_plan['history_data'] are already loaded
         
         # 2. Run Database-First Replan Logic
@@ -500,8 +533,10 @@ def confirm_veg():
         history_week['fridge_vegetables'] = confirmed_veg
 
         # 3. Update Inventory (Direct to DB)
-        for veg in confirmed_veg:
-            storage.StorageEngine.update_inventory_item('fridge', veg, updates={'added': datetime.now().strftime('%Y-%m-%d')})
+        storage.StorageEngine.bulk_upsert_inventory([
+            {'category': 'fridge', 'item': veg, 'updates': {'added': datetime.now().strftime('%Y-%m-%d')}}
+            for veg in confirmed_veg
+        ])
 
         # Save back to DB
         storage.StorageEngine.update_meal_plan(week_str, plan_data=week_data, history_data=history_week)
@@ -627,8 +662,9 @@ def log_meal():
                  target_dinner['vegetables_used'] = v_list
                  
                  # Inventory updates (Subtract from fridge in DB)
-                 for veg in v_list:
-                     storage.StorageEngine.update_inventory_item('fridge', veg, delete=True)
+                 storage.StorageEngine.bulk_upsert_inventory([
+                     {'category': 'fridge', 'item': veg, 'delete': True} for veg in v_list
+                 ])
 
              if kids_feedback: target_dinner['kids_feedback'] = kids_feedback
              if kids_complaints:
@@ -868,7 +904,7 @@ def update_plan_with_actuals():
 
         # Check if week exists in DB history
         from scripts import log_execution # Safety import
-        history = storage.StorageEngine.get_history()
+        history = storage.StorageEngine.get_history(week_of=week_str, limit=1, fields=['dinners'])
         week_history = log_execution.find_week(history, week_str)
         if not week_history:
             return jsonify({"status": "error", "message": f"Week {week_str} not found in database"}), 404
@@ -977,10 +1013,11 @@ def suggest_options_route():
         selections = data.get('selections', [])
         leftovers = data.get('leftovers', [])
         
-        # Load recipes
-        all_recipes_query = storage.supabase.table("recipes").select("id, name, metadata").eq("household_id", h_id)
-        all_recipes_res = storage.execute_with_retry(all_recipes_query)
-        all_recipes = [{"id": r['id'], "name": r['name'], **(r.get('metadata') or {})} for r in all_recipes_res.data]
+        # Load recipes (indexed once per catalog version, with safety masks,
+        # and shared by the snack and lunch selectors)
+        from scripts.recipe_index import RecipeIndex
+        all_recipes = storage.StorageEngine.get_catalog_artifact(
+            'recipe_index', lambda: RecipeIndex(storage.StorageEngine.get_recipe_catalog()))
         
         # Load config
         from api.routes.status import _load_config
@@ -995,7 +1032,8 @@ def suggest_options_route():
         # 3. Suggested Lunch Recipes (Ranked by Dinner ingredients)
         from scripts.lunch_selector import LunchSelector
         lunch_selector = LunchSelector(recipes=all_recipes)
-        lunch_selector.config = config 
+        lunch_selector.config = config
+        lunch_selector.kid_profiles = config.get('kid_profiles', {})
         
         # Calculate available ingredients from selected dinners
         dinner_plan_list = []
@@ -1005,7 +1043,7 @@ def suggest_options_route():
                 recipe_name = s.get('recipe_name')
                 day = s.get('day')
                 # Find the recipe to get main_veg
-                recipe = next((r for r in all_recipes if r['id'] == recipe_id), None)
+                recipe = all_recipes.get(recipe_id)
                 dinner_plan_list.append({
                     'day': day,
                     'recipe_id': recipe_id,
@@ -5,8 +5,9 @@ from pathlib import Path
 from flask import Blueprint, jsonify, request
 from api.utils import get_cached_data, get_yaml_data, invalidate_cache
 from api.utils.auth import require_auth
-from api.utils.storage import StorageEngine
+from api.utils.storage import StorageEngine, get_household_id
 from api.utils.scrapers import extract_recipe_from_url
+from scripts.recipe_search import sync_search_index
 
 recipes_bp = Blueprint('recipes', __name__)
 
@@ -45,6 +46,12 @@ def get_recipes():
         traceback.print_exc()
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def _get_search_index():
+    """Household search index; re-synced (changed recipes only) when the catalog changes."""
+    return StorageEngine.get_catalog_artifact(
+        'search_index', lambda: sync_search_index(get_household_id(), StorageEngine.get_recipes())
+    )
+
 @recipes_bp.route("/api/recipes/search")
 @require_auth
 def search_recipes():
@@ -52,12 +59,11 @@ def search_recipes():
         query = request.args.get('q', '').lower().strip()
         if not query:
             return jsonify({"status": "success", "recipes": []})
-            
-        recipes = StorageEngine.get_recipes()
-        # Simple string matching for similarity
-        matches = [r for r in recipes if query in r['name'].lower() or r['id'].lower().startswith(query)]
-        
-        return jsonify({"status": "success", "matches": matches[:10]})
+
+        # Ranked by relevance (trigram/prefix matching tolerates typos)
+        matches = _get_search_index().search(query, limit=10)
+
+        return jsonify({"status": "success", "matches": matches})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
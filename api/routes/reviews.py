@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from flask import Blueprint, jsonify, request
 from api.utils import storage, invalidate_cache
 from api.utils.auth import require_auth
+from api.services.pregeneration import enqueue_week
 import json
 
 reviews_bp = Blueprint('reviews', __name__)
@@ -57,9 +58,7 @@ def get_last_week_review_data():
         actual_dinners = {d.get('day'): d for d in history_data.get('dinners', [])}
         
         # 2. Get All Recipes for name resolution
-        all_recipes_query = storage.supabase.table("recipes").select("id, name").eq("household_id", h_id)
-        all_recipes_res = storage.execute_with_retry(all_recipes_query)
-        all_recipes = all_recipes_res.data or []
+        all_recipes = storage.StorageEngine.get_recipe_catalog()
         recipe_map = {r['id']: r['name'] for r in all_recipes}
         
         # 3. Get Snacks and other feedback
@@ -214,36 +213,23 @@ def submit_review():
                 else:
                     aggregated_leftovers[name] = qty
 
+            batch = []
             for item_name, qty in aggregated_leftovers.items():
-                # Add to inventory (category: fridge)
-                # Note: Ideally we would increment, but 'update_inventory_item' uses upsert.
-                # For now, we assume this is a fresh add or overwrite is acceptable for the review workflow.
-                # To be safer, we could fetch existing, but reviews are typically for past week so assume addition.
-                # Actually for "low friction", if I already have some in fridge, this bumps it.
-                # But 'update_inventory_item' REPLACES quantity. 
-                # Improving this to Fetch-then-Add would be better but let's stick to aggregation for now to fix the overwrite-within-batch issue.
-                
-                # Fetch existing to increment (Low Friction improvement)
-                existing_query = storage.supabase.table("inventory_items").select("quantity").eq("household_id", h_id).eq("category", "fridge").eq("item", item_name)
-                existing_res = storage.execute_with_retry(existing_query)
-                current_qty = 0
-                if existing_res.data:
-                    current_qty = existing_res.data[0]['quantity']
-
-                new_qty = current_qty + qty
-
-                storage.StorageEngine.update_inventory_item(
-                    'fridge', 
-                    item_name, 
-                    updates={
-                        'added': datetime.now().strftime('%Y-%m-%d'), 
+                # Add to inventory (category: fridge), incrementing any servings already there
+                batch.append({
+                    'category': 'fridge',
+                    'item': item_name,
+                    'increment': True,
+                    'updates': {
+                        'added': datetime.now().strftime('%Y-%m-%d'),
                         'is_leftover': True,
-                        'quantity': new_qty,
+                        'quantity': qty,
                         'unit': 'serving',
                         'type': 'meal'
                     }
-                )
+                })
                 added_items.append(f"{item_name} ({qty})")
+            storage.StorageEngine.bulk_upsert_inventory(batch)
         
         # 4. Archive the week (Transition status)
         # Only archive if it was 'active'. If it was already 'archived', keep it.
@@ -253,6 +239,13 @@ def submit_review():
             
         storage.StorageEngine.update_meal_plan(week_str, **params)
         invalidate_cache()
+
+        # 5. Next up is planning the following week: start on it in the background
+        try:
+            next_week_str = (datetime.strptime(week_str, "%Y-%m-%d") + timedelta(days=7)).strftime("%Y-%m-%d")
+            enqueue_week(next_week_str)
+        except Exception as e:
+            print(f"Warning: Failed to queue pre-generation after review: {e}")
         
         return jsonify({
             "status": "success", 
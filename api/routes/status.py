@@ -3,12 +3,13 @@ import os
 from pathlib import Path
 from datetime import datetime, timedelta
 import pytz
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 
-from scripts.compute_analytics import compute_analytics
+from scripts.compute_analytics import merge_rollups
 from api.utils import CACHE, CACHE_TTL
 from api.utils.auth import require_auth
 from api.utils import storage
+from api.utils.fanout import fan_out
 
 status_bp = Blueprint('status', __name__)
 
@@ -32,53 +33,65 @@ def _load_config():
     CACHE['config'] = {'data': config, 'timestamp': now, 'household_id': h_id}
     return config
 
-def _get_current_status(skip_sync=False, week_override=None):
+def _fetch_week_plan(week_of):
+    query = storage.supabase.table("meal_plans").select("*").eq("household_id", storage.get_household_id()).eq("week_of", week_of)
+    res = storage.execute_with_retry(query)
+    return res.data[0] if res.data else None
+
+def _fetch_next_week(week_of):
+    if not storage.supabase:
+        return None
     try:
-        storage.StorageEngine.archive_expired_weeks()
+        # Simple check for any plan in the future
+        query = storage.supabase.table("meal_plans").select("week_of, status").eq("household_id", storage.get_household_id()).gt("week_of", week_of).order("week_of", desc=False).limit(1)
+        future_res = storage.execute_with_retry(query)
+        return future_res.data[0] if future_res.data else None
     except Exception as e:
-        print(f"Warning: Failed to archive: {e}")
+        print(f"Error checking for next week: {e}")
+        return None
+
+def _fetch_available_weeks():
+    try:
+        return storage.StorageEngine.get_available_weeks()
+    except Exception as e:
+        print(f"Error adding available weeks: {e}")
+        return []
+
+
+def _get_current_status(skip_sync=False, week_override=None):
+    # Independent reads run concurrently (see api/utils/fanout.py).
+    # Round 1: a due sweep must land before meal_plans rows are read, and the
+    # timezone from config decides which week is "current".
+    # Round 2: everything keyed on that week.
+    _, config, pending_recipes = fan_out(
+        storage.StorageEngine.sweep_expired_weeks_if_due,
+        _load_config,
+        storage.StorageEngine.get_pending_recipes
+    )
 
     # Load timezone from config.yml
-    config = _load_config()
     user_tz = pytz.timezone(config.get('timezone', 'America/Los_Angeles'))
     today = datetime.now(user_tz)
 
     monday = today - timedelta(days=today.weekday())
-    week_str = monday.strftime('%Y-%m-%d')
-    
-    # Check if a specific week was requested
+    # Check if a specific week was requested, otherwise ALWAYS use the current
+    # calendar week. This ensures the dashboard aligns with reality.
     requested_week = week_override or request.args.get('week')
-    
-    if requested_week:
-        # Fetch specific week
-        query = storage.supabase.table("meal_plans").select("*").eq("household_id", storage.get_household_id()).eq("week_of", requested_week)
-        res = storage.execute_with_retry(query)
-        if res.data:
-            active_plan = res.data[0]
-            state, data = storage.StorageEngine.get_workflow_state(active_plan)
-            week_str = active_plan['week_of']
-        else:
-            # Week doesn't exist in DB yet
-            active_plan = None
-            state = 'new_week'
-            data = {}
-            week_str = requested_week
+    week_str = requested_week or monday.strftime('%Y-%m-%d')
+
+    active_plan, next_week, available_weeks = fan_out(
+        lambda: _fetch_week_plan(week_str),
+        lambda: _fetch_next_week(week_str),
+        _fetch_available_weeks
+    )
+
+    if active_plan:
+        state, data = storage.StorageEngine.get_workflow_state(active_plan)
+        week_str = active_plan['week_of']
     else:
-        # Default logic: ALWAYS use the current calendar week
-        # This ensures the dashboard aligns with reality.
-        # We try to fetch the plan for the *current* week.
-        week_str = monday.strftime('%Y-%m-%d')
-        query = storage.supabase.table("meal_plans").select("*").eq("household_id", storage.get_household_id()).eq("week_of", week_str)
-        res = storage.execute_with_retry(query)
-        
-        if res.data:
-            active_plan = res.data[0]
-            state, data = storage.StorageEngine.get_workflow_state(active_plan)
-        else:
-            # No plan for current week yet
-            active_plan = None
-            state = 'new_week' # Or 'no_plan'
-            data = {}
+        # Week doesn't exist in DB yet / no plan for current week yet
+        state = 'new_week'
+        data = {}
     current_day = today.strftime('%a').lower()[:3]
 
     today_dinner = None
@@ -268,29 +281,19 @@ def _get_current_status(skip_sync=False, week_override=None):
             "week_data": data,
             "available_weeks": [],
             "slots": resolved_slots,
-            "pending_recipes": storage.StorageEngine.get_pending_recipes()
+            "pending_recipes": pending_recipes
         }
 
         # Check for next week
-        if storage.supabase:
-            try:
-                # Simple check for any plan in the future
-                query = storage.supabase.table("meal_plans").select("week_of, status").eq("household_id", storage.get_household_id()).gt("week_of", week_str).order("week_of", desc=False).limit(1)
-                future_res = storage.execute_with_retry(query)
-                if future_res.data:
-                    res_dict["next_week_planned"] = True
-                    res_dict["next_week"] = {
-                        "week_of": str(future_res.data[0]['week_of']),
-                        "status": future_res.data[0]['status']
-                    }
-            except Exception as e:
-                print(f"Error checking for next week: {e}")
+        if next_week:
+            res_dict["next_week_planned"] = True
+            res_dict["next_week"] = {
+                "week_of": str(next_week['week_of']),
+                "status": next_week['status']
+            }
 
         # Add available weeks for the selector
-        try:
-            res_dict["available_weeks"] = storage.StorageEngine.get_available_weeks()
-        except Exception as e:
-            print(f"Error adding available weeks: {e}")
+        res_dict["available_weeks"] = available_weeks
 
         return jsonify(res_dict)
     except Exception as e:
@@ -321,11 +324,11 @@ def get_history():
 @status_bp.route("/api/analytics")
 @require_auth
 def get_analytics():
-    history = storage.StorageEngine.get_history()
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
-    analytics = compute_analytics(history, start_date, end_date)
-    return jsonify(analytics)
+    # Merge the small per-week rollups instead of reprocessing raw history
+    rollups = storage.StorageEngine.get_analytics_rollups(start_date, end_date)
+    return jsonify(merge_rollups(rollups))
 
 @status_bp.route("/api/hello")
 @require_auth
@@ -353,3 +356,45 @@ def debug_clear_cache():
     if 'config' in CACHE:
         del CACHE['config']
     return jsonify({"status": "success", "message": "Cache cleared"})
+
+def _cron_authorized():
+    """Vercel Cron sends 'Bearer $CRON_SECRET'."""
+    cron_secret = os.environ.get('CRON_SECRET')
+    return bool(cron_secret) and request.headers.get('Authorization') == f"Bearer {cron_secret}"
+
+@status_bp.route("/api/cron/sweep-expired-weeks", methods=["GET", "POST"])
+def cron_sweep_expired_weeks():
+    """Scheduled sweep (see vercel.json)."""
+    if not _cron_authorized():
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    try:
+        archived = storage.StorageEngine.sweep_expired_weeks()
+        return jsonify({"status": "success", "archived": len(archived), "weeks": archived})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@status_bp.route("/api/cron/pregenerate-next-week", methods=["GET", "POST"])
+def cron_pregenerate_next_week():
+    """
+    Scheduled pre-generation (see vercel.json and api/services/pregeneration.py):
+    next week's proposal and first draft for households with a plan this week,
+    for up to PREGENERATE_CRON_BUDGET seconds so one run stays inside the
+    function timeout. Each run picks up the households still without a
+    proposal; once "remaining" is 0 the rest of the schedule's runs return
+    immediately. Households still remaining when the schedule ends just
+    generate on demand, so a nonzero "remaining" on the last run means the
+    schedule or budget should grow with the household count.
+    """
+    if not _cron_authorized():
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    try:
+        from api.services.pregeneration import pregenerate_batch
+
+        today = datetime.now().date()
+        this_week = today - timedelta(days=today.weekday())
+        next_week = (this_week + timedelta(days=7)).isoformat()
+        storage.StorageEngine.delete_provisional_plans(before=this_week.isoformat())
+        done, remaining = pregenerate_batch(current_app._get_current_object(), this_week.isoformat(), next_week)
+        return jsonify({"status": "success", "week_of": next_week, "households": done, "remaining": remaining})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
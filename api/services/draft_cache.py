@@ -0,0 +1,88 @@
+"""
+Content-addressed cache of draft plans (/api/plan/draft).
+
+A draft is a function of its inputs: the week's plan settings, the week's
+history after the wizard's locked days / selections / leftovers are applied,
+the recent-history window, the recipe catalog (by shared version or content), the inventory,
+exclude_defaults and today's date (inventory freshness is counted from it).
+draft_key() hashes exactly those, so repeating a wizard step (or
+double-clicking) returns the stored draft instead of regenerating it, while
+any real change, or a new day, produces a new key. Lunch and snack picks are
+partly random, so the wizard's Regenerate button skips the lookup
+(`regenerate` in the request).
+
+Bounded LRU per process; entries are deep-copied in and out.
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+DRAFT_CACHE_SIZE = int(os.environ.get('DRAFT_CACHE_SIZE', 64))
+
+# plan_data keys written by generate_meal_plan; they are outputs, not inputs
+GENERATED_PLAN_FIELDS = ('dinners', 'lunches', 'snacks', 'prep_tasks', 'workflow')
+
+
+def fingerprint(payload):
+    """sha256 of a JSON-able payload, independent of dict key order."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def draft_key(household_id, week_of, plan_data, history, catalog_version, inventory, exclude_defaults=None,
+              on=None):
+    """Stable hash of everything generate_meal_plan reads for a draft, generated `on` (default today)."""
+    settings = {k: v for k, v in (plan_data or {}).items() if k not in GENERATED_PLAN_FIELDS}
+    return fingerprint({
+        'household_id': household_id,
+        'week_of': week_of,
+        'plan': settings,
+        'history': history,
+        'catalog_version': catalog_version,
+        'inventory': inventory,
+        'exclude_defaults': exclude_defaults,
+        'on': (on or date.today()).isoformat(),
+    })
+
+
+class DraftCache:
+    """Bounded LRU of key -> (plan_data, history_data)."""
+
+    def __init__(self, max_size=DRAFT_CACHE_SIZE):
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(entry)
+
+    def set(self, key, plan_data, history_data):
+        entry = copy.deepcopy((plan_data, history_data))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+draft_cache = DraftCache()
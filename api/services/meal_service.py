@@ -228,6 +228,8 @@ def auto_add_recipe_from_meal(actual_meal, h_id):
                 "content": f"# {actual_meal}\n\nAdded automatically from meal correction."
             })
             storage.execute_with_retry(query)
+            storage.bump_catalog_version(h_id)
+            storage.StorageEngine.resolve_pending_recipes(h_id)
             return True
     except Exception as e:
         print(f"Error auto-adding recipe: {e}")
@@ -1,5 +1,119 @@
-from collections import Counter
-from typing import List, Dict, Any
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import List, Dict, Any, Iterable, Optional
+
+from api.utils import storage
+
+# Process-wide pairing index per household. Built once from history and kept
+# current by record_week_pairings() when a week's history is written; the TTL
+# only bounds staleness from writes made by other instances. At most
+# PAIRING_INDEX_CACHE_SIZE households are kept (least recently used evicted).
+PAIRING_INDEX_TTL = 3600
+PAIRING_INDEX_CACHE_SIZE = int(os.environ.get('PAIRING_INDEX_CACHE_SIZE', 64))
+
+_pairing_indexes = OrderedDict()
+_pairing_indexes_lock = threading.Lock()
+
+
+def _dinner_pairs(week: Dict[str, Any]) -> List[tuple]:
+    """(recipe_id, paired_id) for every ordered pair of recipes served at the same dinner."""
+    pairs = []
+    if not isinstance(week, dict):
+        return pairs
+    for dinner in week.get('dinners', []) or []:
+        recipes = dinner.get('recipe_ids', []) if isinstance(dinner, dict) else None
+        if not isinstance(recipes, list) or len(recipes) < 2:
+            continue
+        for r_id in dict.fromkeys(recipes):
+            for other in recipes:
+                if other != r_id:
+                    pairs.append((r_id, other))
+    return pairs
+
+
+class PairingIndex:
+    """
+    Sparse recipe co-occurrence counts: recipe_id -> Counter of paired recipe ids.
+
+    Each week's contribution is kept so re-logging a week replaces its pairs
+    instead of double counting. Ranked neighbour lists are cached per recipe,
+    so a lookup is a slice of the top `limit` entries.
+    """
+
+    def __init__(self):
+        self._pairs = defaultdict(Counter)
+        self._weeks = {}
+        self._ranked = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_history(cls, history: Dict[str, Any]) -> 'PairingIndex':
+        index = cls()
+        weeks = history.get('weeks', []) if isinstance(history, dict) else []
+        for i, week in enumerate(weeks):
+            if not isinstance(week, dict): continue
+            index.update_week(week.get('week_of') or f'#{i}', week)
+        return index
+
+    def update_week(self, week_of, week: Dict[str, Any]):
+        """Replace a week's pairs with those in its (new) history."""
+        new_pairs = _dinner_pairs(week)
+        with self._lock:
+            old_pairs = self._weeks.pop(str(week_of), [])
+            for r_id, other in old_pairs:
+                counts = self._pairs[r_id]
+                counts[other] -= 1
+                if counts[other] <= 0:
+                    del counts[other]
+                if not counts:
+                    del self._pairs[r_id]
+            for r_id, other in new_pairs:
+                self._pairs[r_id][other] += 1
+            if new_pairs:
+                self._weeks[str(week_of)] = new_pairs
+            for r_id, _ in old_pairs + new_pairs:
+                self._ranked.pop(r_id, None)
+
+    def top(self, main_id: str, limit: int = 5) -> List[str]:
+        """Recipes most often served with main_id (ties keep first-seen order)."""
+        ranked = self._ranked.get(main_id)
+        if ranked is None:
+            with self._lock:
+                counts = self._pairs.get(main_id)
+                ranked = [r_id for r_id, _ in counts.most_common()] if counts else []
+                self._ranked[main_id] = ranked
+        return ranked[:limit]
+
+    def top_many(self, main_ids: Iterable[str], limit: int = 5) -> Dict[str, List[str]]:
+        return {main_id: self.top(main_id, limit) for main_id in dict.fromkeys(main_ids)}
+
+
+def get_pairing_index(h_id: Optional[str] = None) -> PairingIndex:
+    """The household's pairing index, built from its dinner history on first use."""
+    h_id = h_id or storage.get_household_id()
+    with _pairing_indexes_lock:
+        entry = _pairing_indexes.get(h_id)
+        if entry and time.time() - entry[1] < PAIRING_INDEX_TTL:
+            _pairing_indexes.move_to_end(h_id)
+            return entry[0]
+
+    index = PairingIndex.from_history(storage.StorageEngine.get_history(fields=['dinners']))
+    with _pairing_indexes_lock:
+        _pairing_indexes[h_id] = (index, time.time())
+        _pairing_indexes.move_to_end(h_id)
+        while len(_pairing_indexes) > PAIRING_INDEX_CACHE_SIZE:
+            _pairing_indexes.popitem(last=False)
+    return index
+
+
+def record_week_pairings(week_of, history: Dict[str, Any], h_id: Optional[str] = None):
+    """Fold a week's logged dinners into the cached index (no-op until it's built)."""
+    entry = _pairing_indexes.get(h_id or storage.get_household_id())
+    if entry:
+        entry[0].update_week(week_of, history or {})
+
 
 def get_paired_suggestions(main_id: str, history: Dict[str, Any], limit: int = 5) -> List[str]:
     """
@@ -8,23 +122,4 @@ def get_paired_suggestions(main_id: str, history: Dict[str, Any], limit: int = 5
     """
     if not main_id or not isinstance(history, dict):
         return []
-
-    pairing_counts = Counter()
-    
-    weeks = history.get('weeks', [])
-    for week in weeks:
-        if not isinstance(week, dict): continue
-        
-        dinners = week.get('dinners', [])
-        for dinner in dinners:
-            recipes = dinner.get('recipe_ids', [])
-            if not isinstance(recipes, list) or main_id not in recipes:
-                continue
-                
-            # Add all other recipes in the same meal to pairing counts
-            for r_id in recipes:
-                if r_id != main_id:
-                    pairing_counts[r_id] += 1
-                
-    # Return most common pairings
-    return [r_id for r_id, count in pairing_counts.most_common(limit)]
+    return PairingIndex.from_history(history).top(main_id, limit)
@@ -0,0 +1,120 @@
+"""
+Planning inputs shared by the meal routes and pre-generation.
+Extracted from meals.py so api/services/pregeneration.py can build the same
+history windows and wizard choices without importing a route module.
+"""
+from datetime import datetime, timedelta
+
+from api.utils import storage
+
+# History windows the planning routes load (see StorageEngine.get_history).
+# Dinner selection skips recipes from the last 3 weeks; the farmers market
+# proposal looks at vegetables from the last 2.
+RECENT_RECIPE_WEEKS = 3
+PROPOSAL_WEEKS = 2
+
+
+def weeks_before(week_of, weeks):
+    """'YYYY-MM-DD' for the Monday `weeks` weeks before week_of (None loads all history)."""
+    if not week_of:
+        return None
+    start = datetime.strptime(str(week_of)[:10], '%Y-%m-%d') - timedelta(weeks=weeks)
+    return start.strftime('%Y-%m-%d')
+
+
+def apply_draft_choices(history_week, data):
+    """Apply the wizard's locked days, manual selections and leftover assignments to the week's history."""
+    locked_days = data.get('locked_days', [])
+    selections = data.get('selections', [])
+    leftover_assignments = data.get('leftovers', [])
+
+    # 1b. Selective Replanning: Clear unlocked days from history
+    if 'locked_days' in data:
+        current_dinners = history_week.get('dinners', [])
+        history_week['dinners'] = [d for d in current_dinners if d.get('day') in locked_days]
+
+    # 2. Apply manual selections to history_week
+    # This ensures the generation logic respects these choices
+    days_covered = set()
+    for selection in selections:
+        day = selection.get('day')
+        recipe_id = selection.get('recipe_id')
+        slot = selection.get('slot', 'dinner')
+        recipe_ids = selection.get('recipe_ids')
+
+        if not day or (not recipe_id and not recipe_ids): continue
+
+        ids = recipe_ids or [recipe_id]
+        day_abbr = day.lower()[:3]
+        days_covered.add(day_abbr)
+
+        if slot == 'dinner':
+            # Find and update or add
+            found = False
+            for dinner in history_week.get('dinners', []):
+                if dinner.get('day') == day_abbr:
+                    dinner['recipe_ids'] = ids
+                    found = True
+                    break
+            if not found:
+                history_week.setdefault('dinners', []).append({
+                    'day': day_abbr,
+                    'recipe_ids': ids
+                })
+        elif slot == 'lunch':
+            history_week.setdefault('lunches', {})
+            history_week['lunches'][day_abbr] = {
+                'recipe_ids': ids,
+                'recipe_name': selection.get('recipe_name') or (recipe_id.replace('_', ' ').title() if recipe_id else "Multiple Recipes"),
+                'prep_style': 'manual'
+            }
+        elif slot in ['school_snack', 'home_snack']:
+            history_week.setdefault('snacks', {}).setdefault(day_abbr, {})
+            history_week['snacks'][day_abbr][slot] = selection.get('recipe_name') or recipe_id.replace('_', ' ').title()
+
+    # Apply explicit leftover assignments
+    for assignment in leftover_assignments:
+        day = assignment.get('day', '').lower()[:3]
+        slot = assignment.get('slot', '').lower()
+        item = assignment.get('item', '')
+        if not day or not item: continue
+
+        recipe_id = f"leftover:{item}"
+
+        if slot == 'dinner':
+            found = False
+            for dinner in history_week.get('dinners', []):
+                if dinner.get('day') == day:
+                    dinner['recipe_ids'] = [recipe_id]
+                    found = True
+                    break
+            if not found:
+                history_week.setdefault('dinners', []).append({'day': day, 'recipe_ids': [recipe_id]})
+        elif slot == 'lunch':
+            history_week.setdefault('lunches', {})
+            history_week['lunches'][day] = {
+                'recipe_ids': [recipe_id],
+                'recipe_name': item,
+                'prep_style': 'leftovers'
+            }
+
+
+def draft_history(week_of, history_week):
+    """The recent weeks before week_of plus `history_week` as this week's entry."""
+    history = storage.StorageEngine.get_history(since=weeks_before(week_of, RECENT_RECIPE_WEEKS), before=week_of)
+    return merge_history_week(history, week_of, history_week)
+
+
+def merge_history_week(history, week_of, history_week):
+    """Put `history_week` in place of week_of's entry in `history` (appended if there is none)."""
+    updated_any = False
+    for w in history.get('weeks', []):
+        if w.get('week_of') == week_of:
+            w['dinners'] = history_week.get('dinners', [])
+            w['lunches'] = history_week.get('lunches', {})
+            w['snacks'] = history_week.get('snacks', {})
+            updated_any = True
+            break
+    if not updated_any:
+        history.setdefault('weeks', []).append(history_week)
+    return history
@@ -0,0 +1,225 @@
+"""
+Speculative pre-generation of the upcoming week.
+
+Once /api/reviews/submit closes a week, the household's next steps are
+/api/create-week and a first /api/plan/draft, both slow. pregenerate_week
+computes them ahead of time and stores each as a provisional_plans row
+together with the fingerprint of its inputs:
+
+- 'proposal': create-week's plan_data, keyed by proposal_key (history
+  window, catalog version, config)
+- 'draft': the first draft with no picks, keyed by provisional_draft_key
+
+The routes take a row only if the fingerprint they compute from the current
+inputs matches. Anything that changes in between (a new recipe, an edited
+config, a logged meal) just misses and the routes generate as before. The wizard usually sends suggestion picks with its first
+draft, so draft rows hit only when it doesn't; the proposal is the reliable
+win.
+
+Rows live in the database, so any instance can serve them. They are
+produced two ways:
+
+- a local job queue (one daemon thread per process) right after a review
+  submit; this pays off on long-lived servers, while on serverless hosts
+  the thread may be frozen once the response is sent
+- /api/cron/pregenerate-next-week, which works through households without a
+  proposal for next week for up to PREGENERATE_CRON_BUDGET seconds per
+  invocation; households it doesn't reach generate on demand as before
+"""
+import copy
+import os
+import queue
+import random
+import threading
+import time
+from datetime import date
+
+from flask import current_app, request
+
+from api.services.draft_cache import draft_key, fingerprint
+from api.services.planning_service import PROPOSAL_WEEKS, weeks_before, apply_draft_choices, draft_history
+from api.utils import storage
+from scripts.workflow import generate_meal_plan
+from scripts.workflow.actions import create_new_week
+
+PREGENERATE_ENABLED = os.environ.get('PREGENERATE_NEXT_WEEK', 'true').lower() != 'false'
+# Seconds one cron invocation spends pre-generating; keep it under the host's function timeout
+PREGENERATE_CRON_BUDGET = float(os.environ.get('PREGENERATE_CRON_BUDGET', 8))
+
+PROVISIONAL_KINDS = ('proposal', 'draft')
+_stats_lock = threading.Lock()
+_stats = {kind: {'hits': 0, 'misses': 0} for kind in PROVISIONAL_KINDS}
+
+
+def proposal_key(household_id, week_of, history, catalog_version, config):
+    """Fingerprint of everything create_new_week reads."""
+    return fingerprint({
+        'household_id': household_id,
+        'week_of': week_of,
+        'history': history,
+        'catalog_version': catalog_version,
+        'config': config,
+    })
+
+
+def provisional_draft_key(household_id, week_of, plan_data, history, catalog_version, inventory,
+                          exclude_defaults=None):
+    """
+    draft_key dated on the week itself rather than the day it's computed: the
+    cron runs days before the wizard opens, and a day or two of inventory
+    freshness doesn't make a first draft stale.
+    """
+    return draft_key(household_id, week_of, plan_data, history, catalog_version, inventory, exclude_defaults,
+                     on=date.fromisoformat(week_of))
+
+
+def take_provisional(week_of, kind, key):
+    """(plan_data, history_data) pre-generated for the household's week from inputs hashing to `key`, else None."""
+    try:
+        entry = storage.StorageEngine.take_provisional_plan(week_of, kind, key)
+    except Exception as e:
+        print(f"Warning: Failed to read provisional {kind} for {week_of}: {e}")
+        entry = None
+    with _stats_lock:
+        _stats[kind]['hits' if entry else 'misses'] += 1
+    return entry
+
+
+def get_stats():
+    with _stats_lock:
+        return copy.deepcopy(_stats)
+
+
+def pregenerate_week(week_str):
+    """
+    Compute create-week's proposal and the wizard's first draft (no picks)
+    for a week that hasn't been created yet, from the same inputs those
+    routes will read, and store both as provisional rows.
+    """
+    h_id = storage.get_household_id()
+    query = storage.supabase.table("meal_plans").select("week_of").eq("household_id", h_id).eq("week_of", week_str)
+    if storage.execute_with_retry(query).data:
+        return  # Already created: the routes have run for real
+
+    # create-week
+    proposal_history = storage.StorageEngine.get_history(
+        since=weeks_before(week_str, PROPOSAL_WEEKS), before=week_str, fields=['dinners'])
+    all_recipes = storage.StorageEngine.get_recipe_catalog()
+    from api.routes.status import _load_config
+    config = _load_config()
+    catalog_version = storage.get_catalog_fingerprint()
+    proposal = proposal_key(h_id, week_str, proposal_history, catalog_version, config)
+    plan_data = create_new_week(week_str, history_dict=proposal_history, recipes_list=all_recipes, config_dict=config)
+
+    # draft, as requested right after create-week (whose row holds this history_data)
+    choices = {'week_of': week_str, 'selections': [], 'locked_days': [], 'leftovers': [], 'exclude_defaults': []}
+    history_week = {'week_of': week_str, 'dinners': []}
+    apply_draft_choices(history_week, choices)
+    history = draft_history(week_str, history_week)
+    live_inventory = storage.StorageEngine.get_inventory()
+    key = provisional_draft_key(h_id, week_str, plan_data, history, catalog_version, live_inventory,
+                                choices['exclude_defaults'])
+
+    new_plan_data, new_history = generate_meal_plan(
+        input_file=None,
+        data=copy.deepcopy(plan_data),
+        recipes_list=all_recipes,
+        history_dict=history,
+        exclude_defaults=choices['exclude_defaults'],
+        inventory_data=live_inventory,
+        write_html=False  # data only; the week's page is written when it's really planned
+    )
+    current_history_week = next((w for w in new_history.get('weeks', []) if w.get('week_of') == week_str), None)
+
+    # The draft first: the cron counts a household with a stored proposal as done
+    storage.StorageEngine.save_provisional_plan(week_str, 'draft', key, new_plan_data, current_history_week)
+    storage.StorageEngine.save_provisional_plan(week_str, 'proposal', proposal, plan_data)
+
+
+def run_job(app, household_id, week_of, job):
+    """Run job(week_of) in a request context whose household is `household_id`."""
+    with app.test_request_context():
+        request.household_id = household_id
+        job(week_of)
+
+
+class JobQueue:
+    """FIFO of pre-generation jobs, run one at a time on a daemon thread."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, app, household_id, week_of, job):
+        """Queue job(week_of) for the household. False if it's already queued."""
+        with self._lock:
+            if (household_id, week_of) in self._pending:
+                return False
+            self._pending.add((household_id, week_of))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name='pregenerate', daemon=True)
+                self._thread.start()
+        self._queue.put((app, household_id, week_of, job))
+        return True
+
+    def _work(self):
+        while True:
+            app, household_id, week_of, job = self._queue.get()
+            try:
+                run_job(app, household_id, week_of, job)
+                self.completed += 1
+            except Exception as e:
+                print(f"Warning: Pre-generation of {week_of} failed: {e}")
+                self.failed += 1
+            finally:
+                with self._lock:
+                    self._pending.discard((household_id, week_of))
+                self._queue.task_done()
+
+    def join(self):
+        """Block until every queued job has run."""
+        self._queue.join()
+
+    def get_stats(self):
+        return {'pending': len(self._pending), 'completed': self.completed, 'failed': self.failed}
+
+
+job_queue = JobQueue()
+
+
+def enqueue_week(week_of):
+    """Queue pregenerate_week(week_of) for the current request's household (no-op when disabled)."""
+    if not PREGENERATE_ENABLED:
+        return False
+    return job_queue.submit(current_app._get_current_object(), storage.get_household_id(), week_of, pregenerate_week)
+
+
+def pregenerate_batch(app, this_week, next_week, budget=None):
+    """
+    Pre-generate next_week for the households that have a plan for this_week
+    but neither a plan nor a stored proposal for next_week, one after another
+    until none are left or `budget` seconds (default PREGENERATE_CRON_BUDGET)
+    have passed. Each household is tried once per call, in random order so
+    households that keep failing can't hold up the rest.
+    Returns (households done, households still to do).
+    """
+    skip = set(storage.StorageEngine.get_household_ids_for_week(next_week))
+    skip.update(storage.StorageEngine.get_provisional_household_ids(next_week, 'proposal'))
+    todo = [h for h in storage.StorageEngine.get_household_ids_for_week(this_week) if h not in skip]
+    random.shuffle(todo)
+    budget = PREGENERATE_CRON_BUDGET if budget is None else budget
+    started = time.monotonic()
+    done = 0
+    for h_id in todo:
+        if time.monotonic() - started >= budget:
+            break
+        try:
+            run_job(app, h_id, next_week, pregenerate_week)
+            done += 1
+        except Exception as e:
+            print(f"Warning: Pre-generation of {next_week} failed for household {h_id}: {e}")
+    return done, len(todo) - done
@@ -13,6 +13,9 @@ CACHE = {
 
 CACHE_TTL = 300  # 5 minutes
 
+# key -> {'hits', 'misses'} for get_cached_data, reported by /api/metrics
+CACHE_STATS = {key: {'hits': 0, 'misses': 0} for key in CACHE}
+
 def get_actual_path(rel_path):
     is_vercel = os.environ.get('VERCEL') == '1'
     if is_vercel:
@@ -55,8 +58,11 @@ def get_cached_data(key, path):
     now = datetime.now().timestamp()
     cache_entry = CACHE.get(key)
 
+    stats = CACHE_STATS.setdefault(key, {'hits': 0, 'misses': 0})
     if cache_entry and cache_entry['data'] and (now - cache_entry['timestamp'] < CACHE_TTL):
+        stats['hits'] += 1
         return cache_entry['data']
+    stats['misses'] += 1
 
     data = get_yaml_data(path)
     if data:
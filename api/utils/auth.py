@@ -1,22 +1,149 @@
 import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from functools import wraps
+
+import jwt
 from flask import request, jsonify
-from api.utils.storage import supabase, execute_with_retry
+from api.utils.storage import supabase, execute_with_retry, SUPABASE_URL
+
+# Tokens are verified locally when a signing key is available:
+# - SUPABASE_JWT_SECRET for projects on the legacy shared HS256 secret
+# - the project's JWKS (fetched once and cached) for asymmetric RS256/ES256 keys
+# Anything else falls back to supabase.auth.get_user().
+SUPABASE_JWT_SECRET = os.environ.get('SUPABASE_JWT_SECRET')
+JWT_AUDIENCE = 'authenticated'
+JWKS_LIFESPAN = 3600
+
+# token -> (user, household_id), kept until the token expires or AUTH_CACHE_TTL
+# passes (whichever is first), so profile changes are picked up within the TTL.
+AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', 1024))
+AUTH_CACHE_TTL = int(os.environ.get('AUTH_CACHE_TTL', 300))
+
+
+class AuthUser:
+    """Minimal user object (id, email) built from verified JWT claims."""
+
+    def __init__(self, id, email=None):
+        self.id = id
+        self.email = email
+
+
+class TokenCache:
+    """Bounded LRU of verified tokens with a per-entry expiry."""
+
+    def __init__(self, max_size=AUTH_CACHE_SIZE):
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token):
+        # Don't keep raw bearer tokens in memory
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, token, value, expires_at):
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (value, min(expires_at, time.time() + AUTH_CACHE_TTL))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+_token_cache = TokenCache()
+_jwks_client = None
+_jwks_lock = threading.Lock()
+
+
+def _get_jwks_client():
+    global _jwks_client
+    if _jwks_client is None:
+        with _jwks_lock:
+            if _jwks_client is None:
+                _jwks_client = jwt.PyJWKClient(
+                    f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+                    cache_jwk_set=True, lifespan=JWKS_LIFESPAN
+                )
+    return _jwks_client
+
+
+def _signing_key(token):
+    """(key, algorithm) to verify the token locally, or (None, alg) if we can't."""
+    alg = jwt.get_unverified_header(token).get('alg')
+    if alg == 'HS256':
+        return SUPABASE_JWT_SECRET, alg
+    if alg in ('RS256', 'ES256') and SUPABASE_URL:
+        try:
+            return _get_jwks_client().get_signing_key_from_jwt(token).key, alg
+        except jwt.PyJWKClientError as e:
+            # JWKS unreachable or key not published (e.g. mid-rotation)
+            print(f"Warning: JWKS lookup failed, verifying remotely: {e}")
+    return None, alg
+
+
+def verify_token(token):
+    """
+    Verify a Supabase access token.
+    Returns (user, expires_at); raises jwt.InvalidTokenError for a bad token.
+    Only hits the network when no local signing key is available.
+    """
+    key, alg = _signing_key(token)
+    if key:
+        claims = jwt.decode(token, key, algorithms=[alg], audience=JWT_AUDIENCE,
+                            options={'require': ['exp', 'sub']})
+        return AuthUser(claims['sub'], claims.get('email')), claims['exp']
+
+    user_res = supabase.auth.get_user(token)
+    if not user_res or not user_res.user:
+        raise jwt.InvalidTokenError("Invalid or expired token")
+    # Supabase vouched for the token; its exp claim still bounds the cache entry
+    try:
+        expires_at = jwt.decode(token, options={'verify_signature': False}).get('exp')
+    except jwt.PyJWTError:
+        expires_at = None
+    return user_res.user, expires_at or time.time() + AUTH_CACHE_TTL
+
+
+def get_auth_cache_stats():
+    return _token_cache.get_stats()
+
 
 def require_auth(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         # Support for disabling auth in local development
         if os.environ.get('DISABLE_AUTH') == 'true':
-            print("AUTH DISABLED: Providing mock user context")
             request.household_id = os.environ.get('DEFAULT_HOUSEHOLD_ID', "00000000-0000-0000-0000-000000000001")
             class MockUser:
                 id = "00000000-0000-0000-0000-000000000000"
                 email = "local@example.com"
             request.user = MockUser()
             return f(*args, **kwargs)
-        
-        print(f"AUTH CHECK: Checking headers for {request.path}")
 
         if not supabase:
             # Fallback for when SUPABASE is not configured yet
@@ -26,44 +153,49 @@ def require_auth(f):
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
             return jsonify({"status": "error", "message": "Missing or invalid Authorization header"}), 401
-        
+
         token = auth_header.split(' ')[1]
-        
+
         if token == 'MAGIC_TEST_TOKEN':
-             print("AUTH: Using Magic Test Token")
              request.household_id = "00000000-0000-0000-0000-000000000001"
              return f(*args, **kwargs)
-        
+
+        cached = _token_cache.get(token)
+        if cached:
+            request.user, request.household_id = cached
+            return f(*args, **kwargs)
+
         try:
-            # Verify the token with Supabase
-            user_res = supabase.auth.get_user(token)
-            if not user_res or not user_res.user:
+            try:
+                user, expires_at = verify_token(token)
+            except jwt.InvalidTokenError:
                 return jsonify({"status": "error", "message": "Invalid or expired token"}), 401
-            
+
             # Attach user info to request
-            request.user = user_res.user
+            request.user = user
 
             # Fetch household_id from profiles
             # Query by user_id (linked to auth.uid)
-            query = supabase.table("profiles").select("household_id").eq("user_id", user_res.user.id)
+            query = supabase.table("profiles").select("household_id").eq("user_id", user.id)
             profile_res = execute_with_retry(query)
-            
+
             if profile_res.data and len(profile_res.data) > 0:
                 request.household_id = profile_res.data[0].get('household_id')
-                print(f"AUTH SUCCESS: User {user_res.user.email} -> Household {request.household_id}")
+                _token_cache.set(token, (user, request.household_id), expires_at)
             else:
                 # BUG-006 FIX: Return 403 instead of using hardcoded fallback.
                 # This surfaces the profile gap so the frontend can redirect to onboarding.
-                print(f"AUTH DENIED: User {user_res.user.email} has no profile/household.")
+                # Not cached, so finishing onboarding takes effect on the next request.
+                print(f"AUTH DENIED: User {user.email} has no profile/household.")
                 return jsonify({
-                    "status": "error", 
+                    "status": "error",
                     "message": "Profile setup incomplete. Please complete onboarding.",
                     "code": "PROFILE_INCOMPLETE"
                 }), 403
-            
+
         except Exception as e:
             print(f"Auth verification error: {str(e)}")
             return jsonify({"status": "error", "message": "Unauthorized"}), 401
-            
+
         return f(*args, **kwargs)
     return decorated
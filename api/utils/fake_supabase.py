@@ -0,0 +1,346 @@
+"""
+In-process stand-in for the Supabase client, for load tests and offline runs.
+
+Enable it with SUPABASE_BACKEND=fake (see api/utils/storage.py). It implements
+the PostgREST query-builder subset this codebase uses:
+
+    table(name).select(cols) / insert / upsert(on_conflict=...) / update / delete
+    .eq .neq .lt .lte .gt .gte .in_ .is_ .not_ .match .order .limit .range
+    .execute()
+
+Rows live in memory (optionally seeded from FAKE_SUPABASE_SEED, a JSON file of
+{table: [rows]}). Every execute() sleeps FAKE_SUPABASE_LATENCY_MS to model a
+network round-trip and is counted in stats(), so request cost can be measured
+as a function of round-trips. Builders expose http_method/path/params like the
+real ones, so the request-scoped read cache in storage.execute_with_retry
+behaves the same against the fake.
+
+There is no auth server: run the app with DISABLE_AUTH=true or the
+MAGIC_TEST_TOKEN bearer token.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+# PostgREST's default on_conflict target is the primary key
+PRIMARY_KEYS = {
+    'recipes': ('id', 'household_id'),
+}
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeStore:
+    """Thread-safe in-memory tables: {table: [row, ...]}."""
+
+    def __init__(self, tables=None, latency_ms=0.0):
+        self.tables = {name: [dict(r) for r in rows] for name, rows in (tables or {}).items()}
+        self.latency = max(float(latency_ms or 0), 0.0) / 1000
+        self.lock = threading.Lock()
+        self.calls = Counter()
+
+    def snapshot(self):
+        with self.lock:
+            return copy.deepcopy(self.tables)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'round_trips': sum(self.calls.values()),
+                'by_table': {f"{method} {table}": n for (method, table), n in sorted(self.calls.items())},
+                'rows': {name: len(rows) for name, rows in self.tables.items()},
+                'latency_ms': self.latency * 1000,
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls.clear()
+
+
+def _text(value):
+    """Value as PostgREST would compare it in a filter string."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(',', ':'))
+    return str(value)
+
+
+def _compare(row_value, value):
+    """-1/0/1 comparing a stored value with a filter operand (None if either is null)."""
+    if row_value is None or value is None:
+        return None
+    if isinstance(row_value, (int, float)) and not isinstance(row_value, bool):
+        try:
+            value = float(value)
+            return (row_value > value) - (row_value < value)
+        except (TypeError, ValueError):
+            pass
+    a, b = _text(row_value), _text(value)
+    if isinstance(row_value, (dict, list)):
+        try:
+            b = _text(json.loads(value)) if isinstance(value, str) else b
+        except ValueError:
+            pass
+    return (a > b) - (a < b)
+
+
+_OPERATORS = {
+    'eq': lambda c: c == 0,
+    'neq': lambda c: c != 0,
+    'lt': lambda c: c < 0,
+    'lte': lambda c: c <= 0,
+    'gt': lambda c: c > 0,
+    'gte': lambda c: c >= 0,
+}
+
+
+def _parse_columns(columns):
+    """[(output_key, column, json_key)] for a select string; None means '*'."""
+    parsed = []
+    for part in (columns or '*').split(','):
+        part = part.strip()
+        if not part or part == '*':
+            return None if part == '*' else parsed
+        alias, _, expr = part.rpartition(':')
+        column, json_key = expr, None
+        for arrow in ('->>', '->'):
+            if arrow in expr:
+                column, json_key = expr.split(arrow, 1)
+                break
+        parsed.append((alias or json_key or column, column.strip(), json_key))
+    return parsed
+
+
+class FakeQueryBuilder:
+    """One table request; filters and modifiers chain like postgrest-py's builders."""
+
+    def __init__(self, store, table):
+        self._store = store
+        self._table = table
+        self._action = 'select'
+        self._columns = None
+        self._payload = None
+        self._on_conflict = None
+        self._filters = []
+        self._orders = []
+        self._limit = None
+        self._offset = 0
+        self._negate = False
+        self._params = []
+        self.http_method = 'GET'
+        self.path = f'/{table}'
+        self.headers = {}
+
+    @property
+    def params(self):
+        return '&'.join(self._params)
+
+    # -- actions ---------------------------------------------------------------
+
+    def select(self, *columns, count=None):
+        self._action, self.http_method = 'select', 'GET'
+        self._columns = _parse_columns(','.join(columns) or '*')
+        self._params.append(f"select={','.join(columns) or '*'}")
+        return self
+
+    def insert(self, rows, **kwargs):
+        self._action, self.http_method, self._payload = 'insert', 'POST', rows
+        self.headers['Prefer'] = 'return=representation'
+        return self
+
+    def upsert(self, rows, on_conflict='', **kwargs):
+        self._action, self.http_method, self._payload = 'upsert', 'POST', rows
+        self._on_conflict = tuple(c.strip() for c in on_conflict.split(',') if c.strip()) or None
+        self.headers['Prefer'] = 'return=representation,resolution=merge-duplicates'
+        return self
+
+    def update(self, values, **kwargs):
+        self._action, self.http_method, self._payload = 'update', 'PATCH', values
+        return self
+
+    def delete(self, **kwargs):
+        self._action, self.http_method = 'delete', 'DELETE'
+        return self
+
+    # -- filters ---------------------------------------------------------------
+
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def _filter(self, op, column, value):
+        negate, self._negate = self._negate, False
+        self._filters.append((op, column, value, negate))
+        self._params.append(f"{column}={'not.' if negate else ''}{op}.{_text(value)}")
+        return self
+
+    def eq(self, column, value): return self._filter('eq', column, value)
+    def neq(self, column, value): return self._filter('neq', column, value)
+    def lt(self, column, value): return self._filter('lt', column, value)
+    def lte(self, column, value): return self._filter('lte', column, value)
+    def gt(self, column, value): return self._filter('gt', column, value)
+    def gte(self, column, value): return self._filter('gte', column, value)
+    def in_(self, column, values): return self._filter('in', column, list(values))
+    def is_(self, column, value): return self._filter('is', column, value)
+
+    def match(self, query):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    # -- modifiers -------------------------------------------------------------
+
+    def order(self, column, *, desc=False, nullsfirst=None, **kwargs):
+        self._orders.append((column, desc, desc if nullsfirst is None else nullsfirst))
+        self._params.append(f"order={column}.{'desc' if desc else 'asc'}")
+        return self
+
+    def limit(self, size, **kwargs):
+        self._limit = size
+        self._params.append(f"limit={size}")
+        return self
+
+    def range(self, start, end, **kwargs):
+        self._offset, self._limit = start, end - start + 1
+        self._params.append(f"offset={start}&limit={end - start + 1}")
+        return self
+
+    # -- execution -------------------------------------------------------------
+
+    def _matches(self, row):
+        for op, column, value, negate in self._filters:
+            row_value = row.get(column)
+            if op == 'is':
+                ok = row_value is None if _text(value) in (None, 'null') else _text(row_value) == _text(value)
+            elif op == 'in':
+                ok = row_value is not None and _text(row_value) in {_text(v) for v in value}
+            else:
+                c = _compare(row_value, value)
+                ok = c is not None and _OPERATORS[op](c)
+            if ok == negate:
+                return False
+        return True
+
+    def _project(self, row):
+        if self._columns is None:
+            return copy.deepcopy(row)
+        out = {}
+        for key, column, json_key in self._columns:
+            value = row.get(column)
+            if json_key is not None:
+                value = value.get(json_key) if isinstance(value, dict) else None
+            out[key] = copy.deepcopy(value)
+        return out
+
+    def _sorted(self, rows):
+        for column, desc, nulls_first in reversed(self._orders):
+            present = sorted((r for r in rows if r.get(column) is not None),
+                             key=lambda r: _text(r[column]) if not isinstance(r[column], (int, float)) else r[column],
+                             reverse=desc)
+            nulls = [r for r in rows if r.get(column) is None]
+            rows = nulls + present if nulls_first else present + nulls
+        return rows
+
+    def _conflict_keys(self):
+        return self._on_conflict or PRIMARY_KEYS.get(self._table, ('id',))
+
+    @staticmethod
+    def _new_row(values):
+        now = datetime.now(timezone.utc).isoformat()
+        row = {'id': str(uuid.uuid4()), 'created_at': now, 'updated_at': now}
+        row.update(copy.deepcopy(values))
+        return row
+
+    def execute(self):
+        store = self._store
+        if store.latency:
+            time.sleep(store.latency)
+        with store.lock:
+            store.calls[(self.http_method, self._table)] += 1
+            rows = store.tables.setdefault(self._table, [])
+
+            if self._action == 'select':
+                found = self._sorted([r for r in rows if self._matches(r)])
+                end = None if self._limit is None else self._offset + self._limit
+                return FakeResponse([self._project(r) for r in found[self._offset:end]])
+
+            if self._action in ('insert', 'upsert'):
+                payload = self._payload if isinstance(self._payload, list) else [self._payload]
+                keys = self._conflict_keys()
+                written = []
+                for values in payload:
+                    existing = None
+                    if all(k in values for k in keys):
+                        existing = next((r for r in rows if all(_text(r.get(k)) == _text(values[k]) for k in keys)), None)
+                    if existing is not None and self._action == 'insert':
+                        raise Exception(f"duplicate key value violates unique constraint on {self._table} ({', '.join(keys)})")
+                    if existing is not None:
+                        existing.update(copy.deepcopy(values))
+                        existing['updated_at'] = datetime.now(timezone.utc).isoformat()
+                        written.append(existing)
+                    else:
+                        row = self._new_row(values)
+                        rows.append(row)
+                        written.append(row)
+                return FakeResponse(copy.deepcopy(written))
+
+            if self._action == 'update':
+                updated = []
+                for row in rows:
+                    if self._matches(row):
+                        row.update(copy.deepcopy(self._payload))
+                        row['updated_at'] = datetime.now(timezone.utc).isoformat()
+                        updated.append(row)
+                return FakeResponse(copy.deepcopy(updated))
+
+            if self._action == 'delete':
+                deleted = [r for r in rows if self._matches(r)]
+                store.tables[self._table] = [r for r in rows if not self._matches(r)]
+                return FakeResponse(deleted)
+
+        raise ValueError(f"Unsupported action {self._action}")
+
+
+class FakeAuth:
+    def get_user(self, token):
+        raise Exception("The fake Supabase backend has no auth server; use DISABLE_AUTH=true or MAGIC_TEST_TOKEN")
+
+
+class FakeSupabaseClient:
+    """Drop-in for the parts of supabase.Client the API uses."""
+
+    def __init__(self, tables=None, latency_ms=0.0):
+        self.store = FakeStore(tables, latency_ms)
+        self.auth = FakeAuth()
+
+    def table(self, name):
+        return FakeQueryBuilder(self.store, name)
+
+    from_ = table
+
+    def stats(self):
+        return self.store.stats()
+
+
+def create_fake_client():
+    """Fake client configured from FAKE_SUPABASE_SEED / FAKE_SUPABASE_LATENCY_MS."""
+    tables = None
+    seed = os.environ.get('FAKE_SUPABASE_SEED')
+    if seed:
+        with open(seed) as f:
+            tables = json.load(f)
+    return FakeSupabaseClient(tables, float(os.environ.get('FAKE_SUPABASE_LATENCY_MS', 0)))
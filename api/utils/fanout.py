@@ -0,0 +1,82 @@
+"""
+Concurrent fan-out for independent storage reads.
+
+Routes like /api/status issue several Supabase round-trips that don't depend
+on each other. fan_out() runs them on a shared thread pool and joins them, so
+the route waits for the slowest query instead of the sum of all of them.
+
+Each worker runs inside a copy of the caller's request context, so
+get_household_id() and the request-scoped read cache behave exactly as they
+would inline. Calls made from a worker (nested fan-out) or outside a request
+run serially to avoid exhausting the pool.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g, has_app_context, has_request_context, copy_current_request_context
+
+FANOUT_WORKERS = int(os.environ.get('STORAGE_FANOUT_WORKERS', 8))
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker_state = threading.local()
+
+# Request-scoped state on flask.g that workers share with the caller
+_SHARED_G_ATTRS = (('_storage_read_cache', dict), ('_query_trace', list))
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='storage-fanout')
+    return _executor
+
+
+def _wrap(call, parent_state):
+    @copy_current_request_context
+    def run():
+        _worker_state.active = True
+        # Share the caller's request-scoped read cache and query trace
+        # (see storage.execute_with_retry)
+        for name, value in parent_state.items():
+            setattr(g, name, value)
+        try:
+            return call()
+        finally:
+            _worker_state.active = False
+    return run
+
+
+def fan_out(*calls):
+    """
+    Run zero-argument callables concurrently and return their results in order.
+
+    All calls are allowed to finish; the first exception (in argument order)
+    is then re-raised. Wrap a call in its own try/except if a failure should
+    not abort the others' results.
+    """
+    if len(calls) <= 1 or not has_request_context() or getattr(_worker_state, 'active', False):
+        return [call() for call in calls]
+
+    parent_state = {}
+    if has_app_context():
+        parent_state = {name: g.setdefault(name, default()) for name, default in _SHARED_G_ATTRS}
+
+    executor = _get_executor()
+    futures = [executor.submit(_wrap(call, parent_state)) for call in calls]
+
+    results, first_error = [], None
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(None)
+            if first_error is None:
+                first_error = e
+    if first_error is not None:
+        raise first_error
+    return results
@@ -0,0 +1,242 @@
+"""
+Pooled HTTP transport for the Supabase client.
+
+Every PostgREST and GoTrue call from this process goes through one shared
+httpx transport, so TLS connections to Supabase are kept alive and reused
+across requests instead of being re-negotiated per client/session.
+
+Tuning comes from the environment (defaults in parentheses):
+- SUPABASE_HTTP_MAX_CONNECTIONS (20): total connections in the pool
+- SUPABASE_HTTP_MAX_KEEPALIVE (10): idle connections kept open
+- SUPABASE_HTTP_KEEPALIVE_EXPIRY (30): seconds an idle connection is kept
+- SUPABASE_HTTP_POOL_TIMEOUT (10): seconds to wait for a free connection
+- SUPABASE_HTTP2 (false): opt in to HTTP/2. Off by default because of
+  "ConnectionTerminated error_code:ErrorCodes.COMPRESSION_ERROR" with
+  SSL/LibreSSL on macOS.
+
+Pool metrics (in use, idle, waiting, connect/reuse counts, wait time) are
+available from get_pool_stats() and exposed through /api/debug.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+from gotrue.http_clients import SyncClient as AuthHttpClient
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient as PostgrestHttpClient
+from supabase import Client, ClientOptions
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+
+# First httpcore trace event after the connection has been acquired from the pool
+_ACQUIRED_EVENTS = (
+    'connection.connect_tcp.started',
+    'http11.send_request_headers.started',
+    'http2.send_request_headers.started',
+)
+
+
+def _env_number(name, default, cast=int):
+    try:
+        return cast(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        print(f"WARNING: Invalid value for {name}, using {default}")
+        return default
+
+
+class TransportConfig:
+    """Pool settings for the shared Supabase transport."""
+
+    def __init__(self, max_connections=20, max_keepalive=10, keepalive_expiry=30.0,
+                 pool_timeout=10.0, http2=False):
+        self.max_connections = max_connections
+        self.max_keepalive = min(max_keepalive, max_connections)
+        self.keepalive_expiry = keepalive_expiry
+        self.pool_timeout = pool_timeout
+        self.http2 = http2
+
+    @classmethod
+    def from_env(cls) -> 'TransportConfig':
+        return cls(
+            max_connections=_env_number('SUPABASE_HTTP_MAX_CONNECTIONS', 20),
+            max_keepalive=_env_number('SUPABASE_HTTP_MAX_KEEPALIVE', 10),
+            keepalive_expiry=_env_number('SUPABASE_HTTP_KEEPALIVE_EXPIRY', 30.0, float),
+            pool_timeout=_env_number('SUPABASE_HTTP_POOL_TIMEOUT', 10.0, float),
+            http2=os.environ.get('SUPABASE_HTTP2', 'false').strip().lower() in _TRUE_VALUES,
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            'max_connections': self.max_connections,
+            'max_keepalive': self.max_keepalive,
+            'keepalive_expiry': self.keepalive_expiry,
+            'pool_timeout': self.pool_timeout,
+            'http2': self.http2,
+        }
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """
+    httpx transport that records pool usage.
+
+    Wait time is measured from the start of the request until httpcore either
+    opens a new TCP connection or starts writing on a reused one.
+    """
+
+    def __init__(self, config: TransportConfig):
+        super().__init__(http2=config.http2, limits=config.limits)
+        self.config = config
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'in_flight': 0,
+            'errors': 0,
+            'connections_opened': 0,
+            'connections_reused': 0,
+            'wait_time_total_ms': 0.0,
+            'wait_time_max_ms': 0.0,
+        }
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        acquired = []
+        parent_trace = request.extensions.get('trace')
+
+        def trace(event_name, info):
+            if not acquired and event_name in _ACQUIRED_EVENTS:
+                acquired.append(event_name)
+                self._record_acquire(event_name, (time.perf_counter() - started) * 1000)
+            if parent_trace:
+                parent_trace(event_name, info)
+
+        request.extensions['trace'] = trace
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['in_flight'] += 1
+        try:
+            return super().handle_request(request)
+        except Exception:
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats['in_flight'] -= 1
+
+    def close(self) -> None:
+        # Shared by every client in the process; closing one client must not
+        # drop the pool for the others. Use shutdown() to really close it.
+        pass
+
+    def shutdown(self) -> None:
+        super().close()
+
+    def _record_acquire(self, event_name, wait_ms):
+        with self._lock:
+            if event_name == 'connection.connect_tcp.started':
+                self._stats['connections_opened'] += 1
+            else:
+                self._stats['connections_reused'] += 1
+            self._stats['wait_time_total_ms'] += wait_ms
+            self._stats['wait_time_max_ms'] = max(self._stats['wait_time_max_ms'], wait_ms)
+
+    def stats(self) -> Dict[str, object]:
+        """Snapshot of counters plus live pool state."""
+        pool = self._pool
+        connections = list(getattr(pool, 'connections', []))
+        idle = sum(1 for c in connections if c.is_idle())
+        with self._lock:
+            snapshot = dict(self._stats)
+        acquired = snapshot['connections_opened'] + snapshot['connections_reused']
+        snapshot['wait_time_avg_ms'] = round(snapshot['wait_time_total_ms'] / acquired, 3) if acquired else 0.0
+        snapshot['wait_time_total_ms'] = round(snapshot['wait_time_total_ms'], 3)
+        snapshot['wait_time_max_ms'] = round(snapshot['wait_time_max_ms'], 3)
+        snapshot.update({
+            'connections': len(connections),
+            'idle': idle,
+            'in_use': len(connections) - idle,
+            'waiting': sum(1 for r in list(getattr(pool, '_requests', [])) if r.is_queued()),
+        })
+        return snapshot
+
+
+_transport: Optional[InstrumentedTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> InstrumentedTransport:
+    """Process-wide transport, created from the environment on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                config = TransportConfig.from_env()
+                _transport = InstrumentedTransport(config)
+                print(f"Supabase HTTP pool configured: {config.as_dict()}")
+    return _transport
+
+
+def get_pool_stats() -> Optional[Dict[str, object]]:
+    """Pool metrics for /api/debug (None until the transport is created)."""
+    if _transport is None:
+        return None
+    return {'config': _transport.config.as_dict(), **_transport.stats()}
+
+
+def _timeout(timeout) -> httpx.Timeout:
+    """Request timeout with the pool wait bounded by SUPABASE_HTTP_POOL_TIMEOUT."""
+    pool_timeout = get_transport().config.pool_timeout
+    if isinstance(timeout, httpx.Timeout):
+        return httpx.Timeout(timeout.read, connect=timeout.connect, write=timeout.write, pool=pool_timeout)
+    return httpx.Timeout(timeout, pool=pool_timeout)
+
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    """PostgREST client whose session uses the shared transport."""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return PostgrestHttpClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=_timeout(timeout),
+            transport=get_transport(),
+            follow_redirects=True,
+        )
+
+
+class PooledSupabaseClient(Client):
+    """Supabase client wired to the shared transport for PostgREST and auth."""
+
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout=None, verify=True, proxy=None):
+        kwargs = {'timeout': timeout} if timeout is not None else {}
+        return PooledPostgrestClient(rest_url, headers=headers, schema=schema, verify=verify, proxy=proxy, **kwargs)
+
+    @staticmethod
+    def _init_supabase_auth_client(auth_url, client_options, verify=True, proxy=None):
+        from supabase._sync.auth_client import SyncSupabaseAuthClient
+        return SyncSupabaseAuthClient(
+            url=auth_url,
+            auto_refresh_token=client_options.auto_refresh_token,
+            persist_session=client_options.persist_session,
+            storage=client_options.storage,
+            headers=client_options.headers,
+            flow_type=client_options.flow_type,
+            http_client=AuthHttpClient(transport=get_transport(), follow_redirects=True),
+        )
+
+
+def create_pooled_client(url: str, key: str, options: Optional[ClientOptions] = None) -> Client:
+    """Drop-in replacement for supabase.create_client using the pooled transport."""
+    return PooledSupabaseClient.create(supabase_url=url, supabase_key=key, options=options)
@@ -0,0 +1,200 @@
+"""
+Process-level metrics in the Prometheus text format (served at /api/metrics).
+
+Request latency and Supabase query counts are recorded on the hot path by
+api/utils/tracing.py: one dict update under a lock per request and per query.
+Cache effectiveness (SWR caches, the YAML CACHE, the prep-task LRU, the
+draft cache, pre-generated week proposals, the auth token cache, the HTTP
+pool) and the pre-generation queue are read from their own counters when the
+endpoint is scraped, so they cost nothing per request.
+
+Metrics are per process: with several workers, scrape each one (or sum).
+"""
+
+import threading
+from bisect import bisect_left
+
+# Request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+# (blueprint, route, method, status) -> [bucket counts..., +Inf count, sum]
+_requests = {}
+# (table, method) -> [queries, errors, retries, cached, seconds]
+_queries = {}
+
+
+def observe_request(blueprint, route, method, status, seconds):
+    """Record one request against its route template (not the raw path)."""
+    key = (blueprint or 'app', route or 'unmatched', method, str(status))
+    i = bisect_left(LATENCY_BUCKETS, seconds)
+    with _lock:
+        entry = _requests.get(key)
+        if entry is None:
+            entry = _requests[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        entry[i] += 1
+        entry[-1] += seconds
+
+
+def observe_query(table, method, seconds, retries=0, cached=False, error=False):
+    key = (table, method)
+    with _lock:
+        entry = _queries.get(key)
+        if entry is None:
+            entry = _queries[key] = [0, 0, 0, 0, 0.0]
+        if cached:
+            entry[3] += 1
+            return
+        entry[0] += 1
+        entry[1] += 1 if error else 0
+        entry[2] += retries
+        entry[4] += seconds
+
+
+def reset():
+    with _lock:
+        _requests.clear()
+        _queries.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+class _Writer:
+    """Collects samples grouped per metric family, as the text format requires."""
+
+    def __init__(self):
+        self._families = {}  # name -> (header lines, sample lines)
+
+    def declare(self, name, kind, help_text):
+        if name not in self._families:
+            self._families[name] = ([f'# HELP {name} {help_text}', f'# TYPE {name} {kind}'], [])
+        return self._families[name][1]
+
+    def metric(self, name, kind, help_text, value, **labels):
+        self.declare(name, kind, help_text).append(f'{name}{_labels(**labels)} {value}')
+
+    def text(self):
+        return ''.join('\n'.join(header + samples) + '\n' for header, samples in self._families.values())
+
+
+def _write_requests(w, requests):
+    name = 'mealplanner_request_duration_seconds'
+    for (blueprint, route, method, status), entry in sorted(requests.items()):
+        labels = dict(blueprint=blueprint, route=route, method=method, status=status)
+        samples = w.declare(name, 'histogram', 'Request latency by route template.')
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, entry):
+            cumulative += count
+            samples.append(f'{name}_bucket{_labels(**labels, le=bound)} {cumulative}')
+        cumulative += entry[len(LATENCY_BUCKETS)]
+        samples.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {cumulative}')
+        samples.append(f'{name}_sum{_labels(**labels)} {entry[-1]:.6f}')
+        samples.append(f'{name}_count{_labels(**labels)} {cumulative}')
+
+
+def _write_queries(w, queries):
+    for (table, method), (count, errors, retries, cached, seconds) in sorted(queries.items()):
+        w.metric('mealplanner_supabase_queries_total', 'counter',
+                 'Supabase queries sent (request-cache hits excluded).', count, table=table, method=method)
+        w.metric('mealplanner_supabase_query_errors_total', 'counter',
+                 'Supabase queries that failed after retries.', errors, table=table, method=method)
+        w.metric('mealplanner_supabase_query_retries_total', 'counter',
+                 'Supabase query retries.', retries, table=table, method=method)
+        w.metric('mealplanner_supabase_query_cache_hits_total', 'counter',
+                 'Reads served from the request-scoped cache.', cached, table=table, method=method)
+        w.metric('mealplanner_supabase_query_seconds_total', 'counter',
+                 'Time spent in Supabase queries.', f'{seconds:.6f}', table=table, method=method)
+
+
+def _cache_lookups(w, cache, result, count):
+    w.metric('mealplanner_cache_lookups_total', 'counter',
+             'Cache lookups by result (hit, stale, miss).', count, cache=cache, result=result)
+
+
+def _cache_entries(w, cache, count):
+    w.metric('mealplanner_cache_entries', 'gauge', 'Entries currently held by a cache.', count, cache=cache)
+
+
+def _write_caches(w):
+    from api.services.draft_cache import draft_cache
+    from api.services.pregeneration import get_stats as get_provisional_stats
+    from api.utils import CACHE, CACHE_STATS
+    from api.utils.auth import get_auth_cache_stats
+    from api.utils.storage import SWR_CACHES
+    from scripts.generate_prep_steps import _get_prep_tasks_cached
+
+    for name, cache in sorted(SWR_CACHES.items()):
+        stats = cache.get_stats()
+        for result, key in (('hit', 'hits'), ('stale', 'stale'), ('miss', 'misses')):
+            _cache_lookups(w, f'swr_{name}', result, stats[key])
+        _cache_entries(w, f'swr_{name}', stats['entries'])
+
+    for key in sorted(CACHE):
+        stats = CACHE_STATS.get(key, {})
+        _cache_lookups(w, f'yaml_{key}', 'hit', stats.get('hits', 0))
+        _cache_lookups(w, f'yaml_{key}', 'miss', stats.get('misses', 0))
+
+    info = _get_prep_tasks_cached.cache_info()
+    _cache_lookups(w, 'prep_tasks', 'hit', info.hits)
+    _cache_lookups(w, 'prep_tasks', 'miss', info.misses)
+    _cache_entries(w, 'prep_tasks', info.currsize)
+
+    drafts = draft_cache.get_stats()
+    _cache_lookups(w, 'draft', 'hit', drafts['hits'])
+    _cache_lookups(w, 'draft', 'miss', drafts['misses'])
+    _cache_entries(w, 'draft', drafts['entries'])
+
+    # Pre-generated rows live in the database: lookups only, no entry count
+    for kind, stats in sorted(get_provisional_stats().items()):
+        _cache_lookups(w, f'provisional_{kind}', 'hit', stats['hits'])
+        _cache_lookups(w, f'provisional_{kind}', 'miss', stats['misses'])
+
+    auth = get_auth_cache_stats()
+    _cache_lookups(w, 'auth_token', 'hit', auth['hits'])
+    _cache_lookups(w, 'auth_token', 'miss', auth['misses'])
+    _cache_entries(w, 'auth_token', auth['entries'])
+
+
+def _write_pool(w):
+    from api.utils.http_transport import get_pool_stats
+
+    stats = get_pool_stats()
+    if not stats:
+        return
+    for key, value in sorted(stats.items()):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        w.metric(f'mealplanner_http_pool_{key}', 'gauge', f'Supabase HTTP pool {key.replace("_", " ")}.', value)
+
+
+def _write_jobs(w):
+    from api.services.pregeneration import job_queue
+
+    stats = job_queue.get_stats()
+    for result in ('completed', 'failed'):
+        w.metric('mealplanner_pregeneration_jobs_total', 'counter',
+                 'Background pre-generation jobs by result.', stats[result], result=result)
+    w.metric('mealplanner_pregeneration_jobs_pending', 'gauge',
+             'Pre-generation jobs queued or running.', stats['pending'])
+
+
+def render():
+    """All metrics as Prometheus exposition text."""
+    with _lock:
+        requests = {k: list(v) for k, v in _requests.items()}
+        queries = {k: list(v) for k, v in _queries.items()}
+    w = _Writer()
+    _write_requests(w, requests)
+    _write_queries(w, queries)
+    _write_caches(w)
+    _write_jobs(w)
+    _write_pool(w)
+    return w.text()
@@ -2,6 +2,7 @@ import os
 import yaml
 from pathlib import Path
 from supabase import create_client, Client
+from api.utils import storage
 from api.utils.storage import execute_with_retry
 
 # Initialize Supabase client with SERVICE ROLE for onboarding
@@ -10,6 +11,8 @@ SUPABASE_URL = os.environ.get('NEXT_PUBLIC_SUPABASE_URL') or os.environ.get('SUP
 SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_ROLE_KEY') or os.environ.get('NEXT_PUBLIC_SUPABASE_ANON_KEY') or os.environ.get('SUPABASE_ANON_KEY')
 
 supabase_admin: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY) if SUPABASE_URL and SUPABASE_SERVICE_KEY else None
+if storage.SUPABASE_BACKEND == 'fake':
+    supabase_admin = storage.supabase
 
 def onboard_new_user(user_id, email):
     """
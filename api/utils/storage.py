@@ -1,19 +1,13 @@
 import os
-from flask import request
-from supabase import create_client
+import re
+import copy
+import hashlib
+import json
+import threading
+from flask import request, g, has_app_context, has_request_context
 from pathlib import Path
 import yaml
-import httpx
-
-# MONKEY PATCH: Disable HTTP/2 in httpx to fix "ConnectionTerminated error_code:ErrorCodes.COMPRESSION_ERROR"
-# This is required because of SSL/LibreSSL issues on macOS affecting HTTP/2 negotiation with Supabase.
-_original_httpx_client_init = httpx.Client.__init__
-
-def _patched_httpx_client_init(self, *args, **kwargs):
-    kwargs['http2'] = False
-    _original_httpx_client_init(self, *args, **kwargs)
-
-httpx.Client.__init__ = _patched_httpx_client_init
+from api.utils.http_transport import create_pooled_client
 
 # Load local environment variables if they exist
 try:
@@ -39,33 +33,133 @@ SUPABASE_SERVICE_KEY = _service_role_key or _anon_key
 # Flag to verify we have write access
 IS_SERVICE_ROLE = bool(_service_role_key)
 
-if not SUPABASE_URL:
-    print("WARNING: SUPABASE_URL is missing from environment!")
-if not SUPABASE_SERVICE_KEY:
-    print("WARNING: SUPABASE_SERVICE_KEY is missing from environment!")
-if not IS_SERVICE_ROLE:
-    print("WARNING: SUPABASE_SERVICE_ROLE_KEY is missing. Backend is running with Public/Anon permissions only. Writes may fail RLS.")
+# SUPABASE_BACKEND=fake swaps in the in-process stand-in (api/utils/fake_supabase.py)
+# for load tests and offline runs; anything else talks to the real project.
+SUPABASE_BACKEND = os.environ.get('SUPABASE_BACKEND', 'supabase').lower()
 
 supabase = None
 init_error = None
 
-if SUPABASE_URL and SUPABASE_SERVICE_KEY:
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-        print("Supabase client initialized successfully.")
-    except Exception as e:
-        init_error = str(e)
-        print(f"ERROR: Failed to initialize Supabase client: {e}")
+if SUPABASE_BACKEND == 'fake':
+    from api.utils.fake_supabase import create_fake_client
+    supabase = create_fake_client()
+    IS_SERVICE_ROLE = True
+    print(f"Using fake Supabase backend (latency {supabase.store.latency * 1000:g} ms per round-trip).")
+else:
+    if not SUPABASE_URL:
+        print("WARNING: SUPABASE_URL is missing from environment!")
+    if not SUPABASE_SERVICE_KEY:
+        print("WARNING: SUPABASE_SERVICE_KEY is missing from environment!")
+    if not IS_SERVICE_ROLE:
+        print("WARNING: SUPABASE_SERVICE_ROLE_KEY is missing. Backend is running with Public/Anon permissions only. Writes may fail RLS.")
+
+    if SUPABASE_URL and SUPABASE_SERVICE_KEY:
+        try:
+            supabase = create_pooled_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+            print("Supabase client initialized successfully.")
+        except Exception as e:
+            init_error = str(e)
+            print(f"ERROR: Failed to initialize Supabase client: {e}")
 
 import time
+from api.utils.tracing import record_query
+
+# =============================================================================
+# Request-scoped identity map (unit of work)
+# =============================================================================
+# A single request (draft, log-meal, confirm-veg...) reads the same inventory,
+# history, config and meal_plans rows several times. Reads are memoized on
+# flask.g keyed by the query shape (table path + PostgREST params, which
+# include household_id). Any write through execute_with_retry drops the
+# entries for the table it touched, so later reads in the same request see it.
+# =============================================================================
+
+_READ_METHODS = {"GET", "HEAD"}
+
+def _query_shape(query):
+    """Return (http_method, table, cache_key) for a PostgREST builder, or None.
+
+    Anything that does not look like a real query builder (e.g. MagicMock in
+    tests) is not cacheable and falls through to a plain execute().
+    """
+    method = getattr(query, 'http_method', None)
+    path = getattr(query, 'path', None)
+    if not isinstance(method, str) or not isinstance(path, str):
+        return None
+    table = path.strip('/').split('/')[0]
+    headers = getattr(query, 'headers', None) or {}
+    try:
+        accept = headers.get('Accept')
+        prefer = headers.get('Prefer')
+    except Exception:
+        accept = prefer = None
+    key = (method, path, str(getattr(query, 'params', '')), accept, prefer)
+    return method, table, key
+
+def _request_cache():
+    """Per-request read cache, or None outside a Flask app context."""
+    if not has_app_context():
+        return None
+    cache = g.get('_storage_read_cache')
+    if cache is None:
+        cache = {}
+        g._storage_read_cache = cache
+    return cache
+
+def invalidate_request_cache(table=None):
+    """Drop memoized reads for `table` (or all tables) in the current request."""
+    cache = _request_cache()
+    if cache is None:
+        return
+    if table is None:
+        cache.clear()
+    else:
+        cache.pop(table, None)
 
 def execute_with_retry(query, max_retries=3, delay=0.5):
     """
     Execute a Supabase query with retry logic for transient network errors.
     Handles [Errno 35] Resource temporarily unavailable and other httpx errors.
+
+    Reads are served from the request-scoped identity map when the same query
+    already ran in this request; writes invalidate the touched table. Every
+    query (including cache hits) is recorded in the request trace
+    (see api/utils/tracing.py).
     """
+    started = time.perf_counter()
+    shape = _query_shape(query)
+    cache = _request_cache() if shape else None
+    if cache is not None:
+        method, table, key = shape
+        if method in _READ_METHODS:
+            hit = cache.get(table, {}).get(key)
+            if hit is not None:
+                record_query(shape, query, hit, started, cached=True)
+                # Callers mutate res.data in place; never hand out the cached copy
+                return copy.deepcopy(hit)
+        elif table == 'rpc':
+            # RPCs can touch anything
+            cache.clear()
+        else:
+            cache.pop(table, None)
+
+    attempts = []
+    try:
+        res = _execute(query, max_retries, delay, attempts)
+    except Exception as e:
+        record_query(shape, query, None, started, retries=max(len(attempts) - 1, 0), error=e)
+        raise
+    record_query(shape, query, res, started, retries=len(attempts) - 1)
+
+    if cache is not None and shape[0] in _READ_METHODS and res is not None:
+        cache.setdefault(shape[1], {})[shape[2]] = copy.deepcopy(res)
+    return res
+
+def _execute(query, max_retries, delay, attempts=None):
     last_exception = None
     for i in range(max_retries):
+        if attempts is not None:
+            attempts.append(i)
         try:
             return query.execute()
         except Exception as e:
@@ -92,6 +186,9 @@ def get_household_id():
 # Benefits: Fast responses even when cache expired, eventual consistency
 # =============================================================================
 
+# name -> SWRCache, for metrics
+SWR_CACHES = {}
+
 class SWRCache:
     """
     Stale-While-Revalidate cache for serverless environments.
@@ -101,11 +198,15 @@ class SWRCache:
     - After stale_ttl: Data is too old, must refresh synchronously
     """
 
-    def __init__(self, fresh_ttl=300, stale_ttl=600):
+    def __init__(self, fresh_ttl=300, stale_ttl=600, name=None):
         self._cache = {}
         self._fresh_ttl = fresh_ttl   # 5 minutes default
         self._stale_ttl = stale_ttl   # 10 minutes default (stale window)
         self._pending_refresh = set()  # Keys marked for refresh
+        self.hits = self.stale = self.misses = 0
+        if name:
+            # Named caches are reported by /api/metrics
+            SWR_CACHES[name] = self
 
     def get(self, key):
         """
@@ -114,19 +215,23 @@ class SWRCache:
         """
         entry = self._cache.get(key)
         if not entry:
+            self.misses += 1
             return None, 'miss'
 
         value, timestamp = entry
         age = time.time() - timestamp
 
         if age < self._fresh_ttl:
+            self.hits += 1
             return value, 'fresh'
         elif age < self._stale_ttl:
             # Mark for background refresh on next opportunity
             self._pending_refresh.add(key)
+            self.stale += 1
             return value, 'stale'
         else:
             # Too stale, treat as miss
+            self.misses += 1
             return None, 'miss'
 
     def set(self, key, value):
@@ -152,21 +257,141 @@ class SWRCache:
         return {
             'entries': len(self._cache),
             'pending_refresh': len(self._pending_refresh),
-            'keys': list(self._cache.keys())
+            'keys': list(self._cache.keys()),
+            'hits': self.hits,
+            'stale': self.stale,
+            'misses': self.misses,
         }
 
 
-# TD-008 FIX: Cache for pending recipes (per-household, with SWR)
-_pending_recipes_cache = SWRCache(fresh_ttl=300, stale_ttl=600)
+# Expired-week sweeper. The sweep is one set-based UPDATE across households,
+# run by cron (/api/cron/sweep-expired-weeks) or scripts/sweep_expired_weeks.py.
+# Read paths only compare against this instance's last sweep time, which
+# starts at process start: a cold instance leaves the sweep to the cron, and
+# only long-lived ones (e.g. a local dev server) sweep from a read path.
+ARCHIVE_SWEEP_INTERVAL = int(os.environ.get('ARCHIVE_SWEEP_INTERVAL', 3600))
+_last_sweep = {'at': time.time()}
+_sweep_lock = threading.Lock()
+
+# history_data keys accepted by get_history(fields=...) (used in a PostgREST select)
+_HISTORY_FIELD_RE = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+# Pending recipes: meals logged by name that match no recipe.
+# meal_log_index holds, per household and week, the logged meal names that
+# were unmatched when the week's history was last written. Reads only fetch
+# weeks with unmatched names and re-filter them against the live catalog and
+# ignore list, so saving/capturing/ignoring a recipe takes effect at once.
+
+# Logged meal text that never names a recipe
+_NON_RECIPE_MEALS = {
+    'leftovers', 'skipped', 'outside_meal', 'same', 'none', 'yes', 'no', 'true', 'false',
+    'freezer meal', 'ate out', 'make at home', 'takeout', 'delivery', 'restaurant'
+}
+_LOGGED_MEAL_FEEDBACK_KEYS = ['kids_lunch_made', 'adult_lunch_made', 'school_snack_made', 'home_snack_made']
+
+# Households whose meal_log_index has been checked for missing weeks in this process
+_pending_index_checked = set()
+_pending_index_lock = threading.Lock()
+
+def _logged_meal_names(week):
+    """Meal names typed in for a week (dinner actual_meal + lunch/snack *_made), in order."""
+    names = []
+    for dinner in (week or {}).get('dinners', []) or []:
+        actual = dinner.get('actual_meal') if isinstance(dinner, dict) else None
+        if actual and isinstance(actual, str):
+            names.append(actual.strip())
+    for day, feedback in ((week or {}).get('daily_feedback') or {}).items():
+        for key in _LOGGED_MEAL_FEEDBACK_KEYS:
+            actual = feedback.get(key)
+            if actual and isinstance(actual, str):
+                names.append(actual.strip())
+    return list(dict.fromkeys(n for n in names if n and n.lower() not in _NON_RECIPE_MEALS))
+
+def _unmatched_meal_names(names, catalog_rows, ignored):
+    """Names that match neither a recipe id/name nor the household's ignore list."""
+    recipe_ids = {r['id'] for r in catalog_rows}
+    recipe_names = {r['name'].lower() for r in catalog_rows if r.get('name')}
+    ignored = {i.lower() for i in ignored or []}
+    return [
+        n for n in names
+        if n.lower() not in ignored
+        and n.lower().replace(' ', '_') not in recipe_ids
+        and n.lower() not in recipe_names
+    ]
+
+# Process-wide recipe catalog (per-household, with SWR).
+# Each entry is stamped with the household's catalog version at load time:
+# (households.catalog_version, local version). The shared part is bumped by a
+# trigger on every recipe write (supabase/migrations/*_catalog_version.sql)
+# and read once per request, so writes made through other instances are seen
+# on the next request. The local part is bumped by this instance's recipe
+# writes, which also covers the rest of the request that made the write.
+# Without the shared column (migration not applied, fake backend) an entry is
+# only trusted for CATALOG_UNVERSIONED_TTL seconds.
+CATALOG_UNVERSIONED_TTL = int(os.environ.get('CATALOG_UNVERSIONED_TTL', 60))
+_recipe_catalog_cache = SWRCache(fresh_ttl=3600, stale_ttl=6 * 3600, name='recipe_catalog')
+_catalog_versions = {}
+_catalog_versions_lock = threading.Lock()
+
+def _shared_catalog_version(h_id):
+    """households.catalog_version (memoized per request), or None if unavailable."""
+    if not supabase:
+        return None
+    try:
+        query = supabase.table("households").select("catalog_version").eq("id", h_id)
+        res = execute_with_retry(query)
+        rows = res.data if res and isinstance(getattr(res, 'data', None), list) else []
+        version = rows[0].get('catalog_version') if rows and isinstance(rows[0], dict) else None
+        return version if isinstance(version, int) else None
+    except Exception as e:
+        print(f"Warning: Could not read catalog version for {h_id}: {e}")
+        return None
 
-def invalidate_pending_recipes_cache(household_id=None):
-    """Invalidate pending recipes cache. Called after recipe capture/save."""
-    _pending_recipes_cache.invalidate(household_id)
+def get_catalog_version(household_id=None):
+    """Current recipe catalog version for a household: (shared, local)."""
+    h_id = household_id or get_household_id()
+    return (_shared_catalog_version(h_id), _catalog_versions.get(h_id, 0))
+
+def get_catalog_fingerprint():
+    """Identity of the current household's recipe catalog for keys shared across instances.
+
+    The shared version when there is one, else a hash of the catalog rows; the
+    local part of get_catalog_version is a per-process counter, so it can't be
+    part of a key another instance computes.
+    """
+    shared = _shared_catalog_version(get_household_id())
+    if shared is not None:
+        return shared
+    return StorageEngine.get_catalog_artifact('content_hash', lambda: hashlib.sha256(
+        json.dumps(StorageEngine._get_catalog_rows(), sort_keys=True, default=str).encode()).hexdigest())
+
+def bump_catalog_version(household_id=None):
+    """Invalidate this instance's recipe catalog after a recipe write.
+
+    Outside a request (no household to resolve) every household is bumped.
+    The shared version is bumped by the database trigger.
+    """
+    if household_id is None and not has_request_context():
+        with _catalog_versions_lock:
+            for h_id in list(_catalog_versions):
+                _catalog_versions[h_id] += 1
+        _recipe_catalog_cache.invalidate()
+        return None
+
+    h_id = household_id or get_household_id()
+    with _catalog_versions_lock:
+        version = _catalog_versions.get(h_id, 0) + 1
+        _catalog_versions[h_id] = version
+    _recipe_catalog_cache.invalidate(h_id)
+    # Reads of households later in this request must see the trigger's bump
+    invalidate_request_cache('households')
+    return version
 
 def invalidate_cache(key=None):
     """Global cache invalidation. Currently a no-op as we move to statelessness, 
     but preserved for route compatibility during migration."""
-    invalidate_pending_recipes_cache()
+    if key == 'recipes':
+        bump_catalog_version()
 
 class StorageEngine:
     """Storage abstraction to handle DB vs File operations."""
@@ -214,18 +439,75 @@ class StorageEngine:
         return inventory
 
     @staticmethod
-    def get_recipes():
-        if not supabase: return []
+    def _get_catalog_entry():
+        """(version, rows, artifacts, loaded_at) for the current household's catalog.
+
+        Rows (id, name, metadata) are shared across requests: treat them as
+        read-only. `artifacts` holds structures derived from these rows and is
+        dropped together with them.
+        """
         h_id = get_household_id()
+        version = get_catalog_version(h_id)
+        cached, _ = _recipe_catalog_cache.get(h_id)
+        if cached is not None and cached[0] == version and (
+                version[0] is not None or time.time() - cached[3] < CATALOG_UNVERSIONED_TTL):
+            return cached
+
         try:
             query = supabase.table("recipes").select("id, name, metadata").eq("household_id", h_id)
             res = execute_with_retry(query)
-            if not res or not hasattr(res, 'data') or res.data is None:
-                return []
+        except Exception:
+            # Serve the last catalog we had rather than failing the request
+            if cached is not None:
+                return cached
+            raise
+        rows = (res.data if res and getattr(res, 'data', None) else None) or []
+        entry = (version, rows, {}, time.time())
+        _recipe_catalog_cache.set(h_id, entry)
+        return entry
+
+    @staticmethod
+    def _get_catalog_rows():
+        """Raw recipe rows (id, name, metadata) from the process-wide catalog."""
+        return StorageEngine._get_catalog_entry()[1]
+
+    @staticmethod
+    def get_catalog_artifact(name, builder):
+        """
+        Return a structure derived from the recipe catalog (search/ingredient
+        indexes, etc.), calling builder() only when the catalog was reloaded
+        or its version changed since the last build.
+        """
+        if not supabase:
+            return builder()
+        artifacts = StorageEngine._get_catalog_entry()[2]
+        if name not in artifacts:
+            artifacts[name] = builder()
+        return artifacts[name]
+
+    @staticmethod
+    def get_recipe_catalog():
+        """
+        Full recipe records for planning: [{"id", "name", **metadata}].
+        Served from the process-wide catalog cache. Each call returns fresh
+        top-level dicts, but nested metadata values are shared and must not be
+        mutated in place.
+        """
+        if not supabase: return []
+        catalog = []
+        for r in StorageEngine._get_catalog_rows():
+            catalog.append({"id": r.get('id'), "name": r.get('name') or "Unknown Recipe", **(r.get('metadata') or {})})
+        return catalog
+
+    @staticmethod
+    def get_recipes():
+        if not supabase: return []
+        try:
+            rows = StorageEngine._get_catalog_rows()
                 
             # Transformation to include id and name from the columns, plus categories/cuisine from metadata
             sanitized = []
-            for r in res.data:
+            for r in rows:
                 meta = r.get('metadata') or {}
                 sanitized.append({
                     "id": r['id'],
@@ -281,17 +563,51 @@ class StorageEngine:
             return None
 
     @staticmethod
-    def get_history():
+    def get_history(since=None, limit=None, fields=None, before=None, week_of=None):
+        """
+        Household meal history as {"weeks": [history_data, ...]}, newest week first.
+
+        Planning callers should declare the window they need instead of pulling
+        every week ever planned:
+        - since: only weeks with week_of >= since (date or 'YYYY-MM-DD')
+        - before: only weeks with week_of < before (e.g. the week being planned)
+        - week_of: only this one week
+        - limit: at most this many of the newest weeks
+        - fields: history_data keys to return (e.g. ['dinners']). Projected
+          server-side with JSON paths; 'week_of' is always included.
+        """
         if not supabase: return {"weeks": []}
         h_id = get_household_id()
         try:
-            # Fetch all meal plans for the household
-            # The original instruction snippet for get_history was likely a mistake,
-            # as it introduced a 'week_of' parameter that wasn't present in the method signature
-            # and changed the select columns. Reverting to original logic for fetching all history.
-            query = supabase.table("meal_plans").select("history_data").eq("household_id", h_id).order("week_of", desc=True)
+            if fields:
+                fields = [f for f in dict.fromkeys(fields) if f != 'week_of']
+                invalid = [f for f in fields if not _HISTORY_FIELD_RE.match(f)]
+                if invalid:
+                    raise ValueError(f"Invalid history fields: {invalid}")
+                columns = ", ".join(["week_of"] + [f"{f}:history_data->{f}" for f in fields])
+            else:
+                columns = "history_data"
+
+            query = supabase.table("meal_plans").select(columns).eq("household_id", h_id)
+            if week_of:
+                query = query.eq("week_of", str(week_of))
+            if since:
+                query = query.gte("week_of", str(since))
+            if before:
+                query = query.lt("week_of", str(before))
+            query = query.order("week_of", desc=True)
+            if limit:
+                query = query.limit(limit)
             res = execute_with_retry(query)
-            return {"weeks": [row['history_data'] for row in res.data]}
+
+            if not fields:
+                return {"weeks": [row['history_data'] for row in res.data]}
+            weeks = []
+            for row in res.data:
+                week = {"week_of": str(row['week_of'])}
+                week.update({f: row[f] for f in fields if row.get(f) is not None})
+                weeks.append(week)
+            return {"weeks": weeks}
         except Exception as e:
             print(f"Error fetching history: {e}")
             return {"weeks": []}
@@ -308,16 +624,89 @@ class StorageEngine:
             if history_data is not None: update_payload['history_data'] = history_data
             if status is not None: update_payload['status'] = status
             
+            normalized = StorageEngine.normalize_plan_data(update_payload)
             query = supabase.table("meal_plans").upsert({
                 "household_id": h_id,
                 "week_of": week_of,
-                **StorageEngine.normalize_plan_data(update_payload)
+                **normalized
             }, on_conflict="household_id, week_of")
             execute_with_retry(query)
         except Exception as e:
             print(f"Error updating meal plan for {week_of}: {e}")
             raise e
 
+        # Keep the week's analytics rollup, logged-meal index and pairing counts
+        # in step with its history (covers log-meal, review submit and update-with-actuals)
+        if history_data is not None:
+            try:
+                StorageEngine.save_analytics_rollups({week_of: normalized.get('history_data')})
+            except Exception as e:
+                print(f"Warning: Failed to update analytics rollup for {week_of}: {e}")
+            try:
+                StorageEngine.index_logged_meals({week_of: normalized.get('history_data')})
+            except Exception as e:
+                print(f"Warning: Failed to update pending recipes index for {week_of}: {e}")
+            try:
+                from api.services.pairing_service import record_week_pairings
+                record_week_pairings(week_of, normalized.get('history_data'), h_id)
+            except Exception as e:
+                print(f"Warning: Failed to update pairing index for {week_of}: {e}")
+
+    @staticmethod
+    def save_analytics_rollups(history_by_week):
+        """Recompute and upsert analytics rollups for {week_of: history_data}."""
+        if not supabase or not history_by_week: return []
+        h_id = get_household_id()
+        if not IS_SERVICE_ROLE:
+            raise Exception("SUPABASE_SERVICE_ROLE_KEY is missing. Cannot write to database.")
+        from scripts.compute_analytics import rollup_week
+        rows = [
+            {"household_id": h_id, "week_of": str(week_of), "rollup": rollup_week(history or {}, week_of=week_of)}
+            for week_of, history in history_by_week.items()
+        ]
+        query = supabase.table("analytics_rollups").upsert(rows, on_conflict="household_id,week_of")
+        execute_with_retry(query)
+        return [row["rollup"] for row in rows]
+
+    @staticmethod
+    def get_analytics_rollups(start_date=None, end_date=None):
+        """
+        Per-week analytics rollups for the household, newest week first
+        (the same order as get_history).
+
+        Weeks whose rollup is missing (not yet backfilled) are computed from
+        their history_data and stored, so results always match raw history.
+        """
+        if not supabase: return []
+        h_id = get_household_id()
+
+        def in_range(query):
+            if start_date: query = query.gte("week_of", str(start_date))
+            if end_date: query = query.lte("week_of", str(end_date))
+            return query
+
+        query = in_range(supabase.table("meal_plans").select("week_of").eq("household_id", h_id).not_.is_("history_data", "null"))
+        weeks = [str(r['week_of']) for r in execute_with_retry(query.order("week_of", desc=True)).data or []]
+        if not weeks: return []
+
+        query = in_range(supabase.table("analytics_rollups").select("week_of, rollup").eq("household_id", h_id))
+        rollups = {str(r['week_of']): r['rollup'] for r in execute_with_retry(query).data or []}
+
+        missing = [w for w in weeks if w not in rollups]
+        if missing:
+            query = supabase.table("meal_plans").select("week_of, history_data").eq("household_id", h_id).in_("week_of", missing)
+            history_by_week = {str(r['week_of']): r['history_data'] for r in execute_with_retry(query).data or []}
+            if IS_SERVICE_ROLE:
+                try:
+                    StorageEngine.save_analytics_rollups(history_by_week)
+                except Exception as e:
+                    print(f"Warning: Failed to backfill analytics rollups: {e}")
+            from scripts.compute_analytics import rollup_week
+            for week_of, history in history_by_week.items():
+                rollups[week_of] = rollup_week(history or {}, week_of=week_of)
+
+        return [rollups[w] for w in weeks if w in rollups]
+
     @staticmethod
     def normalize_plan_data(data):
         """
@@ -430,6 +819,105 @@ class StorageEngine:
         except Exception as e:
             print(f"Error updating inventory item {item_name}: {e}")
             raise e
+
+    @staticmethod
+    def bulk_upsert_inventory(items):
+        """
+        Apply many inventory changes with one read, one batched delete and one upsert.
+
+        'items' is a list of dicts:
+            {'category': str, 'item': str, 'updates': dict, 'delete': bool, 'increment': bool}
+        - updates: same shape as update_inventory_item (quantity/unit go to columns,
+          everything else is merged into the existing metadata)
+        - delete: remove the row
+        - increment: add updates['quantity'] to the existing quantity instead of replacing it
+        Entries are applied in order, so later entries for the same item win.
+        """
+        if not supabase or not items: return
+        h_id = get_household_id()
+        if not IS_SERVICE_ROLE:
+            raise Exception("SUPABASE_SERVICE_ROLE_KEY is missing. Cannot write to database.")
+        try:
+            names = list(dict.fromkeys(e.get('item') for e in items if e.get('category') and e.get('item')))
+            if not names: return
+
+            # 1. One read for every row we might touch
+            query = supabase.table("inventory_items").select("id, category, item, quantity, unit, metadata").eq("household_id", h_id).in_("item", names)
+            res = execute_with_retry(query)
+            existing = {}
+            for row in res.data or []:
+                existing.setdefault((row.get('category'), row.get('item')), row)
+
+            # 2. Merge in memory
+            rows = {}
+            delete_ids = []
+            for entry in items:
+                category, item_name = entry.get('category'), entry.get('item')
+                if not category or not item_name: continue
+                key = (category, item_name)
+
+                if entry.get('delete'):
+                    rows.pop(key, None)
+                    row = existing.pop(key, None)
+                    if row: delete_ids.append(row['id'])
+                    continue
+
+                updates = dict(entry.get('updates') or {})
+                current = rows.get(key) or existing.get(key)
+                if current:
+                    # Merge metadata to avoid wiping existing fields (like location)
+                    metadata = {**(current.get('metadata') or {}), **updates}
+                    quantity = updates.get('quantity', current.get('quantity', 1))
+                    if entry.get('increment'):
+                        quantity = (current.get('quantity') or 0) + updates.get('quantity', 1)
+                    unit = updates.get('unit', current.get('unit', 'count'))
+                    # Keep metadata copies of quantity/unit (they override columns on read) in sync
+                    if 'quantity' in metadata: metadata['quantity'] = quantity
+                    if 'unit' in metadata: metadata['unit'] = unit
+                else:
+                    quantity = updates.pop('quantity', 1)
+                    unit = updates.pop('unit', 'count')
+                    metadata = updates
+
+                rows[key] = {
+                    "household_id": h_id,
+                    "category": category,
+                    "item": item_name,
+                    "quantity": quantity,
+                    "unit": unit,
+                    "metadata": metadata
+                }
+
+            # 3. Batched writes (deletes first so delete-then-re-add inserts a fresh row)
+            if delete_ids:
+                query = supabase.table("inventory_items").delete().eq("household_id", h_id).in_("id", delete_ids)
+                execute_with_retry(query)
+            if rows:
+                query = supabase.table("inventory_items").upsert(list(rows.values()), on_conflict="household_id,category,item")
+                execute_with_retry(query)
+
+            # PENDING RECIPE WORKFLOW: freezer meals must exist in the recipe index
+            backups = [name for (category, name) in rows if category == 'freezer_backup']
+            if backups:
+                known_ids = {r.get('id') for r in StorageEngine._get_catalog_rows()}
+                for item_name in backups:
+                    recipe_id = re.sub(r'[^a-zA-Z0-9]', '_', item_name.lower()).strip('_')
+                    if recipe_id in known_ids: continue
+                    print(f"Auto-capturing new meal as recipe: {item_name}")
+                    metadata = {
+                        "name": item_name,
+                        "cuisine": "unknown",
+                        "meal_type": "dinner", # Assume dinner for freezer backups
+                        "effort_level": "normal",
+                        "tags": ["missing ingredients", "missing instructions"]
+                    }
+                    StorageEngine.save_recipe(recipe_id, item_name, metadata, f"# {item_name}\n\nRecipe captured from freezer inventory. Please add ingredients and instructions.")
+                    known_ids.add(recipe_id)
+            return True
+        except Exception as e:
+            print(f"Error in bulk_upsert_inventory: {e}")
+            raise e
+
     @staticmethod
     def get_active_week():
         """Find the active (not archived) meal plan for the household, prioritizing the current week."""
@@ -574,132 +1062,235 @@ class StorageEngine:
         return available_weeks
 
     @staticmethod
-    def archive_expired_weeks():
-        """Find weeks in DB that have passed their end date and mark them as archived."""
+    def sweep_expired_weeks(today=None, dry_run=False):
+        """
+        Archive every week (all households) that has passed its end date.
+
+        One set-based UPDATE: status <> 'archived' AND week_of <= today - 7.
+        Returns the affected rows ({household_id, week_of}); with dry_run the
+        rows are only selected.
+        """
+        if not supabase: return []
+        if not dry_run and not IS_SERVICE_ROLE:
+            raise Exception("SUPABASE_SERVICE_ROLE_KEY is missing. Cannot write to database.")
+        from datetime import datetime, timedelta
+        today = today or datetime.now().date()
+        cutoff = (today - timedelta(days=7)).isoformat()
+
+        if dry_run:
+            query = supabase.table("meal_plans").select("household_id, week_of")
+        else:
+            query = supabase.table("meal_plans").update({"status": "archived"})
+        query = query.neq("status", "archived").lte("week_of", cutoff)
+        res = execute_with_retry(query)
+        rows = [{"household_id": r.get("household_id"), "week_of": str(r.get("week_of"))} for r in (res.data or [])]
+
+        if not dry_run:
+            _last_sweep['at'] = time.time()
+            for row in rows:
+                print(f"Archived expired week: {row['week_of']} (household {row['household_id']})")
+        return rows
+
+    @staticmethod
+    def get_household_ids_for_week(week_of):
+        """Households (all of them, not just the caller's) that have a plan for week_of."""
+        if not supabase: return []
+        query = supabase.table("meal_plans").select("household_id").eq("week_of", str(week_of))
+        res = execute_with_retry(query)
+        return list(dict.fromkeys(r.get("household_id") for r in (res.data or []) if r.get("household_id")))
+
+    @staticmethod
+    def save_provisional_plan(week_of, kind, fingerprint, plan_data, history_data=None):
+        """Store a pre-generated `kind` ('proposal' or 'draft') for week_of, replacing any earlier one."""
         if not supabase: return
+        if not IS_SERVICE_ROLE:
+            raise Exception("SUPABASE_SERVICE_ROLE_KEY is missing. Cannot write to database.")
+        row = {
+            "household_id": get_household_id(), "week_of": str(week_of), "kind": kind,
+            "fingerprint": fingerprint, "plan_data": plan_data, "history_data": history_data,
+        }
+        execute_with_retry(supabase.table("provisional_plans").upsert(row, on_conflict="household_id,week_of,kind"))
+
+    @staticmethod
+    def take_provisional_plan(week_of, kind, fingerprint):
+        """
+        (plan_data, history_data) of the pre-generated `kind` for week_of if it
+        was computed from inputs hashing to `fingerprint`, else None. A match is
+        served once: the row is deleted.
+        """
+        if not supabase: return None
         h_id = get_household_id()
-        # Find active/planning plans
+        query = (supabase.table("provisional_plans").select("plan_data, history_data")
+                 .eq("household_id", h_id).eq("week_of", str(week_of)).eq("kind", kind).eq("fingerprint", fingerprint))
+        res = execute_with_retry(query)
+        if not res.data:
+            return None
+        query = supabase.table("provisional_plans").delete().eq("household_id", h_id).eq("week_of", str(week_of)).eq("kind", kind)
+        execute_with_retry(query)
+        return res.data[0]["plan_data"], res.data[0].get("history_data")
+
+    @staticmethod
+    def get_provisional_household_ids(week_of, kind):
+        """Households (all of them) holding a pre-generated `kind` for week_of."""
+        if not supabase: return []
+        query = supabase.table("provisional_plans").select("household_id").eq("week_of", str(week_of)).eq("kind", kind)
+        res = execute_with_retry(query)
+        return list(dict.fromkeys(r.get("household_id") for r in (res.data or []) if r.get("household_id")))
+
+    @staticmethod
+    def delete_provisional_plans(before):
+        """Drop pre-generated results (all households) for weeks before `before`; nobody will plan those now."""
+        if not supabase: return
+        execute_with_retry(supabase.table("provisional_plans").delete().lt("week_of", str(before)))
+
+    @staticmethod
+    def sweep_expired_weeks_if_due():
+        """
+        Cheap read-path hook: sweep only if this instance hasn't swept (or
+        started) within ARCHIVE_SWEEP_INTERVAL seconds. The scheduled cron sweep
+        does the real work.
+        """
+        if not supabase: return
+        if time.time() - _last_sweep['at'] < ARCHIVE_SWEEP_INTERVAL:
+            return
+        if not _sweep_lock.acquire(blocking=False):
+            return  # Another request on this instance is already sweeping
         try:
-            query = supabase.table("meal_plans").select("*").eq("household_id", h_id).neq("status", "archived")
-            res = execute_with_retry(query)
-            
-            from datetime import datetime, timedelta
-            now = datetime.now().date()
-            
-            for plan in res.data:
-                week_of = plan['week_of']
-                week_start = datetime.strptime(week_of, '%Y-%m-%d').date() if isinstance(week_of, str) else week_of
-                week_end = week_start + timedelta(days=7)
-                
-                if now >= week_end:
-                    query = supabase.table("meal_plans").update({"status": "archived"}).eq("id", plan['id'])
-                    execute_with_retry(query)
-                    print(f"Archived expired week: {week_of}")
+            if time.time() - _last_sweep['at'] >= ARCHIVE_SWEEP_INTERVAL:
+                StorageEngine.sweep_expired_weeks()
         except Exception as e:
-            print(f"Error in archive_expired_weeks: {e}")
+            print(f"Error in sweep_expired_weeks: {e}")
+        finally:
+            _sweep_lock.release()
 
     @staticmethod
     def get_pending_recipes():
         """
         Detect 'Actual Meals' logged that are not in the recipe index.
-        Uses SWR (Stale-While-Revalidate) caching for fast responses.
+        Reads the maintained meal_log_index (only weeks with unmatched names).
         """
         if not supabase: return []
         h_id = get_household_id()
-
-        # TD-008 FIX: SWR cache - return stale data immediately if available
-        cached_value, cache_status = _pending_recipes_cache.get(h_id)
-
-        if cache_status == 'fresh':
-            # Data is fresh, return immediately
-            return cached_value
-        elif cache_status == 'stale':
-            # Data is stale but usable - return it now, refresh will happen on next miss
-            # In serverless, we can't truly background refresh, but this gives fast response
-            return cached_value
-
-        # Cache miss or too stale - must fetch fresh data
         try:
-            pending = StorageEngine._fetch_pending_recipes_impl(h_id)
-            _pending_recipes_cache.set(h_id, pending)
-            return pending
+            StorageEngine._ensure_pending_index(h_id)
+            query = supabase.table("meal_log_index").select("unmatched").eq("household_id", h_id).neq("unmatched", "[]").order("week_of")
+            res = execute_with_retry(query)
+            names = list(dict.fromkeys(n for row in res.data or [] for n in (row.get('unmatched') or [])))
+            # Re-check against the live catalog/ignore list: recipes saved or
+            # ignored since the week was indexed drop out immediately
+            ignored = StorageEngine._get_config_key('ignored_recipes') or []
+            return _unmatched_meal_names(names, StorageEngine._get_catalog_rows(), ignored)
         except Exception as e:
             print(f"Error in get_pending_recipes: {e}")
-            # On error, return stale data if we have any
-            if cached_value is not None:
-                return cached_value
             return []
 
     @staticmethod
-    def _fetch_pending_recipes_impl(h_id):
-        """Internal implementation of pending recipes scan."""
-        # 1. Get all recipes
-        query = supabase.table("recipes").select("id, name").eq("household_id", h_id)
-        recipes_res = execute_with_retry(query)
-        recipe_ids = {r['id'] for r in recipes_res.data}
-        recipe_names = {r['name'].lower() for r in recipes_res.data}
+    def index_logged_meals(history_by_week, h_id=None):
+        """Store each week's unmatched logged meal names ({week_of: history_data})."""
+        if not supabase or not history_by_week: return
+        h_id = h_id or get_household_id()
+        if not IS_SERVICE_ROLE:
+            raise Exception("SUPABASE_SERVICE_ROLE_KEY is missing. Cannot write to database.")
+        catalog_rows = StorageEngine._get_catalog_rows()
+        ignored = StorageEngine._get_config_key('ignored_recipes') or []
+        rows = [
+            {
+                "household_id": h_id,
+                "week_of": str(week_of),
+                "unmatched": _unmatched_meal_names(_logged_meal_names(history), catalog_rows, ignored)
+            }
+            for week_of, history in history_by_week.items()
+        ]
+        query = supabase.table("meal_log_index").upsert(rows, on_conflict="household_id,week_of")
+        execute_with_retry(query)
 
-        # 2. Get history (all weeks)
-        query = supabase.table("meal_plans").select("history_data").eq("household_id", h_id)
+    @staticmethod
+    def rebuild_pending_index(h_id=None, weeks=None):
+        """Re-index logged meals from history (all weeks, or just `weeks`)."""
+        if not supabase: return
+        h_id = h_id or get_household_id()
+        query = supabase.table("meal_plans").select("week_of, history_data").eq("household_id", h_id).not_.is_("history_data", "null")
+        if weeks is not None:
+            if not weeks: return
+            query = query.in_("week_of", list(weeks))
         res = execute_with_retry(query)
-        weeks = [row['history_data'] for row in res.data if row.get('history_data')]
+        StorageEngine.index_logged_meals({str(r['week_of']): r['history_data'] for r in res.data or []}, h_id)
 
-        pending = []
-        seen = set()
-
-        # Common non-recipe keywords to ignore
-        ignore = {
-            'leftovers', 'skipped', 'outside_meal', 'same', 'none', 'yes', 'no', 'true', 'false',
-            'freezer meal', 'ate out', 'make at home', 'takeout', 'delivery', 'restaurant'
-        }
+    @staticmethod
+    def _ensure_pending_index(h_id):
+        """Index any weeks written before meal_log_index existed (once per process)."""
+        if h_id in _pending_index_checked: return
+        with _pending_index_lock:
+            if h_id in _pending_index_checked: return
+            query = supabase.table("meal_plans").select("week_of").eq("household_id", h_id).not_.is_("history_data", "null")
+            plan_weeks = {str(r['week_of']) for r in execute_with_retry(query).data or []}
+            query = supabase.table("meal_log_index").select("week_of").eq("household_id", h_id)
+            indexed_weeks = {str(r['week_of']) for r in execute_with_retry(query).data or []}
+            missing = plan_weeks - indexed_weeks
+            # Without the service role the backfill can't be written; don't
+            # probe again on every read either
+            if missing and IS_SERVICE_ROLE:
+                StorageEngine.rebuild_pending_index(h_id, weeks=sorted(missing))
+            _pending_index_checked.add(h_id)
 
-        # TD-007 FIX: Load ignored recipes from DB config instead of local file
-        ignored_list = StorageEngine._get_config_key('ignored_recipes') or []
-        for i in ignored_list:
-            ignore.add(i.lower())
-
-        for week in weeks:
-            # Check dinners
-            for dinner in week.get('dinners', []):
-                actual = dinner.get('actual_meal')
-                if actual and isinstance(actual, str):
-                    actual_clean = actual.strip()
-                    if actual_clean.lower() in ignore: continue
-
-                    actual_id = actual_clean.lower().replace(' ', '_')
-                    if actual_id not in recipe_ids and actual_clean.lower() not in recipe_names:
-                        if actual_clean not in seen:
-                            pending.append(actual_clean)
-                            seen.add(actual_clean)
-
-            # Check lunches/snacks in daily_feedback
-            df = week.get('daily_feedback', {})
-            for day, feedback in df.items():
-                for key in ['kids_lunch_made', 'adult_lunch_made', 'school_snack_made', 'home_snack_made']:
-                    actual = feedback.get(key)
-                    if actual and isinstance(actual, str):
-                        actual_clean = actual.strip()
-                        if actual_clean.lower() in ignore: continue
-
-                        actual_id = actual_clean.lower().replace(' ', '_')
-                        if actual_id not in recipe_ids and actual_clean.lower() not in recipe_names:
-                            if actual_clean not in seen:
-                                pending.append(actual_clean)
-                                seen.add(actual_clean)
-
-        return pending
-
-    @staticmethod
-    def get_pending_recipes_cache_stats():
-        """Return cache statistics for debugging."""
-        return _pending_recipes_cache.get_stats()
+    @staticmethod
+    def resolve_pending_recipes(h_id=None):
+        """
+        Drop names that now match a recipe or the ignore list from the index.
+        Called after a recipe is saved/captured or a name is ignored; only the
+        weeks that still have unmatched names are touched.
+        """
+        if not supabase or not IS_SERVICE_ROLE: return
+        h_id = h_id or get_household_id()
+        try:
+            query = supabase.table("meal_log_index").select("week_of, unmatched").eq("household_id", h_id).neq("unmatched", "[]")
+            res = execute_with_retry(query)
+            if not res.data: return
+            catalog_rows = StorageEngine._get_catalog_rows()
+            ignored = StorageEngine._get_config_key('ignored_recipes') or []
+            rows = []
+            for row in res.data:
+                unmatched = row.get('unmatched') or []
+                still_unmatched = _unmatched_meal_names(unmatched, catalog_rows, ignored)
+                if still_unmatched != unmatched:
+                    rows.append({"household_id": h_id, "week_of": str(row['week_of']), "unmatched": still_unmatched})
+            if rows:
+                query = supabase.table("meal_log_index").upsert(rows, on_conflict="household_id,week_of")
+                execute_with_retry(query)
+        except Exception as e:
+            print(f"Warning: Failed to update pending recipes index: {e}")
 
     @staticmethod
-    def refresh_pending_recipes_cache():
-        """Force refresh of pending recipes cache. Call when you want fresh data."""
-        h_id = get_household_id()
-        _pending_recipes_cache.invalidate(h_id)
-        return StorageEngine.get_pending_recipes()
+    def _unresolve_recipe_meals(h_id, recipe_id, recipe_name):
+        """
+        Add meals logged under a deleted recipe back to meal_log_index.
+        Only the logged meal fields are read, and only weeks that logged the
+        recipe are rewritten.
+        """
+        matches = {recipe_id, (recipe_name or '').lower()} - {''}
+        query = supabase.table("meal_plans").select(
+            "week_of, dinners:history_data->dinners, daily_feedback:history_data->daily_feedback"
+        ).eq("household_id", h_id).not_.is_("history_data", "null")
+        logged = {}
+        for row in execute_with_retry(query).data or []:
+            names = [n for n in _logged_meal_names(row) if n.lower() in matches or n.lower().replace(' ', '_') in matches]
+            if names:
+                logged[str(row['week_of'])] = names
+        if not logged: return
+
+        query = supabase.table("meal_log_index").select("week_of, unmatched").eq("household_id", h_id).in_("week_of", sorted(logged))
+        current = {str(r['week_of']): r.get('unmatched') or [] for r in execute_with_retry(query).data or []}
+        catalog_rows = StorageEngine._get_catalog_rows()
+        ignored = StorageEngine._get_config_key('ignored_recipes') or []
+        rows = []
+        for week_of, names in sorted(logged.items()):
+            existing = current.get(week_of, [])
+            unmatched = list(dict.fromkeys(existing + _unmatched_meal_names(names, catalog_rows, ignored)))
+            if unmatched != existing:
+                rows.append({"household_id": h_id, "week_of": week_of, "unmatched": unmatched})
+        if rows:
+            query = supabase.table("meal_log_index").upsert(rows, on_conflict="household_id,week_of")
+            execute_with_retry(query)
 
     @staticmethod
     def delete_recipe(recipe_id):
@@ -709,8 +1300,15 @@ class StorageEngine:
         if not IS_SERVICE_ROLE:
             raise Exception("SUPABASE_SERVICE_ROLE_KEY is missing. Cannot write to database.")
         try:
+            recipe_name = next((r.get('name') for r in StorageEngine._get_catalog_rows() if r.get('id') == recipe_id), None)
             query = supabase.table("recipes").delete().eq("id", recipe_id).eq("household_id", h_id)
             execute_with_retry(query)
+            bump_catalog_version(h_id)
+            # Meals that matched this recipe are pending again
+            try:
+                StorageEngine._unresolve_recipe_meals(h_id, recipe_id, recipe_name)
+            except Exception as e:
+                print(f"Warning: Failed to update pending recipes index: {e}")
         except Exception as e:
             print(f"Error deleting recipe {recipe_id}: {e}")
             raise e
@@ -731,6 +1329,44 @@ class StorageEngine:
                 
         return {'ingredients': [], 'prep_steps': [], 'instructions': []}
 
+    @staticmethod
+    def get_recipe_contents(recipe_ids):
+        """Bulk version of get_recipe_content: one in_() query for all ids.
+
+        Returns {recipe_id: {'ingredients', 'prep_steps', 'instructions'}} with an
+        entry for every requested id (empty lists when nothing is found).
+        """
+        ids = list(dict.fromkeys(rid for rid in recipe_ids if rid))
+        if not ids:
+            return {}
+
+        markdown_by_id = {}
+        if supabase:
+            h_id = get_household_id()
+            try:
+                query = supabase.table("recipes").select("id, content").eq("household_id", h_id).in_("id", ids)
+                res = execute_with_retry(query)
+                for row in res.data or []:
+                    if row.get('content'):
+                        markdown_by_id[row['id']] = row['content']
+            except Exception as e:
+                print(f"Error bulk fetching recipe content: {e}")
+
+        contents = {}
+        for rid in ids:
+            md_content = markdown_by_id.get(rid)
+            if md_content is None:
+                # Fallback to local file
+                md_path = Path(f'recipes/content/{rid}.md')
+                if md_path.exists():
+                    with open(md_path, 'r', encoding='utf-8') as f:
+                        md_content = f.read()
+            if md_content:
+                contents[rid] = StorageEngine._parse_markdown_content(md_content)
+            else:
+                contents[rid] = {'ingredients': [], 'prep_steps': [], 'instructions': []}
+        return contents
+
     @staticmethod
     def _parse_markdown_content(md_content):
         """Helper to extract sections from Markdown."""
@@ -854,9 +1490,11 @@ class StorageEngine:
                 "content": content
             })
             execute_with_retry(query)
+            bump_catalog_version(h_id)
         except Exception as e:
             print(f"Error saving recipe {recipe_id}: {e}")
             raise e
+        StorageEngine.resolve_pending_recipes(h_id)
 
     @staticmethod
     def bulk_update_recipes(updates):
@@ -885,6 +1523,12 @@ class StorageEngine:
             
             query = supabase.table("recipes").upsert(rows)
             execute_with_retry(query)
+            bump_catalog_version(h_id)
+            # Renames can both match and un-match logged meals
+            try:
+                StorageEngine.rebuild_pending_index(h_id)
+            except Exception as e:
+                print(f"Warning: Failed to rebuild pending recipes index: {e}")
             return True
         except Exception as e:
             print(f"Error in bulk_update_recipes: {e}")
@@ -901,6 +1545,7 @@ class StorageEngine:
                 existing.append(name)
                 existing.sort()
                 StorageEngine._set_config_key('ignored_recipes', existing)
+                StorageEngine.resolve_pending_recipes()
                     
             return True
         except Exception as e:
@@ -0,0 +1,173 @@
+"""
+Per-request Supabase query tracing.
+
+execute_with_retry records every query it runs (or serves from the request
+read cache) into a trace on flask.g: table, method, filter summary, row count,
+approximate response bytes (re-serialized size of the rows, full mode only),
+retries and duration. At the end of the request the trace is emitted as a
+Server-Timing header, visible in the browser's network panel, and requests
+slower than SLOW_REQUEST_MS are logged as one JSON line (sampled by
+SLOW_REQUEST_SAMPLE_RATE) so N+1 patterns show up in production logs.
+
+SERVER_TIMING controls the header: 'summary' (default, totals only), 'full'
+(one entry per query, with table names and filter shapes; turn it on only
+where clients may see them, e.g. local development) or 'off' (no header;
+tracing still feeds the slow log). Response bytes are only measured in full
+mode, where the per-query entries report them.
+"""
+
+import json
+import os
+import random
+import time
+from urllib.parse import parse_qsl
+
+from flask import g, has_app_context, request
+
+from api.utils import metrics
+
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'summary').lower()
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 1000))
+SLOW_REQUEST_SAMPLE_RATE = float(os.environ.get('SLOW_REQUEST_SAMPLE_RATE', 1.0))
+# Per-query Server-Timing entries beyond this are folded into the totals
+MAX_TIMING_ENTRIES = 30
+
+
+def current_trace():
+    """The request's query trace (list of dicts), or None outside a request."""
+    if not has_app_context():
+        return None
+    trace = g.get('_query_trace')
+    if trace is None:
+        trace = g._query_trace = []
+    return trace
+
+
+def summarize_filters(params):
+    """'household_id=eq,week_of=gte' from PostgREST params, without the values."""
+    try:
+        pairs = parse_qsl(str(params or ''), keep_blank_values=True)
+    except Exception:
+        return ''
+    parts = []
+    for key, value in pairs:
+        if key in ('select', 'on_conflict', 'columns'):
+            continue
+        op = value.split('.', 1)[0]
+        if op == 'not':
+            op = 'not.' + value.split('.', 2)[1]
+        parts.append(f"{key}={op}" if key not in ('order', 'limit', 'offset') else key)
+    return ','.join(parts)
+
+
+def _response_size(res):
+    data = getattr(res, 'data', None)
+    if data is None:
+        return 0, 0
+    rows = len(data) if isinstance(data, list) else 1
+    if SERVER_TIMING != 'full':
+        # Only the per-query header entries report bytes; skip re-serializing
+        return rows, 0
+    try:
+        size = len(json.dumps(data, separators=(',', ':'), default=str))
+    except (TypeError, ValueError):
+        size = 0
+    return rows, size
+
+
+def record_query(shape, query, res, started, retries=0, cached=False, error=None):
+    """Count the query in the process metrics and append it to the request trace."""
+    seconds = time.perf_counter() - started
+    method, table = (shape[0], shape[1]) if shape else ('?', type(query).__name__)
+    metrics.observe_query(table, method, seconds, retries, cached, error is not None)
+    trace = current_trace()
+    if trace is None:
+        return
+    rows, size = _response_size(res) if res is not None else (0, 0)
+    trace.append({
+        'table': table,
+        'method': method,
+        'filters': summarize_filters(getattr(query, 'params', '')) if shape else '',
+        'rows': rows,
+        'bytes': size,
+        'retries': retries,
+        'cached': cached,
+        'error': str(error) if error else None,
+        'ms': round(seconds * 1000, 2),
+    })
+
+
+def _quote(text):
+    return '"' + str(text).replace('\\', '').replace('"', "'") + '"'
+
+
+def server_timing_header(trace, total_ms):
+    queries = [q for q in trace if not q['cached']]
+    db_ms = sum(q['ms'] for q in queries)
+    hits = len(trace) - len(queries)
+    entries = [
+        f"app;dur={total_ms:.1f}",
+        f"db;dur={db_ms:.1f};desc={_quote(f'{len(queries)} queries, {hits} cached')}",
+    ]
+    if SERVER_TIMING == 'full':
+        for i, q in enumerate(queries[:MAX_TIMING_ENTRIES], 1):
+            desc = f"{q['method']} {q['table']}"
+            if q['filters']:
+                desc += f" [{q['filters']}]"
+            desc += f" rows={q['rows']} bytes={q['bytes']}"
+            if q['retries']:
+                desc += f" retries={q['retries']}"
+            entries.append(f"q{i};dur={q['ms']:.1f};desc={_quote(desc)}")
+    return ', '.join(entries)
+
+
+def _log_slow_request(response, trace, total_ms):
+    if total_ms < SLOW_REQUEST_MS or random.random() >= SLOW_REQUEST_SAMPLE_RATE:
+        return
+    queries = [q for q in trace if not q['cached']]
+    by_shape = {}
+    for q in queries:
+        key = f"{q['method']} {q['table']}" + (f" [{q['filters']}]" if q['filters'] else '')
+        count, ms = by_shape.get(key, (0, 0.0))
+        by_shape[key] = (count + 1, ms + q['ms'])
+    print("SLOW REQUEST " + json.dumps({
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'ms': round(total_ms, 1),
+        'queries': len(queries),
+        'cached': len(trace) - len(queries),
+        'db_ms': round(sum(q['ms'] for q in queries), 1),
+        'retries': sum(q['retries'] for q in queries),
+        # Repeated shapes first: that's where the N+1s are
+        'top': [
+            {'query': key, 'count': count, 'ms': round(ms, 1)}
+            for key, (count, ms) in sorted(by_shape.items(), key=lambda kv: (-kv[1][0], -kv[1][1]))[:5]
+        ],
+    }))
+
+
+def init_app(app):
+    """Start a trace per request and emit it (and the route's latency metric) when the response goes out."""
+
+    @app.before_request
+    def _start_trace():
+        g._trace_started = time.perf_counter()
+        g._query_trace = []
+
+    @app.after_request
+    def _finish_trace(response):
+        started = g.get('_trace_started')
+        if started is None:
+            return response
+        trace = g.get('_query_trace') or []
+        total_ms = (time.perf_counter() - started) * 1000
+        rule = request.url_rule
+        metrics.observe_request(request.blueprint, rule.rule if rule else None,
+                                request.method, response.status_code, total_ms / 1000)
+        if SERVER_TIMING != 'off':
+            response.headers['Server-Timing'] = server_timing_header(trace, total_ms)
+        _log_slow_request(response, trace, total_ms)
+        return response
+
+    return app
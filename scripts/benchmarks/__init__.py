@@ -0,0 +1,10 @@
+"""
+Offline benchmarks for the planning, shopping and analytics hot paths.
+
+    python -m scripts.benchmarks --scale small medium
+    python -m scripts.benchmarks --save scripts/benchmarks/baselines/local.json
+    python -m scripts.benchmarks --compare scripts/benchmarks/baselines/local.json
+
+All data is synthetic (see synthetic.py) and storage reads are served from it,
+so no Supabase project or network access is needed.
+"""
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Run the offline benchmark suite.
+
+Usage:
+    python -m scripts.benchmarks [--scale small medium large] [--only NAME ...]
+                                 [--repeat N] [--save FILE] [--compare FILE]
+                                 [--threshold 0.25]
+
+--compare exits with status 1 if any benchmark regressed against the baseline.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add repo root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from scripts.benchmarks import synthetic
+from scripts.benchmarks.suite import BENCHMARKS, DEFAULT_REPEAT, DEFAULT_THRESHOLD, compare, run_suite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark planning, shopping and analytics on synthetic data.")
+    parser.add_argument('--scale', nargs='+', choices=list(synthetic.SCALES), default=['small', 'medium'])
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed runs per benchmark")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help="Write results to this JSON baseline")
+    parser.add_argument('--compare', help="Compare against this JSON baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before flagging a regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    def progress(scale, name, timing):
+        print(f"  {scale:<7} {name:<27} median {timing['median_ms']:>10.2f} ms   min {timing['min_ms']:>10.2f} ms", flush=True)
+
+    results = run_suite(args.scale, args.only, args.repeat, args.seed, progress)
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        print(f"\nCompared with {args.compare} (threshold +{args.threshold:.0%}):")
+        for scale, name, before, after, ratio, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"  {scale:<7} {name:<27} {before:>10.2f} -> {after:>10.2f} ms  x{ratio:5.2f}  {flag}")
+        regressions = [r for r in rows if r[5]]
+        if regressions:
+            print(f"{len(regressions)} regression(s).")
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
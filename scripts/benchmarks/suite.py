@@ -0,0 +1,217 @@
+"""
+Benchmark definitions, the offline harness and baseline comparison.
+
+Each benchmark takes the scale's synthetic dataset and returns a setup
+function; setup builds fresh inputs (outside the timer) and returns the
+zero-argument call that is timed.
+"""
+
+import contextlib
+import copy
+import io
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import yaml
+
+from api.utils import storage
+from api.utils.meal_resolution import resolve_week
+from scripts.compute_analytics import compute_analytics
+from scripts.inventory_intelligence import get_shopping_list
+from scripts.lunch_selector import LunchSelector
+from scripts.recipe_index import RecipeIndex
+from scripts.workflow.actions import generate_meal_plan
+from scripts.workflow.html_generator import extract_prep_tasks_for_db
+from scripts.workflow.selection import filter_recipes, get_recent_recipes, select_dinners
+from scripts.benchmarks import synthetic
+
+DEFAULT_REPEAT = 5
+# A benchmark regresses when its median is this much slower than the baseline...
+DEFAULT_THRESHOLD = 0.25
+# ...and by more than this many milliseconds (ignores noise on sub-ms timings)
+MIN_DELTA_MS = 0.5
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class Dataset:
+    """Synthetic data for one scale, with the derived inputs several benchmarks share."""
+
+    def __init__(self, scale, seed=0):
+        recipes, weeks, inventory = synthetic.SCALES[scale]
+        self.scale = scale
+        self.recipes = synthetic.make_recipes(recipes, seed)
+        self.history = synthetic.make_history(weeks, self.recipes, seed)
+        self.inventory = synthetic.make_inventory(inventory, seed)
+        self.plan = synthetic.make_plan(self.recipes, seed)
+        self.contents = synthetic.make_recipe_contents(self.recipes)
+        self.week_of = (datetime.strptime(self.history['weeks'][-1]['week_of'], '%Y-%m-%d')
+                        .replace(day=1).strftime('%Y-%m-%d'))
+        self.inputs = synthetic.make_week_inputs(self.week_of)
+        self.index = RecipeIndex(self.recipes)
+
+    def filtered(self):
+        recent = get_recent_recipes(self.history, lookback_weeks=3)
+        return filter_recipes(self.index, self.inputs, recent)
+
+    def dinners(self):
+        return select_dinners(self.filtered(), self.inputs, None, self.index)
+
+    def dinner_plan(self, dinners):
+        return [
+            {'recipe_id': r.get('id'), 'recipe_name': r.get('name'), 'day': d, 'vegetables': list(r.get('main_veg') or [])}
+            for d, r in dinners.items() if d in synthetic.DAYS
+        ]
+
+    def lunches(self, dinners):
+        selector = LunchSelector(recipes=self.index, config_path=os.devnull)
+        return selector.select_weekly_lunches(self.dinner_plan(dinners), week_of=self.week_of)
+
+
+def bench_select_dinners(data):
+    def setup():
+        filtered = data.filtered()
+        return lambda: select_dinners(filtered, data.inputs, None, data.index)
+    return setup
+
+
+def bench_generate_meal_plan(data):
+    def setup():
+        inputs = copy.deepcopy(data.inputs)
+        history = copy.deepcopy(data.history)
+        return lambda: generate_meal_plan(None, inputs, data.recipes, history, inventory_data=data.inventory)
+    return setup
+
+
+def bench_select_weekly_lunches(data):
+    plan = data.dinner_plan(data.dinners())
+
+    def setup():
+        selector = LunchSelector(recipes=data.index, config_path=os.devnull)
+        return lambda: selector.select_weekly_lunches(plan, week_of=data.week_of)
+    return setup
+
+
+def bench_get_shopping_list(data):
+    return lambda: (lambda: get_shopping_list(data.plan))
+
+
+def bench_compute_analytics(data):
+    return lambda: (lambda: compute_analytics(data.history))
+
+
+def bench_resolve_week(data):
+    # Resolve every logged week against the plan, as the history views do
+    def run():
+        return [resolve_week(data.plan, week) for week in data.history['weeks']]
+    return lambda: run
+
+
+def bench_extract_prep_tasks(data):
+    dinners = data.dinners()
+    lunches = data.lunches(dinners)
+    return lambda: (lambda: extract_prep_tasks_for_db(dinners, lunches))
+
+
+BENCHMARKS = {
+    'select_dinners': bench_select_dinners,
+    'generate_meal_plan': bench_generate_meal_plan,
+    'select_weekly_lunches': bench_select_weekly_lunches,
+    'get_shopping_list': bench_get_shopping_list,
+    'compute_analytics': bench_compute_analytics,
+    'resolve_week': bench_resolve_week,
+    'extract_prep_tasks_for_db': bench_extract_prep_tasks,
+}
+
+
+@contextlib.contextmanager
+def offline(data):
+    """
+    Serve storage reads from the dataset, run in a scratch directory (plan
+    HTML, templates and history.yml are resolved relative to the cwd) and
+    silence the planners' progress prints.
+    """
+    empty = {'ingredients': [], 'prep_steps': [], 'instructions': []}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch, \
+         patch.object(storage, 'supabase', None), \
+         patch.object(storage.StorageEngine, 'get_inventory', staticmethod(lambda: data.inventory)), \
+         patch.object(storage.StorageEngine, 'get_config', staticmethod(lambda: {})), \
+         patch.object(storage.StorageEngine, 'get_recipe_contents',
+                      staticmethod(lambda ids: {rid: data.contents.get(rid, empty) for rid in ids})), \
+         contextlib.redirect_stdout(io.StringIO()):
+        os.makedirs(os.path.join(scratch, 'data'))
+        shutil.copytree(REPO_ROOT / 'templates', os.path.join(scratch, 'templates'))
+        with open(os.path.join(scratch, 'data', 'history.yml'), 'w') as f:
+            yaml.safe_dump({'weeks': data.history['weeks'][-10:]}, f)
+        os.chdir(scratch)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+
+
+def time_benchmark(setup, repeat):
+    timings = []
+    for _ in range(repeat):
+        call = setup()
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'repeat': repeat,
+    }
+
+
+def run_suite(scales, names=None, repeat=DEFAULT_REPEAT, seed=0, progress=None):
+    """{scale: {benchmark: timing}} for the selected scales/benchmarks."""
+    results = {}
+    for scale in scales:
+        data = Dataset(scale, seed)
+        results[scale] = {}
+        for name, bench in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            with offline(data):
+                timing = time_benchmark(bench(data), repeat)
+            results[scale][name] = timing
+            if progress:
+                progress(scale, name, timing)
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'scales': {s: dict(zip(('recipes', 'history_weeks', 'inventory_per_category'), synthetic.SCALES[s])) for s in scales},
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, min_delta_ms=MIN_DELTA_MS):
+    """
+    Rows of (scale, benchmark, baseline_ms, current_ms, ratio, regressed) for
+    every benchmark present in both runs.
+    """
+    rows = []
+    for scale, benches in current['results'].items():
+        for name, timing in benches.items():
+            base = baseline.get('results', {}).get(scale, {}).get(name)
+            if not base:
+                continue
+            before, after = base['median_ms'], timing['median_ms']
+            ratio = after / before if before else float('inf')
+            regressed = ratio > 1 + threshold and after - before > min_delta_ms
+            rows.append((scale, name, before, after, ratio, regressed))
+    return rows
@@ -0,0 +1,140 @@
+"""
+Deterministic synthetic data shaped like the production tables: recipe
+catalog rows (get_recipe_catalog shape), history weeks, inventory and a
+weekly plan. Everything is derived from a seed so runs are comparable.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+DAYS = ['mon', 'tue', 'wed', 'thu', 'fri']
+
+MEAL_TYPES = [
+    'tacos_wraps', 'pasta_noodles', 'soup_stew', 'grain_bowl', 'sandwich',
+    'salad', 'stir_fry', 'pizza', 'casserole', 'appetizer', 'breakfast', 'snack'
+]
+CUISINES = ['indian', 'mexican', 'italian', 'thai', 'american', 'mediterranean', 'japanese']
+VEGETABLES = [
+    'spinach', 'carrot', 'bell pepper', 'onion', 'tomato', 'zucchini', 'broccoli',
+    'cauliflower', 'potato', 'sweet potato', 'kale', 'cabbage', 'green beans',
+    'peas', 'corn', 'mushroom', 'eggplant', 'cucumber', 'beetroot', 'okra'
+]
+PANTRY = ['rice', 'pasta', 'lentils', 'chickpeas', 'black beans', 'tortillas', 'paneer', 'tofu', 'cheese', 'yogurt']
+WORDS = ['quick', 'spicy', 'creamy', 'roasted', 'garlic', 'lemon', 'herb', 'smoky', 'masala', 'coconut', 'baked', 'crispy']
+FEEDBACK = ['❤️', '👍', '😐', '👎', '❌', None]
+
+# (recipes, history weeks, inventory items per category)
+SCALES = {
+    'small': (200, 10, 20),
+    'medium': (2000, 100, 100),
+    'large': (10000, 500, 500),
+}
+
+
+def make_recipes(count, seed=0):
+    rng = random.Random(seed)
+    recipes = []
+    for i in range(count):
+        veg = rng.sample(VEGETABLES, rng.randint(0, 3))
+        recipe = {
+            'id': f'recipe_{i:05d}',
+            'name': f"{rng.choice(WORDS).title()} {' '.join(v.title() for v in veg) or rng.choice(PANTRY).title()} {rng.choice(MEAL_TYPES).split('_')[0].title()} {i}",
+            'meal_type': rng.choice(MEAL_TYPES),
+            'cuisine': rng.choice(CUISINES),
+            'effort_level': rng.choice(['low', 'normal', 'normal', 'high']),
+            'no_chop_compatible': rng.random() < 0.2,
+            'lunch_suitable': rng.random() < 0.3,
+            'snack_suitable': rng.random() < 0.1,
+            'main_veg': veg,
+            'ingredients': veg + rng.sample(PANTRY, 3),
+            'tags': rng.sample(WORDS, 2),
+            'avoid_contains': [],
+        }
+        if rng.random() < 0.5:
+            recipe['prep_steps'] = [f"Chop {v}" for v in veg] or ['Cook rice']
+        recipes.append(recipe)
+    return recipes
+
+
+def make_history(weeks, recipes, seed=0, start='2020-01-06'):
+    """{"weeks": [...]} oldest first, as stored in history.yml."""
+    rng = random.Random(seed)
+    monday = datetime.strptime(start, '%Y-%m-%d')
+    ids = [r['id'] for r in recipes]
+    result = []
+    for w in range(weeks):
+        dinners = []
+        for day in DAYS:
+            recipe_ids = rng.sample(ids, 2 if rng.random() < 0.2 else 1)
+            dinners.append({
+                'day': day,
+                'recipe_id': recipe_ids[0],
+                'recipe_ids': recipe_ids,
+                'cuisine': rng.choice(CUISINES),
+                'made': rng.choice([True, True, True, False, 'freezer_backup', 'outside_meal']),
+                'kids_feedback': rng.choice(FEEDBACK),
+                'made_2x_for_freezer': rng.random() < 0.1,
+            })
+        result.append({
+            'week_of': (monday + timedelta(weeks=w)).strftime('%Y-%m-%d'),
+            'plan_adherence_pct': rng.randint(40, 100),
+            'dinners': dinners,
+            'daily_feedback': {
+                day: {'kids_lunch': rng.choice(FEEDBACK), 'kids_lunch_made': True, 'school_snack': rng.choice(FEEDBACK)}
+                for day in DAYS
+            },
+        })
+    return {'weeks': result}
+
+
+def make_inventory(per_category, seed=0):
+    rng = random.Random(seed)
+    names = VEGETABLES + PANTRY
+
+    def items(prefix):
+        return [
+            {'item': f"{rng.choice(names)} {prefix}{i}" if i >= len(names) else names[i], 'quantity': rng.randint(0, 4), 'unit': 'count'}
+            for i in range(per_category)
+        ]
+
+    return {
+        'fridge': items('f'),
+        'pantry': items('p'),
+        'spice_rack': items('s'),
+        'freezer': {'backups': [{'meal': f'Backup {i}', 'servings': 2} for i in range(per_category // 10)], 'ingredients': items('z')},
+    }
+
+
+def make_week_inputs(week_of):
+    return {
+        'week_of': week_of,
+        'timezone': 'America/Los_Angeles',
+        'schedule': {'busy_days': ['thu', 'fri']},
+        'preferences': {'avoid_ingredients': []},
+        'meals_covered': {},
+    }
+
+
+def make_plan(recipes, seed=0):
+    """A generated week's plan_data (dinners + lunches) for shopping and resolution."""
+    rng = random.Random(seed)
+    picks = rng.sample(recipes, 10)
+    return {
+        'dinners': [
+            {'day': day, 'recipe_id': r['id'], 'recipe_name': r['name'], 'vegetables': list(r['main_veg'])}
+            for day, r in zip(DAYS, picks)
+        ],
+        'lunches': {
+            day: {'recipe_id': r['id'], 'recipe_name': r['name'], 'prep_components': list(r['main_veg'][:1])}
+            for day, r in zip(DAYS, picks[5:])
+        },
+        'excluded_items': [],
+    }
+
+
+def make_recipe_contents(recipes):
+    """{recipe_id: {'ingredients', 'prep_steps', 'instructions'}} as get_recipe_contents returns."""
+    return {
+        r['id']: {'ingredients': list(r['ingredients']), 'prep_steps': list(r.get('prep_steps') or []), 'instructions': []}
+        for r in recipes
+    }
@@ -24,111 +24,143 @@ def load_yaml(path):
     with open(path, 'r') as f:
         return yaml.safe_load(f)
 
-def compute_analytics(history_data=None, start_date=None, end_date=None):
-    history = history_data if history_data else load_yaml(HISTORY_FILE)
-    recipes = load_yaml(RECIPE_INDEX) or []
-    
-    if not history or 'weeks' not in history:
-        return {"status": "error", "message": "No history found"}
+def rollup_week(week, week_of=None):
+    """
+    Reduce one week of history to the counters analytics needs.
 
-    # Initialize data structures
-    recipe_stats = collections.defaultdict(lambda: {
-        'count': 0, 
-        'made_count': 0, 
-        'skip_count': 0, 
-        'feedback_scores': [], 
-        'cuisines': set(),
-        'kid_feedback': []
-    })
-    
-    overall_stats = {
-        'total_weeks': len(history['weeks']),
-        'total_dinners_planned': 0,
-        'total_dinners_made': 0,
-        'total_dinners_skipped': 0,
-        'total_freezer_used': 0,
-        'total_freezer_created': 0,
-        'cuisine_distribution': collections.Counter(),
-        'weekly_adherence': [],
-        'kid_preferences': collections.Counter() # To track overall favs/dislikes
+    Rollups are small, JSON-safe and mergeable: merge_rollups() over the
+    rollups of any set of weeks gives the same result as processing the raw
+    history for those weeks. Per-recipe entries are a list (not a dict) so
+    first-seen order survives a JSONB round trip.
+    """
+    rollup = {
+        'week_of': str(week_of or week['week_of']),
+        'adherence': week.get('plan_adherence_pct', 0),
+        'dinners_planned': 0,
+        'dinners_made': 0,
+        'dinners_skipped': 0,
+        'freezer_used': 0,
+        'freezer_created': 0,
+        'cuisines': {},
+        'kid_preferences': {},
+        'recipes': []
     }
+    recipe_stats = {}
 
-    # Time range: Last 12 weeks
-    now = datetime.now()
-    twelve_weeks_ago = now - timedelta(weeks=12)
-    
-    for week in history['weeks']:
-        week_date = datetime.strptime(week['week_of'], '%Y-%m-%d')
-        is_recent = week_date >= twelve_weeks_ago
-        
-        overall_stats['weekly_adherence'].append({
-            'week_of': week['week_of'],
-            'adherence': week.get('plan_adherence_pct', 0)
+    # Process Dinners
+    for dinner in week.get('dinners', []):
+        recipe_id = dinner.get('recipe_id')
+        if not recipe_id or recipe_id == 'unplanned_meal':
+            continue
+
+        rollup['dinners_planned'] += 1
+
+        stats = recipe_stats.get(recipe_id)
+        if stats is None:
+            stats = {
+                'id': recipe_id,
+                'count': 0,
+                'made_count': 0,
+                'skip_count': 0,
+                'feedback_sum': 0,
+                'feedback_count': 0,
+                'cuisines': [],
+                'last_feedback': None
+            }
+            recipe_stats[recipe_id] = stats
+            rollup['recipes'].append(stats)
+        stats['count'] += 1
+
+        made_status = dinner.get('made')
+        if made_status is True:
+            rollup['dinners_made'] += 1
+            stats['made_count'] += 1
+        elif made_status is False:
+            rollup['dinners_skipped'] += 1
+            stats['skip_count'] += 1
+        elif made_status == 'freezer_backup':
+            rollup['freezer_used'] += 1
+            stats['made_count'] += 1 # Technically made something, but from freezer
+
+        if dinner.get('made_2x_for_freezer'):
+            rollup['freezer_created'] += 1
+
+        if 'cuisine' in dinner:
+            cuisine = dinner['cuisine']
+            rollup['cuisines'][cuisine] = rollup['cuisines'].get(cuisine, 0) + 1
+            if cuisine not in stats['cuisines']:
+                stats['cuisines'].append(cuisine)
+
+        # Handle kids_feedback (emoji)
+        feedback = dinner.get('kids_feedback')
+        if feedback in FEEDBACK_SCORES:
+            stats['feedback_sum'] += FEEDBACK_SCORES[feedback]
+            stats['feedback_count'] += 1
+            stats['last_feedback'] = feedback
+            rollup['kid_preferences'][feedback] = rollup['kid_preferences'].get(feedback, 0) + 1
+
+    # Process Daily Feedback (Snacks/Lunches)
+    if 'daily_feedback' in week:
+        for day, feedback in week['daily_feedback'].items():
+            for meal_type in ['school_snack', 'home_snack', 'kids_lunch', 'adult_lunch']:
+                f_val = feedback.get(meal_type)
+                if f_val in FEEDBACK_SCORES:
+                    rollup['kid_preferences'][f_val] = rollup['kid_preferences'].get(f_val, 0) + 1
+
+    return rollup
+
+def merge_rollups(rollups, recipes=None):
+    """Combine week rollups (in history order) into the analytics payload."""
+    if recipes is None:
+        recipes = load_yaml(RECIPE_INDEX) or []
+    recipes_by_id = {}
+    for r in recipes:
+        recipes_by_id.setdefault(r['id'], r)
+
+    recipe_stats = {}
+    weekly_adherence = []
+    totals = collections.Counter()
+    cuisine_distribution = collections.Counter()
+    kid_preferences = collections.Counter()
+
+    for rollup in rollups:
+        weekly_adherence.append({
+            'week_of': rollup['week_of'],
+            'adherence': rollup.get('adherence', 0)
         })
+        for key in ['freezer_used', 'freezer_created']:
+            totals[key] += rollup.get(key, 0)
+        cuisine_distribution.update(rollup.get('cuisines', {}))
+        kid_preferences.update(rollup.get('kid_preferences', {}))
 
-        # Process Dinners
-        for dinner in week.get('dinners', []):
-            recipe_id = dinner.get('recipe_id')
-            if not recipe_id or recipe_id == 'unplanned_meal':
-                continue
-            
-            overall_stats['total_dinners_planned'] += 1
-            
-            stats = recipe_stats[recipe_id]
-            stats['count'] += 1
-            
-            made_status = dinner.get('made')
-            if made_status is True:
-                overall_stats['total_dinners_made'] += 1
-                stats['made_count'] += 1
-            elif made_status is False:
-                overall_stats['total_dinners_skipped'] += 1
-                stats['skip_count'] += 1
-            elif made_status == 'freezer_backup':
-                overall_stats['total_freezer_used'] += 1
-                stats['made_count'] += 1 # Technically made something, but from freezer
-            
-            if dinner.get('made_2x_for_freezer'):
-                overall_stats['total_freezer_created'] += 1
-            
-            if 'cuisine' in dinner:
-                overall_stats['cuisine_distribution'][dinner['cuisine']] += 1
-                stats['cuisines'].add(dinner['cuisine'])
-
-            # Handle kids_feedback (emoji)
-            feedback = dinner.get('kids_feedback')
-            if feedback in FEEDBACK_SCORES:
-                score = FEEDBACK_SCORES[feedback]
-                stats['feedback_scores'].append(score)
-                stats['kid_feedback'].append(feedback)
-                overall_stats['kid_preferences'][feedback] += 1
-
-        # Process Daily Feedback (Snacks/Lunches)
-        if 'daily_feedback' in week:
-            for day, feedback in week['daily_feedback'].items():
-                for meal_type in ['school_snack', 'home_snack', 'kids_lunch', 'adult_lunch']:
-                    f_val = feedback.get(meal_type)
-                    if f_val in FEEDBACK_SCORES:
-                        overall_stats['kid_preferences'][f_val] += 1
+        for entry in rollup.get('recipes', []):
+            stats = recipe_stats.get(entry['id'])
+            if stats is None:
+                stats = {'count': 0, 'made_count': 0, 'skip_count': 0, 'feedback_sum': 0,
+                         'feedback_count': 0, 'cuisines': set(), 'last_feedback': None}
+                recipe_stats[entry['id']] = stats
+            for key in ['count', 'made_count', 'skip_count', 'feedback_sum', 'feedback_count']:
+                stats[key] += entry.get(key, 0)
+            stats['cuisines'].update(entry.get('cuisines', []))
+            if entry.get('last_feedback'):
+                stats['last_feedback'] = entry['last_feedback']
 
     # Finalize Recipe Popularity
     popularity_table = []
     for rid, stats in recipe_stats.items():
-        avg_score = sum(stats['feedback_scores']) / len(stats['feedback_scores']) if stats['feedback_scores'] else 0
+        avg_score = stats['feedback_sum'] / stats['feedback_count'] if stats['feedback_count'] else 0
         skip_rate = (stats['skip_count'] / stats['count'] * 100) if stats['count'] > 0 else 0
-        
-        recipe_info = next((r for r in recipes if r['id'] == rid), {})
-        
+
         popularity_table.append({
             'id': rid,
-            'name': recipe_info.get('name', rid.replace('_', ' ').title()),
+            'name': recipes_by_id.get(rid, {}).get('name', rid.replace('_', ' ').title()),
             'count': stats['count'],
             'made_count': stats['made_count'],
             'skip_count': stats['skip_count'],
             'avg_score': round(avg_score, 1),
             'skip_rate': round(skip_rate, 1),
             'cuisines': list(stats['cuisines']),
-            'last_feedback': stats['kid_feedback'][-1] if stats['kid_feedback'] else None
+            'last_feedback': stats['last_feedback']
         })
 
     # Sort by score and count
@@ -143,18 +175,34 @@ def compute_analytics(history_data=None, start_date=None, end_date=None):
     return {
         "status": "success",
         "overall": {
-            "total_weeks": overall_stats['total_weeks'],
-            "adherence_avg": round(sum(w['adherence'] for w in overall_stats['weekly_adherence']) / len(overall_stats['weekly_adherence']), 1) if overall_stats['weekly_adherence'] else 0,
-            "total_freezer_used": overall_stats['total_freezer_used'],
-            "total_freezer_created": overall_stats['total_freezer_created'],
-            "cuisine_distribution": dict(overall_stats['cuisine_distribution']),
-            "kid_preference_counts": dict(overall_stats['kid_preferences'])
+            "total_weeks": len(weekly_adherence),
+            "adherence_avg": round(sum(w['adherence'] for w in weekly_adherence) / len(weekly_adherence), 1) if weekly_adherence else 0,
+            "total_freezer_used": totals['freezer_used'],
+            "total_freezer_created": totals['freezer_created'],
+            "cuisine_distribution": dict(cuisine_distribution),
+            "kid_preference_counts": dict(kid_preferences)
         },
         "popularity": popularity_table,
         "retirement": retirement_candidates,
-        "weekly_adherence": overall_stats['weekly_adherence'][-12:] # Last 12 weeks
+        "weekly_adherence": weekly_adherence[-12:] # Last 12 weeks
     }
 
+def compute_analytics(history_data=None, start_date=None, end_date=None):
+    """Analytics over raw history (weeks in history order), optionally limited to a week_of range."""
+    history = history_data if history_data else load_yaml(HISTORY_FILE)
+    
+    if not history or 'weeks' not in history:
+        return {"status": "error", "message": "No history found"}
+
+    rollups = [rollup_week(week) for week in history['weeks']]
+    if start_date or end_date:
+        rollups = [r for r in rollups if in_range(r['week_of'], start_date, end_date)]
+    return merge_rollups(rollups)
+
+def in_range(week_of, start_date=None, end_date=None):
+    """True if week_of ('YYYY-MM-DD') falls within the optional inclusive bounds."""
+    return (not start_date or week_of >= str(start_date)) and (not end_date or week_of <= str(end_date))
+
 if __name__ == "__main__":
     import json
     print(json.dumps(compute_analytics(), indent=2))
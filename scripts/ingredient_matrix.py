@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Ingredient Matrix
+
+Sparse recipes x ingredients count matrix for scoring a whole catalog
+against the inventory in one product instead of one recipe at a time.
+
+Rows are recipes (catalog order) and columns are normalized ingredient
+terms. Each entry counts how often the term appears in the recipe's
+main_veg; duplicates are kept because the per-recipe scorers count them.
+Inventory is turned into a weight per column (see inventory_weights), and
+matrix @ weights gives every recipe's score (or just the requested rows').
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+
+class IngredientMatrix:
+    """Read-only sparse matrix over per-recipe ingredient term lists."""
+
+    def __init__(self, rows: Iterable[Sequence[str]]):
+        """
+        Args:
+            rows: One list of already-normalized terms per recipe
+        """
+        self.rows: List[List[str]] = [list(terms) for terms in rows]
+        self.columns: Dict[str, int] = {}
+        self._row_cols: List[List[int]] = []
+        for terms in self.rows:
+            cols = []
+            for term in terms:
+                col = self.columns.get(term)
+                if col is None:
+                    col = self.columns[term] = len(self.columns)
+                cols.append(col)
+            self._row_cols.append(cols)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def vector(self, weights: Dict[str, float]) -> List[float]:
+        """Dense column vector for {term: weight}; terms no recipe uses are dropped."""
+        vec = [0.0] * len(self.columns)
+        for term, weight in weights.items():
+            col = self.columns.get(term)
+            if col is not None:
+                vec[col] = weight
+        return vec
+
+    def dot(self, weights: Dict[str, float],
+            row_ids: Optional[Sequence[int]] = None) -> List[float]:
+        """Per-row sum of weights over the row's terms (matrix @ weights), for all or the given rows."""
+        vec = self.vector(weights)
+        row_cols = self._row_cols if row_ids is None else [self._row_cols[i] for i in row_ids]
+        return [float(sum(vec[c] for c in cols)) for cols in row_cols]
+
+
+def build_matrix(recipes: Iterable[Dict[str, Any]], normalize: Callable[[str], str],
+                 field: str = 'main_veg') -> IngredientMatrix:
+    """Matrix over `field` of each recipe, normalized (empty terms dropped)."""
+    rows = []
+    for recipe in recipes:
+        terms = [normalize(v) for v in (recipe.get(field) or [])]
+        rows.append([t for t in terms if t])
+    return IngredientMatrix(rows)
+
+
+# Inventory weights used by score_recipe_by_inventory
+FRIDGE_WEIGHT = 20.0
+PANTRY_WEIGHT = 5.0
+AGING_BONUS = 10.0  # fridge items this old should be used first
+AGING_DAYS = 5
+MAX_SCORE = 100.0
+
+
+def inventory_weights(inventory: Dict[str, Any]) -> Dict[str, float]:
+    """
+    {term: weight} from _load_inventory_data output. The fridge wins over the
+    pantry, and aging fridge items get a bonus.
+    """
+    weights = {item: PANTRY_WEIGHT for item in inventory.get('pantry_items', ())}
+    freshness = inventory.get('freshness', {})
+    for item in inventory.get('fridge_items', ()):
+        weights[item] = FRIDGE_WEIGHT + (AGING_BONUS if freshness.get(item, 0) >= AGING_DAYS else 0.0)
+    return weights
+
+
+def score_rows(matrix: IngredientMatrix, inventory: Dict[str, Any],
+               row_ids: Optional[Sequence[int]] = None) -> List[float]:
+    """Inventory scores (capped at MAX_SCORE) for every row, or the given rows."""
+    return [min(s, MAX_SCORE) for s in matrix.dot(inventory_weights(inventory), row_ids)]
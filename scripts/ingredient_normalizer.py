@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Shared ingredient-name normalization.
+
+Every matcher in the planner (inventory, shopping list, suggestions, dinner
+scoring) compares ingredient names through this module so they agree on one
+canonical form:
+
+- normalize_ingredient(name): lowercase, drop "(...)" and ", ..." tails,
+  singularize the last word, join words with underscores.
+- canonical_ingredient(name): normalize_ingredient plus alias folding
+  (bell_pepper -> pepper, roma_tomato -> tomato, ...). Used by planning.
+- strip_leading_quantity(text): drop "1 tsp"-style prefixes from recipe
+  ingredient lines (used by normalize_recipes for spices/fats).
+
+Plural exceptions, irregular plurals and aliases come from the
+`ingredient_normalization` section of recipes/taxonomy.yml. Results are
+memoized in a bounded LRU per normalizer, since normalization runs for every
+recipe x veg x inventory combination during planning.
+"""
+
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import yaml
+
+TAXONOMY_PATH = Path(__file__).resolve().parent.parent / 'recipes' / 'taxonomy.yml'
+DEFAULT_CACHE_SIZE = 8192
+
+_PARENS_RE = re.compile(r'\s*\(.*?\)')
+_COMMA_TAIL_RE = re.compile(r',.*')
+# Use word boundaries \b for units to avoid matching "green" as "g" unit
+_LEADING_QUANTITY_RE = re.compile(
+    r'^[\d\/\.\-\s]*(?:\b(?:tbsp|tsp|tspn|tablespoon|teaspoon|cup|g|oz|ml|large|small|medium)\b)?\s*',
+    re.IGNORECASE
+)
+
+
+class IngredientNormalizer:
+    """Normalizer with its own alias/plural tables and LRU memo."""
+
+    def __init__(
+        self,
+        aliases: Optional[Dict[str, str]] = None,
+        plural_exceptions: Optional[Iterable[str]] = None,
+        irregular_plurals: Optional[Dict[str, str]] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE
+    ):
+        self.aliases = dict(aliases or {})
+        self.plural_exceptions = {w.lower() for w in (plural_exceptions or [])}
+        self.irregular_plurals = {k.lower(): v.lower() for k, v in (irregular_plurals or {}).items()}
+        self._normalize_cached = lru_cache(maxsize=cache_size)(self._normalize)
+        self._canonical_cached = lru_cache(maxsize=cache_size)(self._canonical)
+
+    @classmethod
+    def from_taxonomy(cls, path: Path = TAXONOMY_PATH, cache_size: int = DEFAULT_CACHE_SIZE) -> 'IngredientNormalizer':
+        """Build a normalizer from the taxonomy file (empty tables if missing)."""
+        section = {}
+        try:
+            with open(path, 'r') as f:
+                section = (yaml.safe_load(f) or {}).get('ingredient_normalization') or {}
+        except (OSError, yaml.YAMLError) as e:
+            print(f"Warning: could not load ingredient normalization tables from {path}: {e}")
+        return cls(
+            aliases=section.get('aliases'),
+            plural_exceptions=section.get('plural_exceptions'),
+            irregular_plurals=section.get('irregular_plurals'),
+            cache_size=cache_size
+        )
+
+    def _normalize(self, name: str) -> str:
+        name = name.lower().strip()
+        name = _PARENS_RE.sub('', name)
+        name = _COMMA_TAIL_RE.sub('', name)
+
+        # Singularize the last word (crude suffix rules + taxonomy overrides)
+        head, _, last = name.rpartition(' ')
+        if last in self.irregular_plurals:
+            last = self.irregular_plurals[last]
+        elif last in self.plural_exceptions:
+            pass
+        elif last.endswith('oes'):
+            last = last[:-2]
+        elif last.endswith('ies'):
+            last = last[:-3] + 'y'
+        elif last.endswith('s') and not last.endswith('ss'):
+            last = last[:-1]
+        name = f"{head} {last}" if head else last
+
+        return name.replace(' ', '_')
+
+    def _canonical(self, name: str) -> str:
+        normalized = self._normalize_cached(name)
+        return self.aliases.get(normalized, normalized)
+
+    def normalize(self, name) -> str:
+        """Matching key for an ingredient name ("" for empty input)."""
+        if not name:
+            return ""
+        return self._normalize_cached(name)
+
+    def canonical(self, name) -> str:
+        """Matching key with alias folding applied ("" for empty input)."""
+        if not name:
+            return ""
+        return self._canonical_cached(name)
+
+    def cache_info(self) -> Dict[str, object]:
+        """LRU statistics for both memo tables."""
+        return {
+            'normalize': self._normalize_cached.cache_info()._asdict(),
+            'canonical': self._canonical_cached.cache_info()._asdict()
+        }
+
+
+_default_normalizer: Optional[IngredientNormalizer] = None
+_default_lock = threading.Lock()
+
+
+def get_normalizer() -> IngredientNormalizer:
+    """Process-wide normalizer, loaded from taxonomy.yml on first use."""
+    global _default_normalizer
+    if _default_normalizer is None:
+        with _default_lock:
+            if _default_normalizer is None:
+                _default_normalizer = IngredientNormalizer.from_taxonomy()
+    return _default_normalizer
+
+
+def set_normalizer(normalizer: Optional[IngredientNormalizer]) -> None:
+    """Swap the process-wide normalizer (None reloads from taxonomy.yml)."""
+    global _default_normalizer
+    with _default_lock:
+        _default_normalizer = normalizer
+
+
+def normalize_ingredient(name) -> str:
+    """Normalize ingredient name for matching."""
+    return get_normalizer().normalize(name)
+
+
+def canonical_ingredient(name) -> str:
+    """Normalize ingredient name and fold aliases (e.g. red_onion -> onion)."""
+    return get_normalizer().canonical(name)
+
+
+def strip_leading_quantity(text: str) -> str:
+    """Remove a leading quantity/unit prefix ("1/2 tsp ", "2 large ")."""
+    return _LEADING_QUANTITY_RE.sub('', text)
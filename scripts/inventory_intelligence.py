@@ -2,21 +2,64 @@ import re
 import os
 from api.utils.storage import StorageEngine
 from api.utils.grocery_mapper import EXCLUDED_STAPLES
-def normalize_ingredient(name):
-    """Normalize ingredient name for matching."""
-    if not name: return ""
-    name = name.lower().strip()
-    # Remove contents in parens
-    name = re.sub(r'\s*\(.*?\)', '', name)
-    # Remove everything after comma
-    name = re.sub(r',.*', '', name)
-    # Singularize crude approach
-    if name.endswith('oes'): name = name[:-2]
-    elif name.endswith('ies'): name = name[:-3] + 'y'
-    elif name.endswith('s') and not name.endswith('ss'): name = name[:-1]
-    
-    return name.replace(' ', '_')
+from scripts.ingredient_normalizer import normalize_ingredient
+from scripts.ingredient_matrix import IngredientMatrix
+
+
+class IngredientIndex:
+    """
+    Inverted index over a recipe list for inventory-driven suggestions.
+
+    - by_veg: normalized main_veg -> recipe positions
+    - by_trigram: 3-char grams of the normalized title -> recipe positions
+    - veg_matrix: recipes x normalized main_veg (see ingredient_matrix.py)
+
+    Title matching in the scorers is a substring test (`item in norm_title`),
+    so trigram postings only narrow the candidates; every hit is verified
+    against the title. Positions are catalog positions, which keeps the
+    scorers' stable sort (and therefore their output) unchanged.
+    """
 
+    def __init__(self, recipes):
+        self.recipes = list(recipes or [])
+        self.titles = []
+        self.veg = []
+        self.by_veg = {}
+        self.by_trigram = {}
+        for pos, recipe in enumerate(self.recipes):
+            title = normalize_ingredient(recipe.get('name', ''))
+            self.titles.append(title)
+            pairs = [(v, normalize_ingredient(v)) for v in (recipe.get('main_veg') or [])]
+            self.veg.append(pairs)
+            for _, norm in pairs:
+                postings = self.by_veg.setdefault(norm, [])
+                if not postings or postings[-1] != pos:
+                    postings.append(pos)
+            for i in range(len(title) - 2):
+                self.by_trigram.setdefault(title[i:i + 3], set()).add(pos)
+        self.veg_matrix = IngredientMatrix([norm for _, norm in pairs] for pairs in self.veg)
+
+    def positions_with_veg(self, norm_item):
+        return self.by_veg.get(norm_item, [])
+
+    def positions_with_title_substring(self, fragment):
+        """Positions whose normalized title contains `fragment`."""
+        if len(fragment) < 3:
+            return [pos for pos, title in enumerate(self.titles) if fragment in title]
+        candidates = None
+        for i in range(len(fragment) - 2):
+            postings = self.by_trigram.get(fragment[i:i + 3])
+            if not postings:
+                return []
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return []
+        return [pos for pos in candidates if fragment in self.titles[pos]]
+
+
+def _get_ingredient_index(recipes):
+    """IngredientIndex for the household catalog, rebuilt only when it changes."""
+    return StorageEngine.get_catalog_artifact('ingredient_index', lambda: IngredientIndex(recipes))
 
 
 def get_inventory_items():
@@ -58,6 +101,37 @@ def get_inventory_items():
         print(f"Error loading inventory from DB: {e}")
         return set(), {}
 
+def _rank_fridge_shop(index, inventory_set):
+    """
+    Score recipes by inventory use: +2 per main_veg in inventory, +1 per
+    inventory item (len > 3) found in the title. main_veg scores for the
+    whole catalog come from one product with the ingredient matrix; title
+    hits are accumulated via the trigram index.
+    """
+    recipes = index.recipes
+    title_hits = {}
+    for item in inventory_set:
+        if len(item) > 3: # Avoid short partial matches
+            for pos in index.positions_with_title_substring(item):
+                title_hits[pos] = title_hits.get(pos, 0) + 1
+    veg_scores = index.veg_matrix.dot({item: 2 for item in inventory_set})
+
+    scored_recipes = []
+    for pos, veg_score in enumerate(veg_scores):
+        score = title_hits.get(pos, 0) + int(veg_score)
+        if score > 0:
+            # Check main veg
+            matches = [veg for veg, norm_veg in index.veg[pos] if norm_veg in inventory_set]
+            scored_recipes.append({
+                'recipe': recipes[pos],
+                'score': score,
+                'matches': matches
+            })
+            
+    # Sort by score descending
+    scored_recipes.sort(key=lambda x: x['score'], reverse=True)
+    return scored_recipes
+
 def get_substitutions(limit=3):
     """
     Find recipe suggestions based on current inventory.
@@ -93,33 +167,9 @@ def get_substitutions(limit=3):
             })
             
     # 2. Fridge Shop (Match ingredients)
-    scored_recipes = []
-    for recipe in recipes:
-        score = 0
-        matches = []
-        
-        # Check main veg
-        for veg in (recipe.get('main_veg') or []):
-            norm_veg = normalize_ingredient(veg)
-            if norm_veg in inventory_set:
-                score += 2
-                matches.append(veg)
-                
-        # Check title content (heuristic)
-        norm_title = normalize_ingredient(recipe.get('name', ''))
-        for item in inventory_set:
-            if item in norm_title and len(item) > 3: # Avoid short partial matches
-                score += 1
-                
-        if score > 0:
-            scored_recipes.append({
-                'recipe': recipe,
-                'score': score,
-                'matches': matches
-            })
-            
-    # Sort by score descending
-    scored_recipes.sort(key=lambda x: x['score'], reverse=True)
+    index = _get_ingredient_index(recipes)
+    recipes = index.recipes
+    scored_recipes = _rank_fridge_shop(index, inventory_set)
     
     # Diversity filter
     selected_for_fridge = []
@@ -193,16 +243,26 @@ def get_waste_not_suggestions(limit=4):
         recipes = []
         
     scored_recipes = []
+
+    # Only recipes that use a leftover (by title) or an inventory veg can score
+    index = _get_ingredient_index(recipes)
+    recipes = index.recipes
+    candidates = set()
+    for lo in set(leftovers):
+        candidates.update(index.positions_with_title_substring(lo))
+    for item in inventory_set:
+        candidates.update(index.positions_with_veg(item))
     
-    for recipe in recipes:
+    for pos in sorted(candidates):
+        recipe = recipes[pos]
         score = 0
         rationale = []
         
         # Check leftovers
+        norm_name = index.titles[pos]
         for lo in leftovers:
             # Heuristic: Check if recipe name or ingredients match leftover
             # e.g. "Rice" -> "Fried Rice"
-            norm_name = normalize_ingredient(recipe.get('name', ''))
             if lo in norm_name:
                 score += 10
                 rationale.append(f"Uses leftover {lo}")
@@ -212,8 +272,7 @@ def get_waste_not_suggestions(limit=4):
             
         # Check fridge items (Perishables)
         # We assume anything in 'fridge' is perishable
-        for veg in (recipe.get('main_veg') or []):
-            norm_veg = normalize_ingredient(veg)
+        for veg, norm_veg in index.veg[pos]:
             if norm_veg in inventory_set:
                 score += 3
                 rationale.append(f"Uses {veg}")
@@ -231,6 +290,32 @@ def get_waste_not_suggestions(limit=4):
     
     return scored_recipes[:limit]
 
+def _content_recipe_ids(slot):
+    """
+    Recipe ids of a dinner or lunch that have recipe content to shop for.
+    Leftovers ('leftover:<item>') and freezer backups (the id is the stash
+    entry, not a recipe) have none.
+    """
+    if isinstance(slot, dict):
+        if slot.get('made') == 'freezer_backup':
+            return []
+        ids = (slot['recipe_ids'] or []) if 'recipe_ids' in slot else [slot.get('recipe_id')]
+    else:
+        ids = [getattr(slot, 'recipe_id', None)]
+    return [rid for rid in ids if rid and isinstance(rid, str) and not rid.startswith('leftover:')]
+
+def _collect_plan_recipe_ids(plan_data):
+    """All recipe ids with content referenced by dinners and lunches."""
+    ids = []
+    for dinner in plan_data.get('dinners', []):
+        ids.extend(_content_recipe_ids(dinner))
+
+    lunches = plan_data.get('lunches', {})
+    if isinstance(lunches, dict):
+        for lunch in lunches.values():
+            ids.extend(_content_recipe_ids(lunch))
+    return ids
+
 def get_shopping_list(plan_data, return_warnings=False):
     """
     Generate shopping list by identifying missing ingredients from plan.
@@ -254,21 +339,20 @@ def get_shopping_list(plan_data, return_warnings=False):
             pantry_basics.add(normalize_ingredient(item))
     except: pass
 
+    # Fetch all recipe content for the week in a single round-trip
+    recipe_contents = StorageEngine.get_recipe_contents(_collect_plan_recipe_ids(plan_data))
+
     # 1. Dinners (Main veggies/ingredients)
     for dinner in plan_data.get('dinners', []):
         # Support multi-recipe aggregation
-        recipes_to_process = []
-        if 'recipe_ids' in dinner:
-            recipes_to_process = dinner['recipe_ids'] or []
-        elif 'recipe_id' in dinner:
-            recipes_to_process = [dinner['recipe_id']] if dinner['recipe_id'] else []
-            
+        recipes_to_process = _content_recipe_ids(dinner)
+
         # Collect ingredients from all recipes in this slot
         ingredients_to_check = set(dinner.get('vegetables', []))
         for rid in recipes_to_process:
             if not rid: continue
             try:
-                content = StorageEngine.get_recipe_content(rid)
+                content = recipe_contents.get(rid)
                 if not content: 
                     msg = f"No content found for recipe {rid}"
                     print(f"[DEBUG] {msg}")
@@ -314,22 +398,17 @@ def get_shopping_list(plan_data, return_warnings=False):
     if isinstance(lunches, dict):
         for day, lunch in lunches.items():
             # Support multi-recipe aggregation
-            recipes_to_process = []
+            recipes_to_process = _content_recipe_ids(lunch)
             if isinstance(lunch, dict):
-                if 'recipe_ids' in lunch: recipes_to_process = lunch['recipe_ids'] or []
-                elif 'recipe_id' in lunch: recipes_to_process = [lunch['recipe_id']]
                 components = lunch.get('prep_components') or []
             else:
                 components = getattr(lunch, 'prep_components', []) or []
-                rid = getattr(lunch, 'recipe_id', None)
-                if rid: recipes_to_process = [rid]
-            
+
             # Aggregate ingredients/components from all recipes
             all_comps = set(components)
             for rid in recipes_to_process:
-                if rid and rid.startswith('leftover:'): continue
                 try:
-                    content = StorageEngine.get_recipe_content(rid)
+                    content = recipe_contents.get(rid) or {}
                     for ing in content.get('ingredients', []):
                         all_comps.add(ing)
                 except: pass
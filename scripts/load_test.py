@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Concurrency load test of the Flask API against the fake Supabase backend.
+
+Seeds an in-process fake database with synthetic data (one household), then
+drives the real app from N client threads and reports throughput, latency
+percentiles and Supabase round-trips per request for each route. Raise
+--latency-ms to see how request cost scales with round-trips.
+
+Usage:
+    python scripts/load_test.py [--threads 8] [--requests 50] [--latency-ms 20]
+                                [--scale small|medium|large]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add repo root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+HOUSEHOLD_ID = "00000000-0000-0000-0000-000000000001"
+TOKEN = 'MAGIC_TEST_TOKEN'
+
+ROUTES = [
+    '/api/status',
+    '/api/recipes',
+    '/api/recipes/search?q=spicy',
+    '/api/inventory',
+    '/api/analytics',
+    '/api/recipes/paired?main_id=recipe_00001',
+]
+
+
+def seed_tables(scale):
+    """Fake-database tables for one household built from the benchmark generators."""
+    from scripts.benchmarks import synthetic
+
+    recipes, weeks, inventory = synthetic.SCALES[scale]
+    catalog = synthetic.make_recipes(recipes)
+    history = synthetic.make_history(weeks, catalog)
+    stock = synthetic.make_inventory(inventory)
+
+    inventory_rows = []
+    for category, items in (('fridge', stock['fridge']), ('pantry', stock['pantry']),
+                            ('spice_rack', stock['spice_rack']), ('freezer_ingredient', stock['freezer']['ingredients'])):
+        for item in items:
+            inventory_rows.append({'household_id': HOUSEHOLD_ID, 'category': category, 'item': item['item'],
+                                   'quantity': item['quantity'], 'unit': item['unit'], 'metadata': {}})
+    for backup in stock['freezer']['backups']:
+        inventory_rows.append({'household_id': HOUSEHOLD_ID, 'category': 'freezer_backup', 'item': backup['meal'],
+                               'quantity': backup['servings'], 'unit': 'servings', 'metadata': {}})
+
+    plans = [
+        {'household_id': HOUSEHOLD_ID, 'week_of': week['week_of'], 'status': 'archived',
+         'plan_data': synthetic.make_plan(catalog, seed=i), 'history_data': week}
+        for i, week in enumerate(history['weeks'])
+    ]
+    plans[-1]['status'] = 'active'
+
+    return {
+        'households': [{'id': HOUSEHOLD_ID, 'name': 'Load Test Household', 'config': {'timezone': 'UTC'}}],
+        'recipes': [{'id': r['id'], 'household_id': HOUSEHOLD_ID, 'name': r['name'],
+                     'metadata': {k: v for k, v in r.items() if k not in ('id', 'name')}, 'content': ''}
+                    for r in catalog],
+        'meal_plans': plans,
+        'inventory_items': inventory_rows,
+    }
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API against the fake Supabase backend.")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help="Requests per thread")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="Injected latency per Supabase round-trip")
+    parser.add_argument('--scale', choices=['small', 'medium', 'large'], default='small')
+    args = parser.parse_args()
+
+    # Must be set before the app (and storage) is imported
+    os.environ['SUPABASE_BACKEND'] = 'fake'
+    os.environ['FAKE_SUPABASE_LATENCY_MS'] = str(args.latency_ms)
+    os.environ.pop('DISABLE_AUTH', None)
+
+    from api.index import app
+    from api.utils import storage
+
+    storage.supabase.store.tables.update(seed_tables(args.scale))
+    headers = {'Authorization': f'Bearer {TOKEN}'}
+
+    # Warm pass, one route at a time, to count round-trips per request
+    print(f"Round-trips per request (warm, {args.latency_ms:g} ms each):")
+    with app.test_client() as client:
+        for route in ROUTES:
+            client.get(route, headers=headers)
+            storage.supabase.store.reset_stats()
+            res = client.get(route, headers=headers)
+            print(f"  {route:<45} {res.status_code}  {storage.supabase.stats()['round_trips']:>3}")
+
+    latencies = {route: [] for route in ROUTES}
+    errors = []
+    lock = threading.Lock()
+
+    def worker(n):
+        with app.test_client() as client:
+            for i in range(args.requests):
+                route = ROUTES[(n + i) % len(ROUTES)]
+                started = time.perf_counter()
+                res = client.get(route, headers=headers)
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies[route].append(elapsed)
+                    if res.status_code >= 400:
+                        errors.append((route, res.status_code))
+
+    storage.supabase.store.reset_stats()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"\n{total} requests from {args.threads} threads in {wall:.2f}s ({total / wall:.1f} req/s), "
+          f"{storage.supabase.stats()['round_trips']} round-trips, {len(errors)} errors")
+    print(f"  {'route':<45} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for route, values in latencies.items():
+        if values:
+            print(f"  {route:<45} {statistics.median(values):>8.1f} {percentile(values, 95):>8.1f} {max(values):>8.1f}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,12 +10,17 @@ Selects lunch recipes based on:
 - Repeatable defaults for decision fatigue reduction
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 from datetime import datetime
 import yaml
 import os
 
+try:
+    from scripts.recipe_index import RecipeIndex
+except ImportError:
+    from recipe_index import RecipeIndex
+
 @dataclass
 class LunchSuggestion:
     """Represents a lunch suggestion with prep details."""
@@ -35,14 +40,12 @@ class LunchSuggestion:
 class LunchSelector:
     """Selects lunch recipes based on weekly dinner plan and constraints."""
 
-    def __init__(self, recipe_index_path: str = 'recipes/index.yml', config_path: str = 'config.yml', recipes: List[Dict[str, Any]] = None):
-        """Initialize selector with recipe index."""
+    def __init__(self, recipe_index_path: str = 'recipes/index.yml', config_path: str = 'config.yml', recipes: Union[List[Dict[str, Any]], RecipeIndex] = None):
+        """Initialize selector with recipe index (a list or a prebuilt RecipeIndex)."""
         self.recipe_index_path = recipe_index_path
         self.config_path = config_path
-        if recipes:
-            self.recipes = recipes
-        else:
-            self.recipes = self._load_recipes()
+        self.index = RecipeIndex.ensure(recipes if recipes else self._load_recipes())
+        self.recipes = self.index.recipes
         self.config = self._load_config()
         self.kid_profiles = self.config.get('kid_profiles', {})
 
@@ -53,6 +56,17 @@ class LunchSelector:
         })
         self.lunch_recipes = self._filter_lunch_suitable()
 
+    @property
+    def kid_profiles(self) -> Dict[str, Any]:
+        return self._kid_profiles
+
+    @kid_profiles.setter
+    def kid_profiles(self, profiles: Dict[str, Any]):
+        # Avoid masks are resolved once per profile set, not per recipe
+        self._kid_profiles = profiles or {}
+        self._profile_masks = self.index.safety.profile_masks(self._kid_profiles)
+        self._avoid_mask = self.index.safety.combined_mask(self._kid_profiles)
+
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration."""
         if os.path.exists(self.config_path):
@@ -73,19 +87,8 @@ class LunchSelector:
             'soup_stew', 'pasta_noodles', 'appetizer'
         }
 
-        lunch_recipes = []
-        for r in self.recipes:
-            # Include if explicitly marked as lunch_suitable
-            if r.get('lunch_suitable', False):
-                lunch_recipes.append(r)
-                continue
-
-            # Include if meal_type is lunch-friendly
-            meal_type = r.get('meal_type', 'unknown')
-            if meal_type in lunch_meal_types:
-                lunch_recipes.append(r)
-
-        return lunch_recipes
+        # Explicitly marked as lunch_suitable, or a lunch-friendly meal_type
+        return self.index.select(meal_types=lunch_meal_types, flags=['lunch_suitable'])
 
     def select_weekly_lunches(
         self,
@@ -179,10 +182,7 @@ class LunchSelector:
 
     def _find_recipe_by_id(self, recipe_id: str) -> Optional[Dict[str, Any]]:
         """Find recipe by ID in index."""
-        for recipe in self.recipes:
-            if recipe.get('id') == recipe_id:
-                return recipe
-        return None
+        return self.index.get(recipe_id)
 
     def _select_daily_lunch(
         self,
@@ -380,14 +380,10 @@ class LunchSelector:
 
         results = {}
         recipe_name = recipe.get('name', recipe.get('id'))
-        
-        for name, profile in self.kid_profiles.items():
-            avoid = set(profile.get('avoid_ingredients', []))
-            recipe_contains = set(recipe.get('avoid_contains', []))
-            
+        for name, avoid_mask in self._profile_masks.items():
             # Check for conflict
-            conflict = avoid.intersection(recipe_contains)
-            
+            conflict = self.index.safety.conflicts(recipe, avoid_mask)
+
             if conflict:
                 # For now, just mark it. In future, could select alternative.
                 conflict_str = ", ".join(list(conflict))
@@ -496,13 +492,7 @@ class LunchSelector:
 
     def _is_safe(self, recipe: Dict[str, Any]) -> bool:
         """Check if recipe is safe for all kids."""
-        if not self.kid_profiles: return True
-        recipe_contains = set(recipe.get('avoid_contains', []))
-        for profile in self.kid_profiles.values():
-            avoid = set(profile.get('avoid_ingredients', []))
-            if avoid.intersection(recipe_contains):
-                return False
-        return True
+        return self.index.safety.is_safe(recipe, self._avoid_mask)
 
     def _determine_prep_day(self, lunch_day: str, prep_style: str) -> str:
         """
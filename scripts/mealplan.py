@@ -13,6 +13,11 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from collections import Counter
 
+try:
+    from scripts.safety_masks import SafetyMasks
+except ImportError:
+    from safety_masks import SafetyMasks
+
 
 # ============================================================================
 # Intake Command - Phase 2
@@ -372,7 +377,8 @@ def get_recent_recipes(history, lookback_weeks=3):
 def filter_recipes_by_meal_type(recipes, inputs, recent_recipes, meal_type='dinner'):
     """Filter recipes based on meal type (dinner, lunch, snack)."""
     filtered = []
-    avoid_ingredients = set(inputs.get('preferences', {}).get('avoid_ingredients', []))
+    safety = getattr(recipes, 'safety', None) or SafetyMasks(recipes)
+    avoid_mask = safety.avoid_mask(inputs.get('preferences', {}).get('avoid_ingredients', []))
 
     # Define meal_types suitable for each context
     meal_type_categories = {
@@ -400,7 +406,7 @@ def filter_recipes_by_meal_type(recipes, inputs, recent_recipes, meal_type='dinn
             continue
 
         # Skip if contains avoided ingredients
-        if any(ing in avoid_ingredients for ing in recipe.get('avoid_contains', [])):
+        if not safety.is_safe(recipe, avoid_mask):
             continue
 
         # Skip if meal_type is unknown (not categorized yet)
@@ -7,6 +7,11 @@ from pathlib import Path
 import difflib
 import sys
 
+try:
+    from scripts.ingredient_normalizer import strip_leading_quantity
+except ImportError:
+    from ingredient_normalizer import strip_leading_quantity
+
 # Configuration
 RECIPE_DIR = Path("recipes/details")
 SCHEMA_REQUIRED_KEYS = ["title", "ingredients", "prep_steps", "cook_steps"]
@@ -52,8 +57,7 @@ def normalize_ingredient(ingredient):
     ing_lower = ing.lower()
     if any(kw in ing_lower for kw in RESTRICTED_QUANTITY_KEYWORDS):
         # Strip common quantity prefixes
-        # Use word boundaries \b for units to avoid matching "green" as "g" unit
-        ing = re.sub(r'^[\d\/\.\-\s]*(?:\b(?:tbsp|tsp|tspn|tablespoon|teaspoon|cup|g|oz|ml|large|small|medium)\b)?\s*', '', ing, flags=re.IGNORECASE)
+        ing = strip_leading_quantity(ing)
     
     # Capitalize first letter if it's a common name
     return ing[0].upper() + ing[1:] if ing else ing
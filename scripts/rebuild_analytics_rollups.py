@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Rebuild analytics rollups from existing meal-plan history.
+
+Recomputes the per-week rollup for every meal_plans row with history_data
+(all households, or one with --household) and upserts them into
+analytics_rollups. Safe to re-run; /api/analytics also fills in any week
+that is missing a rollup on first read.
+
+Usage:
+    python scripts/rebuild_analytics_rollups.py [--household UUID] [--dry-run]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add repo root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from api.utils.storage import supabase, execute_with_retry, IS_SERVICE_ROLE
+from scripts.compute_analytics import rollup_week
+
+PAGE_SIZE = 200
+
+
+def iter_history_rows(household_id=None):
+    """Yield (household_id, week_of, history_data) a page at a time."""
+    start = 0
+    while True:
+        query = supabase.table("meal_plans").select("household_id, week_of, history_data").not_.is_("history_data", "null")
+        if household_id:
+            query = query.eq("household_id", household_id)
+        query = query.order("household_id").order("week_of").range(start, start + PAGE_SIZE - 1)
+        rows = execute_with_retry(query).data or []
+        for row in rows:
+            yield row['household_id'], str(row['week_of']), row['history_data']
+        if len(rows) < PAGE_SIZE:
+            return
+        start += PAGE_SIZE
+
+
+def rebuild(household_id=None, dry_run=False):
+    batch, total = [], 0
+    for h_id, week_of, history in iter_history_rows(household_id):
+        batch.append({"household_id": h_id, "week_of": week_of, "rollup": rollup_week(history or {}, week_of=week_of)})
+        if len(batch) >= PAGE_SIZE:
+            total += flush(batch, dry_run)
+            batch = []
+    if batch:
+        total += flush(batch, dry_run)
+    return total
+
+
+def flush(rows, dry_run):
+    if not dry_run:
+        query = supabase.table("analytics_rollups").upsert(rows, on_conflict="household_id,week_of")
+        execute_with_retry(query)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill analytics rollups from meal-plan history.")
+    parser.add_argument('--household', help="Only rebuild this household")
+    parser.add_argument('--dry-run', action='store_true', help="Compute rollups without writing them")
+    args = parser.parse_args()
+
+    if not supabase:
+        print("Supabase client is not configured. Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY.")
+        return 1
+    if not IS_SERVICE_ROLE and not args.dry_run:
+        print("SUPABASE_SERVICE_ROLE_KEY is missing. Cannot write to database.")
+        return 1
+
+    total = rebuild(args.household, args.dry_run)
+    print(f"{'Computed' if args.dry_run else 'Rebuilt'} {total} weekly rollup(s).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Recipe Index
+
+Lookup structure built once from a recipe list so planning code can resolve
+recipes by id, meal type, effort level, flags and main vegetable without
+re-scanning the whole catalog inside per-day loops.
+
+All bucket lists preserve the catalog order of the source list, so code that
+switches from a linear scan to the index selects the same recipes.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from scripts.ingredient_normalizer import canonical_ingredient
+    from scripts.safety_masks import SafetyMasks
+    from scripts.ingredient_matrix import IngredientMatrix
+except ImportError:
+    from ingredient_normalizer import canonical_ingredient
+    from safety_masks import SafetyMasks
+    from ingredient_matrix import IngredientMatrix
+
+# Boolean recipe flags that get their own bucket
+INDEXED_FLAGS = ('no_chop_compatible', 'lunch_suitable', 'snack_suitable')
+
+
+class RecipeIndex:
+    """Read-only index over a list of recipe dicts."""
+
+    def __init__(self, recipes: Iterable[Dict[str, Any]], normalize: Callable[[str], str] = None):
+        """
+        Build all lookup tables in a single pass.
+
+        Args:
+            recipes: Recipe dicts with at least an 'id' (catalog or index.yml shape)
+            normalize: Ingredient normalizer for main_veg keys (defaults to
+                canonical_ingredient so keys match inventory matching)
+        """
+        self.recipes: List[Dict[str, Any]] = list(recipes or [])
+        self._normalize = normalize or canonical_ingredient
+
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self._position: Dict[str, int] = {}
+        self.by_meal_type: Dict[str, List[str]] = defaultdict(list)
+        self.by_effort_level: Dict[str, List[str]] = defaultdict(list)
+        self.by_flag: Dict[str, List[str]] = {flag: [] for flag in INDEXED_FLAGS}
+        self.by_main_veg: Dict[str, List[str]] = defaultdict(list)
+        self._normalized_veg: Dict[str, List[str]] = {}
+        self._inventory_matrix: Optional[IngredientMatrix] = None
+
+        for position, recipe in enumerate(self.recipes):
+            rid = recipe.get('id')
+            if rid is None or rid in self.by_id:
+                # First occurrence wins, matching next(...) over the list
+                continue
+            self.by_id[rid] = recipe
+            self._position[rid] = position
+
+            self.by_meal_type[recipe.get('meal_type')].append(rid)
+            self.by_effort_level[recipe.get('effort_level')].append(rid)
+            for flag in INDEXED_FLAGS:
+                if recipe.get(flag, False):
+                    self.by_flag[flag].append(rid)
+
+            normalized = [self._normalize(v) for v in (recipe.get('main_veg') or [])]
+            normalized = [v for v in normalized if v]
+            self._normalized_veg[rid] = normalized
+            for veg in dict.fromkeys(normalized):
+                self.by_main_veg[veg].append(rid)
+
+        # Avoid-ingredient bitmasks (see safety_masks.py)
+        self.safety = SafetyMasks(self.by_id.values())
+
+    @classmethod
+    def ensure(cls, recipes) -> 'RecipeIndex':
+        """Return `recipes` if it is already an index, otherwise index it."""
+        if isinstance(recipes, cls):
+            return recipes
+        return cls(recipes or [])
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.recipes)
+
+    def __contains__(self, recipe_id) -> bool:
+        return recipe_id in self.by_id
+
+    def get(self, recipe_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Recipe by id, or None."""
+        return self.by_id.get(recipe_id)
+
+    def get_many(self, recipe_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Recipes for the given ids, skipping unknown ids, in the given order."""
+        return [self.by_id[rid] for rid in recipe_ids if rid in self.by_id]
+
+    def normalized_main_veg(self, recipe_id: str) -> List[str]:
+        """Normalized main_veg for a recipe (duplicates kept, empties dropped)."""
+        return self._normalized_veg.get(recipe_id, [])
+
+    @property
+    def inventory_matrix(self) -> IngredientMatrix:
+        """Recipes x normalized main_veg matrix (rows in by_id order), built on first use."""
+        if self._inventory_matrix is None:
+            self._inventory_matrix = IngredientMatrix(self._normalized_veg[rid] for rid in self.by_id)
+        return self._inventory_matrix
+
+    def ids_with_main_veg(self, veg: str) -> List[str]:
+        """Recipe ids whose main_veg contains `veg` (already normalized)."""
+        return self.by_main_veg.get(veg, [])
+
+    def select(self, meal_types: Iterable[str] = (), flags: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """
+        Recipes matching any of the meal types or any of the indexed flags.
+
+        Returns:
+            Matching recipes in catalog order
+        """
+        ids = set()
+        for meal_type in meal_types:
+            ids.update(self.by_meal_type.get(meal_type, []))
+        for flag in flags:
+            ids.update(self.by_flag.get(flag, []))
+        return [self.by_id[rid] for rid in sorted(ids, key=self._position.__getitem__)]
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Recipe Search
+
+Ranked, typo-tolerant search over recipe names, tags, cuisine and main_veg
+for search-as-you-type.
+
+Every field is split into lowercase terms. A query word matches a term when
+- it equals the term,
+- it is a prefix of the term (the word still being typed), or
+- the two share enough trigrams (Jaccard >= FUZZY_THRESHOLD) to be a typo.
+
+Prefix lookups bisect a sorted term list and fuzzy candidates come from a
+trigram -> terms inverted index, so a query touches only the terms it could
+match instead of scanning the catalog. Recipes are scored by the best match
+per query word, weighted by field, and ties keep catalog order. A query the
+index can't match at all (a fragment from inside a word, like 'ken' for
+'chicken') falls back to a substring scan of the names.
+
+The index is updated in place (sync) when the catalog changes: only recipes
+whose searchable fields changed are re-indexed.
+"""
+
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Relative weight of a match in each field
+FIELD_WEIGHTS = {'name': 3.0, 'main_veg': 1.5, 'tags': 1.0, 'cuisine': 1.0}
+
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_THRESHOLD = 0.4
+# Full query found in the name / id typed from the start (the old substring search)
+NAME_SUBSTRING_BONUS = 2.0
+ID_PREFIX_BONUS = 1.0
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _terms(text: Any) -> List[str]:
+    if isinstance(text, (list, tuple)):
+        return [t for item in text for t in _terms(item)]
+    if not isinstance(text, str):
+        return []
+    return _WORD_RE.findall(text.lower().replace('_', ' '))
+
+
+def _trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _fingerprint(recipe: Dict[str, Any]) -> Tuple:
+    return tuple(tuple(_terms(recipe.get(field))) for field in FIELD_WEIGHTS)
+
+
+class RecipeSearchIndex:
+    """Trigram + prefix index over recipe dicts ({'id', 'name', 'tags', 'cuisine', 'main_veg', ...})."""
+
+    def __init__(self, recipes: Iterable[Dict[str, Any]] = ()):
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self._position: Dict[str, int] = {}
+        self._fingerprints: Dict[str, Tuple] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}  # term -> {recipe_id: field weight}
+        self._by_trigram: Dict[str, set] = {}  # trigram -> terms
+        self._sorted_terms: List[str] = []
+        self._lock = threading.Lock()
+        self.sync(recipes)
+
+    def sync(self, recipes: Iterable[Dict[str, Any]]) -> int:
+        """Bring the index in line with `recipes`. Returns how many recipes were (re)indexed."""
+        recipes = [r for r in recipes or [] if r.get('id') is not None]
+        with self._lock:
+            seen, changed = {}, 0
+            for position, recipe in enumerate(recipes):
+                rid = recipe['id']
+                if rid in seen:
+                    continue  # first occurrence wins
+                seen[rid] = position
+                fingerprint = _fingerprint(recipe)
+                if self._fingerprints.get(rid) != fingerprint:
+                    self._remove(rid)
+                    self._add(rid, fingerprint)
+                    changed += 1
+                self.by_id[rid] = recipe
+            for rid in [rid for rid in self.by_id if rid not in seen]:
+                self._remove(rid)
+                del self.by_id[rid]
+                changed += 1
+            self._position = seen
+        return changed
+
+    def _add(self, rid: str, fingerprint: Tuple):
+        self._fingerprints[rid] = fingerprint
+        for field, terms in zip(FIELD_WEIGHTS, fingerprint):
+            weight = FIELD_WEIGHTS[field]
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    insort(self._sorted_terms, term)
+                    for gram in _trigrams(term):
+                        self._by_trigram.setdefault(gram, set()).add(term)
+                postings[rid] = max(postings.get(rid, 0.0), weight)
+
+    def _remove(self, rid: str):
+        fingerprint = self._fingerprints.pop(rid, None)
+        if not fingerprint:
+            return
+        for term in {t for terms in fingerprint for t in terms}:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(rid, None)
+            if not postings:
+                del self._postings[term]
+                del self._sorted_terms[bisect_left(self._sorted_terms, term)]
+                for gram in _trigrams(term):
+                    terms = self._by_trigram.get(gram)
+                    if terms is not None:
+                        terms.discard(term)
+                        if not terms:
+                            del self._by_trigram[gram]
+
+    def _term_matches(self, word: str) -> Dict[str, float]:
+        """term -> match quality for one query word."""
+        matches = {}
+        start = bisect_left(self._sorted_terms, word)
+        for term in self._sorted_terms[start:]:
+            if not term.startswith(word):
+                break
+            matches[term] = EXACT_SCORE if term == word else PREFIX_SCORE
+        if len(word) >= 3:
+            grams = _trigrams(word)
+            shared = {}
+            for gram in grams:
+                for term in self._by_trigram.get(gram, ()):
+                    shared[term] = shared.get(term, 0) + 1
+            for term, count in shared.items():
+                similarity = count / (len(grams) + len(_trigrams(term)) - count)
+                if similarity >= FUZZY_THRESHOLD and similarity * PREFIX_SCORE > matches.get(term, 0):
+                    matches[term] = similarity * PREFIX_SCORE
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Recipes matching `query`, most relevant first."""
+        words = list(dict.fromkeys(_terms(query)))
+        if not words:
+            return []
+        phrase = query.lower().strip()
+        with self._lock:
+            scores: Dict[str, float] = {}
+            matched: Dict[str, int] = {}
+            for word in words:
+                best: Dict[str, float] = {}
+                for term, quality in self._term_matches(word).items():
+                    for rid, weight in self._postings[term].items():
+                        score = quality * weight
+                        if score > best.get(rid, 0):
+                            best[rid] = score
+                for rid, score in best.items():
+                    scores[rid] = scores.get(rid, 0) + score
+                    matched[rid] = matched.get(rid, 0) + 1
+
+            for rid in scores:
+                recipe = self.by_id[rid]
+                if phrase in (recipe.get('name') or '').lower():
+                    scores[rid] += NAME_SUBSTRING_BONUS
+                if str(rid).lower().startswith(phrase):
+                    scores[rid] += ID_PREFIX_BONUS
+
+            if not scores:
+                return self._substring_matches(phrase, limit)
+            ranked = sorted(scores, key=lambda rid: (-matched[rid], -scores[rid], self._position[rid]))
+            return [self.by_id[rid] for rid in ranked[:limit]]
+
+    def _substring_matches(self, phrase: str, limit: int) -> List[Dict[str, Any]]:
+        """The old linear scan: `phrase` inside a name (e.g. 'ken' in 'chicken') or starting an id."""
+        found = []
+        for rid in sorted(self.by_id, key=self._position.__getitem__):
+            recipe = self.by_id[rid]
+            if phrase in (recipe.get('name') or '').lower() or str(rid).lower().startswith(phrase):
+                found.append(recipe)
+                if len(found) >= limit:
+                    break
+        return found
+
+
+# Long-lived indexes for the most recently searched households (LRU)
+SEARCH_INDEX_CACHE_SIZE = 64
+_search_indexes: 'OrderedDict[str, RecipeSearchIndex]' = OrderedDict()
+_search_indexes_lock = threading.Lock()
+
+
+def sync_search_index(key: str, recipes: Iterable[Dict[str, Any]]) -> RecipeSearchIndex:
+    """The long-lived index for `key` (a household), synced to the given catalog."""
+    with _search_indexes_lock:
+        index = _search_indexes.get(key)
+        if index is None:
+            index = _search_indexes[key] = RecipeSearchIndex()
+        _search_indexes.move_to_end(key)
+        while len(_search_indexes) > SEARCH_INDEX_CACHE_SIZE:
+            _search_indexes.popitem(last=False)
+    index.sync(recipes)
+    return index
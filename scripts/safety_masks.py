@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Safety Masks
+
+Bitmask form of the avoid-ingredient checks used by the selectors and
+filter_recipes. Every term that appears in a recipe's avoid_contains is
+interned into a bit position once, when the catalog is indexed, so each
+recipe carries a single integer mask. An avoid list (a kid profile or the
+household preferences) is folded into a mask the same way and memoized by
+its contents, which means an edited config simply produces a new key.
+
+A recipe is safe for an avoid list when the two masks don't overlap:
+one AND instead of building and intersecting two sets per recipe.
+
+Terms are compared stripped and lowercased, so 'Peanuts' in config.yml and
+'peanuts' in a recipe conflict. Avoid terms no recipe contains get no bit:
+they can't cause a conflict.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _normalize(term: Any) -> str:
+    return str(term).strip().lower()
+
+
+class SafetyMasks:
+    """Interned avoid terms plus one bitmask per recipe id."""
+
+    def __init__(self, recipes: Iterable[Dict[str, Any]] = ()):
+        self.bits: Dict[str, int] = {}
+        self.recipe_masks: Dict[str, int] = {}
+        self._avoid_masks: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        for recipe in recipes or []:
+            rid = recipe.get('id')
+            if rid is not None and rid not in self.recipe_masks:
+                self.recipe_masks[rid] = self._mask_terms(recipe.get('avoid_contains'), intern=True)
+
+    def _mask_terms(self, terms, intern: bool = False) -> int:
+        mask = 0
+        for term in terms or []:
+            term = _normalize(term)
+            bit = self.bits.get(term)
+            if bit is None:
+                if not intern:
+                    continue
+                bit = self.bits[term] = 1 << len(self.bits)
+            mask |= bit
+        return mask
+
+    def avoid_mask(self, avoid_ingredients: Optional[Iterable[str]]) -> int:
+        """Mask for an avoid list (memoized by its contents)."""
+        key = tuple(sorted({_normalize(t) for t in avoid_ingredients or []}))
+        mask = self._avoid_masks.get(key)
+        if mask is None:
+            mask = self._mask_terms(key)
+            with self._lock:
+                self._avoid_masks[key] = mask
+        return mask
+
+    def profile_masks(self, kid_profiles: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        """{profile name: avoid mask} for the kid_profiles config section."""
+        return {name: self.avoid_mask((profile or {}).get('avoid_ingredients'))
+                for name, profile in (kid_profiles or {}).items()}
+
+    def combined_mask(self, kid_profiles: Optional[Dict[str, Any]]) -> int:
+        """One mask covering every kid profile (safe for all kids)."""
+        mask = 0
+        for profile_mask in self.profile_masks(kid_profiles).values():
+            mask |= profile_mask
+        return mask
+
+    def recipe_mask(self, recipe: Dict[str, Any]) -> int:
+        """Precomputed mask for an indexed recipe; computed on the fly otherwise."""
+        mask = self.recipe_masks.get(recipe.get('id'))
+        if mask is None:
+            # Not in the catalog (e.g. a fallback dict): only known terms matter
+            mask = self._mask_terms(recipe.get('avoid_contains'))
+        return mask
+
+    def is_safe(self, recipe: Dict[str, Any], avoid_mask: int) -> bool:
+        return not (avoid_mask and self.recipe_mask(recipe) & avoid_mask)
+
+    def conflicts(self, recipe: Dict[str, Any], avoid_mask: int) -> List[str]:
+        """The recipe's avoid_contains terms that hit the mask, in recipe order."""
+        if not avoid_mask or not self.recipe_mask(recipe) & avoid_mask:
+            return []
+        return [term for term in dict.fromkeys(recipe.get('avoid_contains') or [])
+                if self.bits.get(_normalize(term), 0) & avoid_mask]
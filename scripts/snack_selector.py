@@ -1,27 +1,29 @@
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
+
+try:
+    from scripts.recipe_index import RecipeIndex
+except ImportError:
+    from recipe_index import RecipeIndex
 
 class SnackSelector:
     """Selects snacks for the week from the recipe index."""
 
-    def __init__(self, recipes: List[Dict[str, Any]], kid_profiles: Dict[str, Any] = None):
-        self.recipes = recipes
+    def __init__(self, recipes: Union[List[Dict[str, Any]], RecipeIndex], kid_profiles: Dict[str, Any] = None):
+        self.index = RecipeIndex.ensure(recipes)
+        self.recipes = self.index.recipes
         self.kid_profiles = kid_profiles or {}
+        self.avoid_mask = self.index.safety.combined_mask(self.kid_profiles)
         self.snack_recipes = self._filter_snack_recipes()
 
     def _filter_snack_recipes(self) -> List[Dict[str, Any]]:
         """Filter for recipes suitable as snacks."""
         snack_types = {'simple_snack', 'snack_bar', 'baked_goods', 'sauce_dip'}
-        return [r for r in self.recipes if r.get('meal_type') in snack_types or r.get('snack_suitable')]
+        return self.index.select(meal_types=snack_types, flags=['snack_suitable'])
 
     def is_safe(self, recipe: Dict[str, Any]) -> bool:
         """Check if recipe is safe for all kids."""
-        for name, profile in self.kid_profiles.items():
-            avoid = set(profile.get('avoid_ingredients', []))
-            contains = set(recipe.get('avoid_contains', []))
-            if avoid.intersection(contains):
-                return False
-        return True
+        return self.index.safety.is_safe(recipe, self.avoid_mask)
 
     def select_weekly_snacks(self, days: List[str], current_snacks: Dict[str, Dict[str, str]] = None) -> Dict[str, Dict[str, str]]:
         """Select school and home snacks for the week."""
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Archive expired meal-plan weeks for all households.
+
+Runs the same single set-based UPDATE as the /api/cron/sweep-expired-weeks
+endpoint. Uses SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY from the environment,
+so it can be pointed at a local stand-in database (e.g. `supabase start`,
+SUPABASE_URL=http://127.0.0.1:54321) before touching production.
+
+Usage:
+    python scripts/sweep_expired_weeks.py [--dry-run] [--today YYYY-MM-DD]
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add repo root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from api.utils.storage import StorageEngine, supabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive expired meal-plan weeks for all households.")
+    parser.add_argument('--dry-run', action='store_true', help="List the weeks that would be archived")
+    parser.add_argument('--today', help="Override today's date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    if not supabase:
+        print("Supabase client is not configured. Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY.")
+        return 1
+
+    today = datetime.strptime(args.today, '%Y-%m-%d').date() if args.today else None
+    rows = StorageEngine.sweep_expired_weeks(today=today, dry_run=args.dry_run)
+
+    verb = "Would archive" if args.dry_run else "Archived"
+    for row in rows:
+        print(f"  {row['household_id']}  {row['week_of']}")
+    print(f"{verb} {len(rows)} week(s).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
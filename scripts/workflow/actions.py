@@ -7,12 +7,14 @@ from .selection import generate_farmers_market_proposal, get_recent_recipes, fil
 from .html_generator import generate_html_plan
 try:
     from scripts.lunch_selector import LunchSelector, LunchSuggestion
+    from scripts.recipe_index import RecipeIndex
 except ModuleNotFoundError:
     # When running from GitHub Actions or other contexts without scripts in path
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent.parent))
     from scripts.lunch_selector import LunchSelector, LunchSuggestion
+    from scripts.recipe_index import RecipeIndex
 
 def create_new_week(week_str, history_dict=None, recipes_list=None, config_dict=None):
     """Create a new weekly input file with default values."""
@@ -59,8 +61,9 @@ def create_new_week(week_str, history_dict=None, recipes_list=None, config_dict=
     return input_data
 
 
-def generate_meal_plan(input_file, data, recipes_list=None, history_dict=None, exclude_defaults=None, inventory_data=None):
-    """Generate the weekly meal plan."""
+def generate_meal_plan(input_file, data, recipes_list=None, history_dict=None, exclude_defaults=None, inventory_data=None,
+                       write_html=True):
+    """Generate the weekly meal plan (and its HTML page in public/plans unless write_html is False)."""
     print("\n" + "="*60)
     print(f"GENERATING MEAL PLAN for week {data.get('week_of')}")
     print("="*60)
@@ -96,8 +99,12 @@ def generate_meal_plan(input_file, data, recipes_list=None, history_dict=None, e
         else:
             history = load_history()
 
-        recent_recipes = get_recent_recipes(history, lookback_weeks=3)
-        filtered = filter_recipes(recipes, data, recent_recipes)
+        # Build lookups once; dinner, lunch and snack selection all share them
+        recipe_index = RecipeIndex(recipes)
+
+        # The 3 weeks before this one; the week itself and later weeks don't count
+        recent_recipes = get_recent_recipes(history, lookback_weeks=3, before=week_of)
+        filtered = filter_recipes(recipe_index, data, recent_recipes)
         
         current_week_history = next((w for w in history.get('weeks', []) if w.get('week_of') == week_of), None)
         
@@ -109,11 +116,11 @@ def generate_meal_plan(input_file, data, recipes_list=None, history_dict=None, e
             # We need to adapt select_dinners to verify day coverage or filter afterwards
             # For now, let's select for all and filter, or assume select_dinners selects for all 5 days
             print(f"[DEBUG] Selecting dinners for {len(days_needing_dinner)} days...")
-            full_week_dinners = select_dinners(filtered, data, current_week_history, recipes)
+            full_week_dinners = select_dinners(filtered, data, current_week_history, recipe_index)
             selected_dinners = {d: r for d, r in full_week_dinners.items() if d in days_needing_dinner or d in ['sat', 'sun']}
             print(f"[DEBUG] Selected {len(selected_dinners)} dinners.")
         
-        lunch_selector = LunchSelector(recipes=recipes)
+        lunch_selector = LunchSelector(recipes=recipe_index)
         days = ['mon', 'tue', 'wed', 'thu', 'fri']
         dinner_plan_list = [{'recipe_id': r.get('id'), 'recipe_name': r.get('name'), 'day': d, 'vegetables': list(r.get('main_veg') or [])} for d, r in selected_dinners.items() if d in days]
         
@@ -177,7 +184,7 @@ def generate_meal_plan(input_file, data, recipes_list=None, history_dict=None, e
         # Snack generation: use SnackSelector for automated planning from recipes
         try:
             from scripts.snack_selector import SnackSelector
-            selector = SnackSelector(recipes=recipes, kid_profiles=config.get('kid_profiles', {}))
+            selector = SnackSelector(recipes=recipe_index, kid_profiles=config.get('kid_profiles', {}))
             days_needing_snacks = [d for d in ['mon', 'tue', 'wed', 'thu', 'fri'] if is_covered('school_snack', d) or is_covered('home_snack', d)]
             existing_snacks = current_week_history.get('snacks', {}) if current_week_history else {}
             data['snacks'] = selector.select_weekly_snacks(days_needing_snacks, current_snacks=existing_snacks)
@@ -203,7 +210,10 @@ def generate_meal_plan(input_file, data, recipes_list=None, history_dict=None, e
             with open(input_file, 'w') as f: 
                 yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
 
-        # HTML generation (always write to disk for now as it's used for display)
+        # HTML generation (written to disk as it's used for display)
+        if not write_html:
+            print(f"[DEBUG] generate_meal_plan completed successfully (no HTML).")
+            return data, history
         from_scratch_day = selected_dinners.get('from_scratch_day')
         from_scratch_recipe = selected_dinners.get(from_scratch_day) if from_scratch_day else None
         
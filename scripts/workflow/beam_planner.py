@@ -0,0 +1,214 @@
+"""
+Top-K dinner plans by beam search.
+
+select_dinners makes one greedy pass and returns a single week. This module
+explores the same decision space with a beam: days are filled one at a time
+(from-scratch day first, then busy days, then the rest, which is the order
+select_dinners claims its scarcer pools in), each partial week is extended
+with the best few recipes that fit the day, and only the best `beam_width`
+partial weeks survive each step. The K best complete weeks are returned.
+
+Constraints follow select_dinners:
+- logged/locked days and rollovers are fixed before the search (_fixed_dinners)
+- busy days take no-chop recipes
+- the first non-busy free day is the from-scratch day and takes a
+  normal-effort recipe
+- meal types are unique within the week
+- recipes come from filter_recipes, so the recent-recipe window and avoid
+  lists are already applied
+
+When a day can't be filled within those rules, the rule is relaxed the way
+select_dinners relaxes it (any recipe on a busy day, repeated meal type),
+at a penalty, so fully valid weeks always rank first.
+
+A week's score is the sum over its new dinners of the recipe's inventory
+score (score_catalog_by_inventory, scaled to 0-10) and a small preference
+for catalog order, minus penalties for repeated cuisines and relaxed rules.
+"""
+
+try:
+    from scripts.recipe_index import RecipeIndex
+except ImportError:
+    from recipe_index import RecipeIndex
+from .selection import _fixed_dinners, score_catalog_by_inventory
+
+DAYS = ['mon', 'tue', 'wed', 'thu', 'fri']
+
+DEFAULT_K = 3
+MAX_K = 10
+DEFAULT_BEAM_WIDTH = 12
+
+INVENTORY_WEIGHT = 0.1         # inventory score 0-100 -> 0-10 per dinner
+ORDER_WEIGHT = 1.0             # earliest catalog recipe +1, last +0
+CUISINE_REPEAT_PENALTY = 2.0
+RELAXED_PENALTY = 25.0
+# Alternatives should differ in at least this many dinners (when the beam allows)
+MIN_CHANGED_DINNERS = 2
+
+# Cuisines that don't count as a repeat
+_GENERIC_CUISINES = {None, '', 'unknown', 'various'}
+
+
+class _Week:
+    """A partial week on the beam."""
+
+    __slots__ = ('score', 'picks', 'ids', 'meal_types', 'cuisines', 'relaxed', 'from_scratch_day')
+
+    def __init__(self, score, picks, ids, meal_types, cuisines, relaxed, from_scratch_day):
+        self.score = score
+        self.picks = picks
+        self.ids = ids
+        self.meal_types = meal_types
+        self.cuisines = cuisines
+        self.relaxed = relaxed
+        self.from_scratch_day = from_scratch_day
+
+    def extend(self, day, recipe, gain, relaxed=False, from_scratch=False):
+        cuisine = recipe.get('cuisine')
+        return _Week(
+            self.score + gain,
+            {**self.picks, day: recipe},
+            self.ids | {recipe.get('id')},
+            self.meal_types | {recipe.get('meal_type')},
+            self.cuisines | ({cuisine} if cuisine not in _GENERIC_CUISINES else set()),
+            self.relaxed + [day] if relaxed else self.relaxed,
+            day if from_scratch else self.from_scratch_day,
+        )
+
+
+def _base_scores(pool, recipe_index, inventory):
+    """recipe id -> score of the recipe on its own (inventory use + catalog order)."""
+    inventory_scores = score_catalog_by_inventory(recipe_index, inventory) if inventory else {}
+    n = max(len(pool), 1)
+    return {
+        r.get('id'): inventory_scores.get(r.get('id'), 0.0) * INVENTORY_WEIGHT + ORDER_WEIGHT * (1 - i / n)
+        for i, r in enumerate(pool)
+    }
+
+
+def _candidates(week, pool, limit, unique=True):
+    """Up to `limit` recipes from `pool` (best first) that can join `week`."""
+    found = []
+    for recipe in pool:
+        if recipe.get('id') in week.ids:
+            continue
+        if unique and recipe.get('meal_type') in week.meal_types:
+            continue
+        found.append(recipe)
+        if len(found) >= limit:
+            break
+    return found
+
+
+def _expand(week, day, kind, pools, base, width):
+    """Extensions of `week` with one recipe for `day`, relaxing rules only when needed."""
+    options = []  # (recipe, relaxed, from_scratch)
+    if kind == 'scratch':
+        options = [(r, False, True) for r in _candidates(week, pools['normal'], width)]
+    elif kind == 'busy':
+        options = [(r, False, False) for r in _candidates(week, pools['no_chop'], width)]
+    if not options:
+        # Unrestricted day, or a from-scratch day without a normal recipe (no
+        # penalty, as in select_dinners), or a busy day without a no-chop one
+        options = [(r, kind == 'busy', False) for r in _candidates(week, pools['all'], width)]
+    if not options:
+        options = [(r, True, False) for r in _candidates(week, pools['all'], width, unique=False)]
+
+    extended = []
+    for recipe, relaxed, from_scratch in options:
+        gain = base[recipe.get('id')]
+        if recipe.get('cuisine') in week.cuisines:
+            gain -= CUISINE_REPEAT_PENALTY
+        if relaxed:
+            gain -= RELAXED_PENALTY
+        extended.append(week.extend(day, recipe, gain, relaxed, from_scratch))
+    return extended
+
+
+def _prune(weeks, width):
+    """Best `width` weeks, keeping one arrangement per set of recipes."""
+    best = {}
+    for week in weeks:
+        key = frozenset(week.ids)
+        if key not in best or week.score > best[key].score:
+            best[key] = week
+    return sorted(best.values(), key=lambda w: -w.score)[:width]
+
+
+def _distinct(weeks, k):
+    """Up to k weeks, best first, preferring ones that differ from those already chosen."""
+    chosen = []
+    for week in weeks:
+        if all(len(week.ids - other.ids) >= MIN_CHANGED_DINNERS for other in chosen):
+            chosen.append(week)
+            if len(chosen) == k:
+                return chosen
+    # Not enough distinct weeks: fill with the best of the rest
+    chosen += [w for w in weeks if w not in chosen][:k - len(chosen)]
+    return sorted(chosen, key=lambda w: -w.score)
+
+
+def plan_alternatives(filtered_recipes, inputs, current_week_history=None, all_recipes=None,
+                      inventory=None, k=DEFAULT_K, beam_width=DEFAULT_BEAM_WIDTH):
+    """
+    The top `k` dinner plans for the week, best first.
+
+    Args:
+        filtered_recipes: Candidates from filter_recipes
+        inputs: The week's plan data (schedule.busy_days, rollover)
+        current_week_history: This week's history entry (logged/locked dinners)
+        all_recipes: List or RecipeIndex used for id lookups and inventory scoring
+        inventory: _load_inventory_data output, to prefer recipes using it up
+
+    Returns:
+        [{'dinners': {day: recipe, 'from_scratch_day': day?}, 'score', 'relaxed_days'}]
+        where 'dinners' has the same shape as select_dinners' result.
+    """
+    k = max(1, min(int(k), MAX_K))
+    width = max(beam_width, k)
+    recipe_index = RecipeIndex.ensure(all_recipes if all_recipes else filtered_recipes)
+    busy_days = set(inputs.get('schedule', {}).get('busy_days', []))
+    fixed, used_meal_types, _ = _fixed_dinners(inputs, current_week_history, recipe_index, DAYS)
+
+    pool, seen = [], set()
+    for recipe in filtered_recipes:
+        if recipe.get('id') not in seen:  # first occurrence wins
+            seen.add(recipe.get('id'))
+            pool.append(recipe)
+    base = _base_scores(pool, recipe_index, inventory)
+    ranked = sorted(pool, key=lambda r: -base[r.get('id')])
+    pools = {
+        'all': ranked,
+        'normal': [r for r in ranked if r.get('effort_level') == 'normal'],
+        'no_chop': [r for r in ranked if r.get('no_chop_compatible', False)],
+    }
+
+    open_days = [d for d in DAYS if d not in fixed]
+    non_busy = [d for d in DAYS if d not in busy_days]
+    scratch_day = non_busy[0] if non_busy and non_busy[0] in open_days else None
+    slots = [(scratch_day, 'scratch')] if scratch_day else []
+    slots += [(d, 'busy') for d in open_days if d in busy_days]
+    slots += [(d, 'any') for d in open_days if d not in busy_days and d != scratch_day]
+
+    # Locked dinners and rollovers are never picked again
+    start = _Week(0.0, {}, {r.get('id') for r in fixed.values()}, set(used_meal_types),
+                  {r.get('cuisine') for r in fixed.values()} - _GENERIC_CUISINES, [], None)
+    beam = [start]
+    for day, kind in slots:
+        extended = []
+        for week in beam:
+            extended.extend(_expand(week, day, kind, pools, base, width) or [week])
+        beam = _prune(extended, width)
+
+    alternatives = []
+    for week in _distinct(beam, k):
+        dinners = {**fixed, **week.picks}
+        dinners = {d: dinners[d] for d in DAYS if d in dinners}
+        if week.from_scratch_day:
+            dinners['from_scratch_day'] = week.from_scratch_day
+        alternatives.append({
+            'dinners': dinners,
+            'score': round(week.score, 2),
+            'relaxed_days': sorted(week.relaxed, key=DAYS.index),
+        })
+    return alternatives
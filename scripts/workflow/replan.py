@@ -5,6 +5,11 @@ from .selection import _load_inventory_data, score_recipe_by_inventory
 from .state import load_history, get_actual_path
 from .html_generator import generate_html_plan
 
+try:
+    from scripts.recipe_index import RecipeIndex
+except ImportError:
+    from recipe_index import RecipeIndex
+
 class ReplanError(Exception):
     def __init__(self, message, code="INTERNAL_ERROR"):
         self.message = message
@@ -127,6 +132,7 @@ def replan_meal_plan(input_file, data, inventory_dict=None, history_dict=None, n
     if index_path.exists():
         with open(index_path, 'r') as f: 
             all_recipes = yaml.safe_load(f) or []
+    recipe_index = RecipeIndex(all_recipes)
     
     # Sort remaining meals by inventory scoring
     if (inventory_data['fridge_items'] or inventory_data['pantry_items']) and to_be_planned:
@@ -136,7 +142,7 @@ def replan_meal_plan(input_file, data, inventory_dict=None, history_dict=None, n
                 recipe_id=recipe_entry.get('recipe_id'), 
                 recipe_obj=recipe_entry, 
                 inventory=inventory_data, 
-                all_recipes=all_recipes
+                all_recipes=recipe_index
             )
             scored_recipes.append((recipe_entry, score, details))
         
@@ -183,12 +189,12 @@ def replan_meal_plan(input_file, data, inventory_dict=None, history_dict=None, n
         except ImportError:
              pass
              
-        filtered_candidates = filter_recipes(all_recipes, mock_inputs, recent)
+        filtered_candidates = filter_recipes(recipe_index, mock_inputs, recent)
 
         # 4. Run Selection
         # We pass the currently locked dinners as 'current_week_history' so they are respected
         mock_history = {'dinners': list(locked_dinners.values())}
-        selected_map = select_dinners(filtered_candidates, mock_inputs, current_week_history=mock_history, all_recipes=all_recipes)
+        selected_map = select_dinners(filtered_candidates, mock_inputs, current_week_history=mock_history, all_recipes=recipe_index)
         
         # 5. Merge Selection into new_dinners (excluding what we already added)
         existing_days = {d['day'] for d in new_dinners}
@@ -285,7 +291,7 @@ def replan_meal_plan(input_file, data, inventory_dict=None, history_dict=None, n
         'recipe_name': d.get('recipe_id').replace('_', ' ').title()
     } for d in new_dinners]
     
-    selector = LunchSelector(recipes=all_recipes)
+    selector = LunchSelector(recipes=recipe_index)
     selected_lunches = selector.select_weekly_lunches(formatted_dinners, monday_str)
     
     selected_dinners_objs = {}
@@ -294,7 +300,7 @@ def replan_meal_plan(input_file, data, inventory_dict=None, history_dict=None, n
         if r_id == 'freezer_meal':
             selected_dinners_objs[day] = {'id': 'freezer_meal', 'name': 'Freezer Backup Meal', 'main_veg': [], 'meal_type': 'freezer', 'cuisine': 'various'}
         else:
-            recipe = next((r for r in all_recipes if r.get('id') == r_id), None)
+            recipe = recipe_index.get(r_id)
             if recipe: 
                 selected_dinners_objs[day] = recipe
             else:
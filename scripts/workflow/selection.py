@@ -1,41 +1,23 @@
 import yaml
-import re
 from pathlib import Path
 from datetime import datetime
 from collections import Counter
 
 try:
     from scripts.log_execution import get_actual_path
+    from scripts.recipe_index import RecipeIndex
+    from scripts.safety_masks import SafetyMasks
+    from scripts.ingredient_matrix import score_rows
+    from scripts.ingredient_normalizer import canonical_ingredient
 except ImportError:
     from log_execution import get_actual_path
+    from recipe_index import RecipeIndex
+    from safety_masks import SafetyMasks
+    from ingredient_matrix import score_rows
+    from ingredient_normalizer import canonical_ingredient
 
-def _normalize_ingredient_name(name):
-    """Normalize ingredient names for consistent matching."""
-    if not name:
-        return ""
-    name = name.lower().strip()
-    name = re.sub(r'\s*\(.*?\)', '', name)
-    name = re.sub(r',.*', '', name)
-    if name.endswith('oes'):
-        name = name[:-2]
-    elif name.endswith('ies'):
-        name = name[:-3] + 'y'
-    elif name.endswith('s') and not name.endswith('ss'):
-        name = name[:-1]
-    name = name.replace(' ', '_')
-    aliases = {
-        'green_bean': 'bean',
-        'bell_pepper': 'pepper',
-        'cherry_tomato': 'tomato',
-        'roma_tomato': 'tomato',
-        'red_onion': 'onion',
-        'yellow_onion': 'onion',
-        'white_onion': 'onion',
-        'black_bean': 'bean',
-        'kidney_bean': 'bean',
-        'pinto_bean': 'bean'
-    }
-    return aliases.get(name, name)
+# Normalize ingredient names for consistent matching (aliases folded)
+_normalize_ingredient_name = canonical_ingredient
 
 def _calculate_ingredient_freshness(inventory):
     """Calculate freshness score for inventory items."""
@@ -103,18 +85,45 @@ def _load_inventory_data(inventory_path='data/inventory.yml', inventory_dict=Non
     }
 
 def score_recipe_by_inventory(recipe_id, recipe_obj, inventory, all_recipes):
-    """Score a recipe based on how well it uses current inventory."""
+    """Score a recipe based on how well it uses current inventory.
+
+    Pass a RecipeIndex as `all_recipes` when scoring in a loop; a plain list
+    still works but is scanned on every call. To score the whole catalog use
+    score_catalog_by_inventory.
+    """
     main_veg = recipe_obj.get('main_veg', [])
+    normalized_veg = None
     if not main_veg and all_recipes:
-        recipe_full = next((r for r in all_recipes if r.get('id') == recipe_id), None)
-        if recipe_full:
-            main_veg = recipe_full.get('main_veg', [])
-    if not main_veg:
-        return 0.0, {'fridge_matches': [], 'pantry_matches': [], 'missing': []}
-    normalized_veg = [_normalize_ingredient_name(v) for v in main_veg]
-    normalized_veg = [v for v in normalized_veg if v]
+        if isinstance(all_recipes, RecipeIndex):
+            if recipe_id in all_recipes:
+                normalized_veg = all_recipes.normalized_main_veg(recipe_id)
+        else:
+            recipe_full = next((r for r in all_recipes if r.get('id') == recipe_id), None)
+            if recipe_full:
+                main_veg = recipe_full.get('main_veg', [])
+    if normalized_veg is None:
+        if not main_veg:
+            return 0.0, {'fridge_matches': [], 'pantry_matches': [], 'missing': []}
+        normalized_veg = [_normalize_ingredient_name(v) for v in main_veg]
+        normalized_veg = [v for v in normalized_veg if v]
+    details = _inventory_match_details(normalized_veg, inventory)
     if not normalized_veg:
-        return 0.0, {'fridge_matches': [], 'pantry_matches': [], 'missing': []}
+        return 0.0, details
+    fridge_matches = details['fridge_matches']
+    score = 0.0
+    score += len(fridge_matches) * 20
+    score += len(details['pantry_matches']) * 5
+    for item in fridge_matches:
+        days_old = inventory['freshness'].get(item, 0)
+        if days_old >= 5:
+            score += 10
+    score = min(score, 100.0)
+    return score, details
+
+def _inventory_match_details(normalized_veg, inventory):
+    """Split a recipe's normalized main_veg into fridge / pantry / missing."""
+    if not normalized_veg:
+        return {'fridge_matches': [], 'pantry_matches': [], 'missing': []}
     fridge_matches = []
     pantry_matches = []
     missing = []
@@ -125,21 +134,28 @@ def score_recipe_by_inventory(recipe_id, recipe_obj, inventory, all_recipes):
             pantry_matches.append(veg)
         else:
             missing.append(veg)
-    score = 0.0
-    score += len(fridge_matches) * 20
-    score += len(pantry_matches) * 5
-    for item in fridge_matches:
-        days_old = inventory['freshness'].get(item, 0)
-        if days_old >= 5:
-            score += 10
-    score = min(score, 100.0)
-    details = {
+    return {
         'fridge_matches': fridge_matches,
         'pantry_matches': pantry_matches,
         'missing': missing,
-        'match_ratio': (len(fridge_matches) + len(pantry_matches)) / len(normalized_veg) if normalized_veg else 0
+        'match_ratio': (len(fridge_matches) + len(pantry_matches)) / len(normalized_veg)
+    }
+
+def score_catalog_by_inventory(all_recipes, inventory, with_details=False):
+    """Score every recipe in the catalog against the inventory at once.
+
+    Same scores as score_recipe_by_inventory on each catalog recipe, from one
+    product of the index's ingredient matrix with the inventory weights.
+    Returns {recipe_id: score}, or {recipe_id: (score, details)} with_details.
+    """
+    index = RecipeIndex.ensure(all_recipes)
+    scores = dict(zip(index.by_id, score_rows(index.inventory_matrix, inventory)))
+    if not with_details:
+        return scores
+    return {
+        rid: (score, _inventory_match_details(index.normalized_main_veg(rid), inventory))
+        for rid, score in scores.items()
     }
-    return score, details
 
 def generate_farmers_market_proposal(history_path, index_path, history_dict=None, recipes_list=None):
     """Generate a proposed farmers market vegetable list."""
@@ -173,7 +189,7 @@ def generate_farmers_market_proposal(history_path, index_path, history_dict=None
             pass
             
     if history and 'weeks' in history:
-        for week in history['weeks'][-2:]:
+        for week in latest_weeks(history, 2):
             for dinner in week.get('dinners', []):
                 recent_veg.update(dinner.get('vegetables', []))
 
@@ -223,12 +239,25 @@ def generate_farmers_market_proposal(history_path, index_path, history_dict=None
     staples = ['onion', 'garlic', 'cilantro']
     return proposed, staples
 
-def get_recent_recipes(history, lookback_weeks=3):
-    """Get recipe IDs used in the last N weeks."""
+def latest_weeks(history, count, before=None):
+    """
+    The `count` most recent weeks by week_of (only weeks before `before`, if given).
+
+    history.yml is stored oldest-first but StorageEngine.get_history() returns
+    newest-first, so never rely on list position.
+    """
+    weeks = [w for w in (history or {}).get('weeks', []) if isinstance(w, dict)]
+    if before:
+        weeks = [w for w in weeks if str(w.get('week_of', '')) < str(before)]
+    weeks.sort(key=lambda w: str(w.get('week_of', '')))
+    return weeks[-count:] if count > 0 else []
+
+def get_recent_recipes(history, lookback_weeks=3, before=None):
+    """Get recipe IDs used in the last N weeks (the N weeks before `before`, if given)."""
     recent = set()
     if not history or 'weeks' not in history:
         return recent
-    for week in history['weeks'][-lookback_weeks:]:
+    for week in latest_weeks(history, lookback_weeks, before):
         for dinner in week.get('dinners', []):
             rid = dinner.get('recipe_id')
             rids = dinner.get('recipe_ids', [])
@@ -237,9 +266,14 @@ def get_recent_recipes(history, lookback_weeks=3):
     return recent
 
 def filter_recipes(recipes, inputs, recent_recipes):
-    """Filter recipes for dinner."""
+    """Filter recipes for dinner.
+
+    `recipes` may be a list or a RecipeIndex; an index brings its
+    precomputed avoid-ingredient masks.
+    """
     filtered = []
-    avoid_ingredients = set(inputs.get('preferences', {}).get('avoid_ingredients', []))
+    safety = recipes.safety if isinstance(recipes, RecipeIndex) else SafetyMasks(recipes)
+    avoid_mask = safety.avoid_mask(inputs.get('preferences', {}).get('avoid_ingredients', []))
     dinner_meal_types = {
         'tacos_wraps', 'pasta_noodles', 'soup_stew', 'grain_bowl',
         'sandwich', 'salad', 'stir_fry', 'pizza', 'casserole', 'appetizer'
@@ -247,7 +281,7 @@ def filter_recipes(recipes, inputs, recent_recipes):
     for recipe in recipes:
         if recipe['id'] in recent_recipes:
             continue
-        if any(ing in avoid_ingredients for ing in recipe.get('avoid_contains', [])):
+        if not safety.is_safe(recipe, avoid_mask):
             continue
         recipe_meal_type = recipe.get('meal_type')
         if recipe_meal_type == 'unknown' or recipe_meal_type not in dinner_meal_types:
@@ -255,16 +289,14 @@ def filter_recipes(recipes, inputs, recent_recipes):
         filtered.append(recipe)
     return filtered
 
-def select_dinners(filtered_recipes, inputs, current_week_history=None, all_recipes=None):
-    """Select 5 dinners for Mon-Fri based on constraints."""
-    busy_days = set(inputs.get('schedule', {}).get('busy_days', []))
-    rollover_data = inputs.get('rollover', [])
-    no_chop_recipes = [r for r in filtered_recipes if r.get('no_chop_compatible', False)]
-    normal_recipes = [r for r in filtered_recipes if r.get('effort_level') == 'normal']
-    all_other_recipes = [r for r in filtered_recipes if not r.get('no_chop_compatible', False) and r.get('effort_level') != 'normal']
+def _fixed_dinners(inputs, current_week_history, recipe_index, days):
+    """Dinners already decided for the week: logged/locked days, then rollovers.
+
+    Returns (selected, used_meal_types, rollovers) where `rollovers` are the
+    rolled-over recipes that were placed.
+    """
     used_meal_types = set()
     selected = {}
-    days = ['mon', 'tue', 'wed', 'thu', 'fri']
     if current_week_history and 'dinners' in current_week_history:
         for dh in current_week_history['dinners']:
             day = dh.get('day')
@@ -278,11 +310,10 @@ def select_dinners(filtered_recipes, inputs, current_week_history=None, all_reci
                     rid = recipe_id or recipe_ids[0]
                     meal_name = rid.split(':', 1)[1]
                     selected[day] = {'id': rid, 'name': meal_name, 'main_veg': [], 'meal_type': 'leftover', 'cuisine': 'various'}
-                elif all_recipes:
+                elif recipe_index:
                     if recipe_ids and len(recipe_ids) > 1:
                         # Modular Recipe: Combine metadata
-                        subs = [next((r for r in all_recipes if r.get('id') == rid), None) for rid in recipe_ids]
-                        subs = [s for s in subs if s]
+                        subs = recipe_index.get_many(recipe_ids)
                         if subs:
                             main = subs[0]
                             selected[day] = {
@@ -297,23 +328,42 @@ def select_dinners(filtered_recipes, inputs, current_week_history=None, all_reci
                             used_meal_types.add(main.get('meal_type'))
                     else:
                         rid = recipe_id or (recipe_ids[0] if recipe_ids else None)
-                        recipe = next((r for r in all_recipes if r.get('id') == rid), None)
+                        recipe = recipe_index.get(rid)
                         if recipe:
                             selected[day] = recipe
                             used_meal_types.add(recipe.get('meal_type'))
-    if rollover_data and all_recipes:
+    rollovers = []
+    rollover_data = inputs.get('rollover', [])
+    if rollover_data and recipe_index:
         for r_meta in rollover_data:
             r_id = r_meta.get('recipe_id')
-            recipe = next((r for r in all_recipes if r.get('id') == r_id), None)
+            recipe = recipe_index.get(r_id)
             if recipe and recipe.get('meal_type') not in used_meal_types:
                 for day in days:
                     if day not in selected:
                         selected[day] = recipe
                         used_meal_types.add(recipe.get('meal_type'))
-                        if recipe in no_chop_recipes: no_chop_recipes.remove(recipe)
-                        if recipe in normal_recipes: normal_recipes.remove(recipe)
-                        if recipe in all_other_recipes: all_other_recipes.remove(recipe)
+                        rollovers.append(recipe)
                         break
+    return selected, used_meal_types, rollovers
+
+def select_dinners(filtered_recipes, inputs, current_week_history=None, all_recipes=None):
+    """Select 5 dinners for Mon-Fri based on constraints.
+
+    `all_recipes` may be a list or a prebuilt RecipeIndex; either way id
+    lookups go through an index built at most once per call.
+    """
+    recipe_index = RecipeIndex.ensure(all_recipes) if all_recipes else None
+    busy_days = set(inputs.get('schedule', {}).get('busy_days', []))
+    no_chop_recipes = [r for r in filtered_recipes if r.get('no_chop_compatible', False)]
+    normal_recipes = [r for r in filtered_recipes if r.get('effort_level') == 'normal']
+    all_other_recipes = [r for r in filtered_recipes if not r.get('no_chop_compatible', False) and r.get('effort_level') != 'normal']
+    days = ['mon', 'tue', 'wed', 'thu', 'fri']
+    selected, used_meal_types, rollovers = _fixed_dinners(inputs, current_week_history, recipe_index, days)
+    for recipe in rollovers:
+        if recipe in no_chop_recipes: no_chop_recipes.remove(recipe)
+        if recipe in normal_recipes: normal_recipes.remove(recipe)
+        if recipe in all_other_recipes: all_other_recipes.remove(recipe)
     non_busy_days = [d for d in days if d not in busy_days]
     if non_busy_days:
         for r in normal_recipes:
@@ -1,5 +1,6 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { useWizardContext } from '../context/WizardContext';
+import { getPairedRecipesBatch, getPlanAlternatives } from '@/lib/api';
 import Skeleton from '@/components/Skeleton';
 import ReplacementModal from '@/components/ReplacementModal';
 import { WizardProgress } from './WizardProgress';
@@ -23,12 +24,76 @@ export const DraftStep: React.FC = () => {
         setShoppingList,
         showToast,
         selections,
+        setSelections,
         leftoverAssignments,
         excludedDefaults,
         recipes,
         inventory
     } = useWizardContext();
 
+    // Sides each dinner's main is usually served with, for all dinners in one request
+    const [pairings, setPairings] = useState<Record<string, string[]>>({});
+    useEffect(() => {
+        const mainIds = (draftPlan?.dinners || [])
+            .map((d: any) => d.recipe_ids?.length > 1 ? null : (d.recipe_id || d.recipe_ids?.[0]))
+            .filter((id: string | null) => id && !id.startsWith('leftover:'));
+        if (mainIds.length === 0) {
+            setPairings({});
+            return;
+        }
+        getPairedRecipesBatch(mainIds)
+            .then(res => setPairings(res.status === 'success' ? res.pairings : {}))
+            .catch(err => console.error('Failed to fetch paired recipes:', err));
+    }, [draftPlan]);
+
+    const pairedNames = (mainId?: string) => (pairings[mainId || ''] || [])
+        .slice(0, 2)
+        .map(id => recipes.find((r: any) => r.id === id)?.name || id.replace(/_/g, ' '));
+
+    // Top-K dinner plans from one beam-search request; picking one goes back
+    // through the draft as dinner selections
+    const [alternatives, setAlternatives] = useState<any[] | null>(null);
+
+    const loadAlternatives = async () => {
+        setLoading(true);
+        try {
+            const res = await getPlanAlternatives(planningWeek!, 3, selections, lockedDays, leftoverAssignments);
+            setAlternatives(res.alternatives || []);
+        } catch (e: any) {
+            console.error('[Wizard Error] Alternatives failed:', e);
+            showToast(e.message || 'Failed to load alternatives', 'error');
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    const chooseAlternative = async (alternative: any) => {
+        const days = new Set(alternative.dinners.map((d: any) => d.day));
+        const newSelections = [
+            ...selections.filter(s => !(s.slot === 'dinner' && days.has(s.day))),
+            ...alternative.dinners.map((d: any) => ({
+                day: d.day,
+                slot: 'dinner',
+                recipe_id: d.recipe_ids.length > 1 ? undefined : d.recipe_id,
+                recipe_ids: d.recipe_ids.length > 1 ? d.recipe_ids : undefined,
+                recipe_name: d.recipe_name
+            }))
+        ];
+        setLoading(true);
+        try {
+            const res = await generateDraft(planningWeek!, newSelections, lockedDays, leftoverAssignments, excludedDefaults);
+            setSelections(newSelections);
+            setDraftPlan(res.plan_data);
+            setAlternatives(null);
+            showToast('Plan updated!', 'success');
+        } catch (e: any) {
+            console.error('[Wizard Error] Applying alternative failed:', e);
+            showToast(e.message || 'Failed to apply alternative', 'error');
+        } finally {
+            setLoading(false);
+        }
+    };
+
     const dayNames: any = { mon: 'Monday', tue: 'Tuesday', wed: 'Wednesday', thu: 'Thursday', fri: 'Friday', sat: 'Saturday', sun: 'Sunday' };
 
     return (
@@ -117,6 +182,9 @@ export const DraftStep: React.FC = () => {
                                             {dinner?.vegetables && dinner.vegetables.length > 0 && (
                                                 <p className="text-[10px] text-[var(--text-muted)] mt-1 font-medium">🥬 {dinner.vegetables.join(', ')}</p>
                                             )}
+                                            {pairedNames(dinner?.recipe_id || dinner?.recipe_ids?.[0]).length > 0 && !(dinner?.recipe_ids?.length > 1) && (
+                                                <p className="text-[10px] text-[var(--text-muted)] mt-1 font-medium">🤝 Usually with {pairedNames(dinner?.recipe_id || dinner?.recipe_ids?.[0]).join(', ')}</p>
+                                            )}
                                         </div>
 
                                         {/* Lunch Slot */}
@@ -172,13 +240,51 @@ export const DraftStep: React.FC = () => {
                         })}
                     </div>
 
-                    <div className="flex justify-center mt-6">
+                    {alternatives && (
+                        <div className="card">
+                            <div className="flex justify-between items-center border-b border-[var(--border-subtle)] pb-2 mb-4">
+                                <span className="font-mono text-sm uppercase text-[var(--accent-sage)] tracking-widest font-black">Alternative Dinner Plans</span>
+                                <button onClick={() => setAlternatives(null)} className="text-xs font-bold text-[var(--text-muted)]">Close</button>
+                            </div>
+                            {alternatives.length === 0 ? (
+                                <p className="text-sm text-[var(--text-muted)]">No other plans fit this week's constraints.</p>
+                            ) : (
+                                <div className="grid md:grid-cols-3 gap-4">
+                                    {alternatives.map((alternative, idx) => (
+                                        <button
+                                            key={idx}
+                                            onClick={() => chooseAlternative(alternative)}
+                                            disabled={loading}
+                                            className="text-left p-3 bg-[var(--bg-secondary)] rounded-xl border border-[var(--border-subtle)] hover:border-[var(--accent-sage)] transition-colors"
+                                        >
+                                            <p className="text-[10px] uppercase font-black tracking-widest text-[var(--text-muted)] mb-2">Option {idx + 1}</p>
+                                            {alternative.dinners.map((d: any) => (
+                                                <p key={d.day} className="text-xs">
+                                                    <span className="font-mono uppercase text-[var(--accent-sage)] mr-2">{d.day}</span>
+                                                    {d.recipe_name || d.recipe_id?.replace(/_/g, ' ')}
+                                                </p>
+                                            ))}
+                                        </button>
+                                    ))}
+                                </div>
+                            )}
+                        </div>
+                    )}
+
+                    <div className="flex justify-center gap-4 mt-6">
+                        <button
+                            onClick={loadAlternatives}
+                            disabled={loading}
+                            className="text-sm font-black uppercase tracking-widest text-[var(--accent-sage)] hover:text-[var(--foreground)] flex items-center gap-2 bg-white px-6 py-3 rounded-full shadow-sm border border-[var(--border-subtle)] hover:shadow-md transition-all"
+                        >
+                            🔀 Compare Dinner Plans
+                        </button>
                         <button
                             onClick={async () => {
                                 setLoading(true);
                                 try {
-                                    // Pass lockedDays to regenerate everything else
-                                    const res = await generateDraft(planningWeek!, selections, lockedDays, leftoverAssignments, excludedDefaults);
+                                    // Pass lockedDays to regenerate everything else; skip the server's draft cache
+                                    const res = await generateDraft(planningWeek!, selections, lockedDays, leftoverAssignments, excludedDefaults, true);
                                     setDraftPlan(res.plan_data);
                                     showToast('Plan regenerated!', 'success');
                                 } catch (e: any) {
@@ -86,7 +86,7 @@ interface WizardContextType {
     handleSubmitReview: () => Promise<void>;
     loadSuggestions: () => Promise<void>;
     createWeek: (week: string) => Promise<any>;
-    generateDraft: (week: string, selections: any[], locked: any[], leftovers: any[], excluded?: any[]) => Promise<any>;
+    generateDraft: (week: string, selections: any[], locked: any[], leftovers: any[], excluded?: any[], regenerate?: boolean) => Promise<any>;
     finalizePlan: (week: string) => Promise<any>;
     bulkUpdateInventory: (updates: any[]) => Promise<any>;
     getShoppingList: (week: string) => Promise<any>;
@@ -108,6 +108,14 @@ export async function getPairedRecipes(mainId: string): Promise<{ status: string
     return handleResponse<{ status: string, suggestions: string[] }>(res, 'Failed to fetch paired recipes');
 }
 
+export async function getPairedRecipesBatch(mainIds: string[]): Promise<{ status: string, pairings: Record<string, string[]> }> {
+    const res = await fetch(`/api/recipes/paired?main_ids=${encodeURIComponent(mainIds.join(','))}`, {
+        headers: await getAuthHeaders(false),
+        cache: 'no-store'
+    });
+    return handleResponse<{ status: string, pairings: Record<string, string[]> }>(res, 'Failed to fetch paired recipes');
+}
+
 export async function getInventory(): Promise<InventoryResponse> {
     const res = await fetch('/api/inventory', {
         headers: await getAuthHeaders(false),
@@ -305,17 +313,34 @@ export async function generateDraft(
     selections: { day: string, slot: string, recipe_id?: string, recipe_ids?: string[], recipe_name: string }[],
     locked_days: string[] = [],
     leftovers: { day: string, slot: string, item: string }[] = [],
-    exclude_defaults: string[] = []
+    exclude_defaults: string[] = [],
+    regenerate: boolean = false
 ): Promise<any> {
     const res = await fetch('/api/plan/draft', {
         method: 'POST',
         headers: await getAuthHeaders(),
-        body: JSON.stringify({ week_of, selections, locked_days, leftovers, exclude_defaults }),
+        body: JSON.stringify({ week_of, selections, locked_days, leftovers, exclude_defaults, regenerate }),
     });
     return handleResponse<any>(res, 'Failed to generate draft plan');
 }
 
 
+export async function getPlanAlternatives(
+    week_of: string,
+    k: number = 3,
+    selections: { day: string, slot: string, recipe_id?: string, recipe_ids?: string[] }[] = [],
+    locked_days: string[] = [],
+    leftovers: { day: string, slot: string, item: string }[] = []
+): Promise<any> {
+    const res = await fetch('/api/plan/alternatives', {
+        method: 'POST',
+        headers: await getAuthHeaders(),
+        body: JSON.stringify({ week_of, k, selections, locked_days, leftovers }),
+    });
+    return handleResponse<any>(res, 'Failed to generate plan alternatives');
+}
+
+
 export async function getShoppingList(week_of: string): Promise<any> {
     const res = await fetch(`/api/plan/shopping-list?week_of=${week_of}`, {
         headers: await getAuthHeaders(false),
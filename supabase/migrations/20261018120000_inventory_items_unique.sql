@@ -0,0 +1,27 @@
+-- Bulk inventory writes upsert on (household_id, category, item).
+-- PostgREST's on_conflict needs a matching unique constraint.
+
+-- 1. Collapse existing duplicates, keeping the most recently updated row
+--    (rows without updated_at rank last, so they never block the constraint)
+DELETE FROM inventory_items
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY household_id, category, item
+            ORDER BY updated_at DESC NULLS LAST, id DESC
+        ) AS rn
+        FROM inventory_items
+    ) ranked
+    WHERE rn > 1
+);
+
+-- 2. Enforce uniqueness
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'inventory_items_household_category_item_key'
+    ) THEN
+        ALTER TABLE inventory_items
+            ADD CONSTRAINT inventory_items_household_category_item_key UNIQUE (household_id, category, item);
+    END IF;
+END $$;
@@ -0,0 +1,25 @@
+-- Per-household, per-week analytics rollups.
+-- Maintained by StorageEngine.update_meal_plan whenever a week's history_data
+-- changes; /api/analytics merges the rollups in the requested range.
+-- Backfill existing weeks with scripts/rebuild_analytics_rollups.py.
+
+CREATE TABLE IF NOT EXISTS analytics_rollups (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    household_id UUID NOT NULL REFERENCES households(id) ON DELETE CASCADE,
+    week_of DATE NOT NULL,
+    rollup JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    UNIQUE (household_id, week_of)
+);
+
+CREATE TRIGGER update_analytics_rollups_updated_at BEFORE UPDATE ON analytics_rollups
+FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
+
+ALTER TABLE analytics_rollups ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Households can view own analytics rollups" ON analytics_rollups
+    FOR SELECT USING (household_id = get_auth_household_id());
+
+CREATE POLICY "Households can edit own analytics rollups" ON analytics_rollups
+    FOR ALL USING (household_id = get_auth_household_id());
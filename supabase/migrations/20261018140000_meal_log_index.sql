@@ -0,0 +1,26 @@
+-- Per-household, per-week index of logged meal names with no matching recipe.
+-- Maintained by StorageEngine.update_meal_plan whenever a week's history_data
+-- changes, and pruned when a recipe is saved or a name is ignored, so
+-- get_pending_recipes reads only the weeks that still have unmatched names.
+-- Weeks logged before this table existed are indexed on first read.
+
+CREATE TABLE IF NOT EXISTS meal_log_index (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    household_id UUID NOT NULL REFERENCES households(id) ON DELETE CASCADE,
+    week_of DATE NOT NULL,
+    unmatched JSONB NOT NULL DEFAULT '[]'::jsonb,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    UNIQUE (household_id, week_of)
+);
+
+CREATE TRIGGER update_meal_log_index_updated_at BEFORE UPDATE ON meal_log_index
+FOR EACH ROW EXECUTE PROCEDURE update_updated_at_column();
+
+ALTER TABLE meal_log_index ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Households can view own meal log index" ON meal_log_index
+    FOR SELECT USING (household_id = get_auth_household_id());
+
+CREATE POLICY "Households can edit own meal log index" ON meal_log_index
+    FOR ALL USING (household_id = get_auth_household_id());
@@ -0,0 +1,25 @@
+-- Shared recipe catalog version per household.
+-- API instances cache the recipe catalog in memory and compare the cached
+-- copy's version with households.catalog_version once per request, so a
+-- recipe written through any instance (or a script) is seen everywhere on
+-- the next request. The trigger bumps it on every recipe write.
+
+ALTER TABLE households ADD COLUMN IF NOT EXISTS catalog_version BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_household_catalog_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE households
+    SET catalog_version = catalog_version + 1
+    WHERE id = COALESCE(NEW.household_id, OLD.household_id);
+    IF TG_OP = 'UPDATE' AND NEW.household_id IS DISTINCT FROM OLD.household_id THEN
+        UPDATE households SET catalog_version = catalog_version + 1 WHERE id = OLD.household_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS bump_catalog_version_on_recipes ON recipes;
+CREATE TRIGGER bump_catalog_version_on_recipes
+AFTER INSERT OR UPDATE OR DELETE ON recipes
+FOR EACH ROW EXECUTE PROCEDURE bump_household_catalog_version();
@@ -0,0 +1,24 @@
+-- Pre-generated create-week proposals and first drafts for weeks that don't
+-- exist yet (api/services/pregeneration.py). Each row is keyed by the
+-- fingerprint of the inputs it was computed from; the routes serve it only
+-- when the inputs they read hash the same, then delete it. The cron drops
+-- rows for past weeks.
+
+CREATE TABLE IF NOT EXISTS provisional_plans (
+    household_id UUID NOT NULL REFERENCES households(id) ON DELETE CASCADE,
+    week_of DATE NOT NULL,
+    kind TEXT NOT NULL CHECK (kind IN ('proposal', 'draft')),
+    fingerprint TEXT NOT NULL,
+    plan_data JSONB NOT NULL,
+    history_data JSONB,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (household_id, week_of, kind)
+);
+
+ALTER TABLE provisional_plans ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Households can view own provisional plans" ON provisional_plans
+    FOR SELECT USING (household_id = get_auth_household_id());
+
+CREATE POLICY "Households can edit own provisional plans" ON provisional_plans
+    FOR ALL USING (household_id = get_auth_household_id());
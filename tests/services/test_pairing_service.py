@@ -35,3 +35,63 @@ def test_get_paired_suggestions_no_matches():
         ]
     }
     assert get_paired_suggestions("rasam_rice", history) == []
+
+def test_pairing_index_matches_full_scan_after_relogging_a_week():
+    from api.services.pairing_service import PairingIndex
+
+    history = {
+        "weeks": [
+            {"week_of": "2026-10-05", "dinners": [{"recipe_ids": ["rasam_rice", "beans_kai"]}]},
+            {"week_of": "2026-10-12", "dinners": [{"recipe_ids": ["rasam_rice", "beetroot_kai"]}]},
+        ]
+    }
+    index = PairingIndex.from_history(history)
+    assert index.top("rasam_rice") == ["beans_kai", "beetroot_kai"]
+    assert index.top("beans_kai") == ["rasam_rice"]
+
+    # Re-logging a week replaces its pairs rather than adding to them
+    relogged = {"week_of": "2026-10-05", "dinners": [
+        {"recipe_ids": ["rasam_rice", "beetroot_kai"]},
+        {"recipe_ids": ["sambar_rice", "potato_fry"]},
+    ]}
+    index.update_week("2026-10-05", relogged)
+    history["weeks"][0] = relogged
+
+    assert index.top("rasam_rice") == get_paired_suggestions("rasam_rice", history) == ["beetroot_kai"]
+    assert index.top("beans_kai") == []
+    assert index.top_many(["rasam_rice", "sambar_rice"], limit=1) == {
+        "rasam_rice": ["beetroot_kai"],
+        "sambar_rice": ["potato_fry"],
+    }
+
+def test_pairing_index_is_cached_and_updated_on_write():
+    from collections import OrderedDict
+    from unittest.mock import patch
+    from api.services import pairing_service
+    from api.utils import storage
+
+    history = {"weeks": [{"week_of": "2026-10-05", "dinners": [{"recipe_ids": ["rasam_rice", "beans_kai"]}]}]}
+    with patch.object(pairing_service, '_pairing_indexes', OrderedDict()), \
+         patch.object(storage.StorageEngine, 'get_history', return_value=history) as get_history:
+        index = pairing_service.get_pairing_index('h1')
+        assert pairing_service.get_pairing_index('h1') is index
+        get_history.assert_called_once_with(fields=['dinners'])
+
+        pairing_service.record_week_pairings(
+            "2026-10-12", {"dinners": [{"recipe_ids": ["rasam_rice", "beetroot_kai"]}] * 2}, 'h1')
+        assert index.top("rasam_rice") == ["beetroot_kai", "beans_kai"]
+
+def test_pairing_indexes_are_bounded():
+    from collections import OrderedDict
+    from unittest.mock import patch
+    from api.services import pairing_service
+    from api.utils import storage
+
+    with patch.object(pairing_service, '_pairing_indexes', OrderedDict()) as indexes, \
+         patch.object(pairing_service, 'PAIRING_INDEX_CACHE_SIZE', 2), \
+         patch.object(storage.StorageEngine, 'get_history', return_value={"weeks": []}):
+        pairing_service.get_pairing_index('h1')
+        pairing_service.get_pairing_index('h2')
+        pairing_service.get_pairing_index('h1')  # most recently used
+        pairing_service.get_pairing_index('h3')
+        assert list(indexes) == ['h1', 'h3']
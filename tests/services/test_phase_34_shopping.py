@@ -19,21 +19,24 @@ class TestPhase34ShoppingLogic(unittest.TestCase):
         }
 
     @patch('scripts.inventory_intelligence.get_inventory_items')
-    @patch('api.utils.storage.StorageEngine.get_recipe_content')
+    @patch('api.utils.storage.StorageEngine.get_recipe_contents')
     @patch('api.utils.storage.StorageEngine.get_config')
-    def test_multi_recipe_aggregation(self, mock_get_config, mock_get_recipe, mock_get_inv):
+    def test_multi_recipe_aggregation(self, mock_get_config, mock_get_recipes, mock_get_inv):
         """Test that ingredients from multiple recipes in one slot are aggregated."""
         mock_get_inv.return_value = (set(), {})
         mock_get_config.return_value = {}
         
         # Mock recipe contents
-        mock_get_recipe.side_effect = lambda rid: {
+        mock_get_recipes.return_value = {
             'rasam_rice': {'ingredients': ['Tamarind', 'Tomato']},
             'beetroot_kai': {'ingredients': ['Beetroot', 'Coconut']}
-        }.get(rid, {'ingredients': []})
+        }
 
         result = get_shopping_list(self.plan_data)
         items = [x['item'] for x in result]
+
+        # All recipe content is fetched in one bulk call
+        mock_get_recipes.assert_called_once_with(['rasam_rice', 'beetroot_kai'])
         
         # Should include ingredients from both recipes
         # Note: current implementation might only look at 'vegetables' field if we don't update it to look at ingredients
@@ -41,6 +44,26 @@ class TestPhase34ShoppingLogic(unittest.TestCase):
         self.assertIn('Tomato', items)
         self.assertIn('Beetroot', items)
 
+    @patch('scripts.inventory_intelligence.get_inventory_items')
+    @patch('api.utils.storage.StorageEngine.get_recipe_contents')
+    @patch('api.utils.storage.StorageEngine.get_config')
+    def test_leftovers_and_freezer_meals_are_not_fetched(self, mock_get_config, mock_get_recipes, mock_get_inv):
+        """Pseudo-ids have no recipe content: skip them instead of warning."""
+        mock_get_inv.return_value = (set(), {})
+        mock_get_config.return_value = {}
+        mock_get_recipes.return_value = {'rasam_rice': {'ingredients': ['Tamarind']}}
+        self.plan_data['dinners'] = [
+            {'day': 'mon', 'recipe_ids': ['rasam_rice', 'leftover:dal']},
+            {'day': 'tue', 'recipe_id': 'freezer_lasagna', 'made': 'freezer_backup'},
+        ]
+        self.plan_data['lunches'] = {'wed': {'recipe_ids': ['leftover:dal']}}
+
+        items, warnings = get_shopping_list(self.plan_data, return_warnings=True)
+
+        mock_get_recipes.assert_called_once_with(['rasam_rice'])
+        self.assertEqual(warnings, [])
+        self.assertIn('Tamarind', [x['item'] for x in items])
+
     @patch('scripts.inventory_intelligence.get_inventory_items')
     @patch('api.utils.storage.StorageEngine.get_config')
     def test_permanent_pantry_filtering(self, mock_get_config, mock_get_inv):
@@ -0,0 +1,97 @@
+"""
+Tests for local JWT verification and the verified-token cache in require_auth.
+"""
+import time
+from unittest.mock import MagicMock, patch
+
+import jwt
+import pytest
+from flask import Flask, jsonify, request
+
+from api.utils import auth
+
+SECRET = 'test-jwt-secret-with-enough-bytes-for-hs256'
+
+app = Flask(__name__)
+
+
+@app.route('/protected')
+@auth.require_auth
+def protected():
+    return jsonify({"household_id": request.household_id, "user_id": request.user.id})
+
+
+def _token(secret=SECRET, exp_in=3600, **claims):
+    payload = {'sub': 'user-1', 'email': 'a@example.com', 'aud': 'authenticated', 'exp': int(time.time()) + exp_in}
+    payload.update(claims)
+    return jwt.encode(payload, secret, algorithm='HS256')
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    # Other test modules set DISABLE_AUTH at import time; these tests need the real checks
+    monkeypatch.delenv('DISABLE_AUTH', raising=False)
+    client = MagicMock()
+    with patch.object(auth, 'supabase', client), \
+         patch.object(auth, 'SUPABASE_JWT_SECRET', SECRET), \
+         patch.object(auth, '_token_cache', auth.TokenCache()), \
+         patch.object(auth, 'execute_with_retry', return_value=MagicMock(data=[{'household_id': 'h1'}])) as execute:
+        client.execute = execute
+        yield client
+
+
+def _get(token):
+    with app.test_client() as c:
+        return c.get('/protected', headers={'Authorization': f'Bearer {token}'})
+
+
+def test_verifies_locally_and_caches_household(supabase):
+    token = _token()
+    for _ in range(3):
+        res = _get(token)
+        assert res.status_code == 200
+        assert res.get_json() == {"household_id": "h1", "user_id": "user-1"}
+
+    supabase.auth.get_user.assert_not_called()
+    assert supabase.execute.call_count == 1
+    assert auth.get_auth_cache_stats()['hits'] == 2
+
+
+def test_rejects_bad_signature_and_expired_tokens(supabase):
+    assert _get(_token(secret='some-other-secret-with-enough-bytes')).status_code == 401
+    assert _get(_token(exp_in=-60)).status_code == 401
+    assert _get(_token(aud='anon')).status_code == 401
+    supabase.execute.assert_not_called()
+
+
+def test_cache_entries_expire_with_the_token(supabase):
+    token = _token(exp_in=1)
+    assert _get(token).status_code == 200
+    with patch.object(auth.time, 'time', return_value=time.time() + 5):
+        assert auth._token_cache.get(token) is None
+
+
+def test_missing_profile_is_not_cached(supabase):
+    token = _token()
+    supabase.execute.return_value = MagicMock(data=[])
+    assert _get(token).status_code == 403
+    supabase.execute.return_value = MagicMock(data=[{'household_id': 'h2'}])
+    assert _get(token).get_json()['household_id'] == 'h2'
+
+
+def test_falls_back_to_supabase_without_signing_key(supabase):
+    user = MagicMock(id='user-9', email='b@example.com')
+    supabase.auth.get_user.return_value = MagicMock(user=user)
+    with patch.object(auth, 'SUPABASE_JWT_SECRET', None):
+        token = _token()
+        assert _get(token).get_json() == {"household_id": "h1", "user_id": "user-9"}
+        assert _get(token).status_code == 200
+    supabase.auth.get_user.assert_called_once_with(token)
+
+
+def test_token_cache_is_bounded():
+    cache = auth.TokenCache(max_size=2)
+    for i in range(3):
+        cache.set(f't{i}', i, time.time() + 60)
+    assert cache.get('t0') is None
+    assert cache.get('t2') == 2
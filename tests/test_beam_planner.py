@@ -0,0 +1,112 @@
+"""
+Tests for top-K dinner plans (beam search) and /api/plan/alternatives.
+"""
+from unittest.mock import patch
+
+from api.index import app
+from api.utils import storage
+from api.utils.fake_supabase import FakeSupabaseClient
+from scripts.recipe_index import RecipeIndex
+from scripts.workflow.beam_planner import plan_alternatives
+from scripts.workflow.selection import filter_recipes
+
+H1 = '00000000-0000-0000-0000-000000000001'
+
+RECIPES = [
+    {'id': 'curry', 'name': 'Curry', 'meal_type': 'soup_stew', 'effort_level': 'normal', 'cuisine': 'indian', 'main_veg': ['spinach']},
+    {'id': 'ramen', 'name': 'Ramen', 'meal_type': 'pasta_noodles', 'effort_level': 'normal', 'cuisine': 'japanese', 'main_veg': []},
+    {'id': 'tacos', 'name': 'Tacos', 'meal_type': 'tacos_wraps', 'effort_level': 'low', 'cuisine': 'mexican', 'no_chop_compatible': True, 'main_veg': ['peppers']},
+    {'id': 'pizza', 'name': 'Pizza', 'meal_type': 'pizza', 'effort_level': 'low', 'cuisine': 'italian', 'no_chop_compatible': True, 'main_veg': []},
+    {'id': 'salad', 'name': 'Salad', 'meal_type': 'salad', 'effort_level': 'low', 'cuisine': 'greek', 'main_veg': ['cucumber']},
+    {'id': 'bowl', 'name': 'Bowl', 'meal_type': 'grain_bowl', 'effort_level': 'high', 'cuisine': 'korean', 'main_veg': ['carrots']},
+    {'id': 'stirfry', 'name': 'Stir Fry', 'meal_type': 'stir_fry', 'effort_level': 'low', 'cuisine': 'chinese', 'main_veg': ['broccoli']},
+    {'id': 'pasta', 'name': 'Pasta', 'meal_type': 'pasta_noodles', 'effort_level': 'normal', 'cuisine': 'italian', 'main_veg': []},
+    {'id': 'quesadilla', 'name': 'Quesadilla', 'meal_type': 'sandwich', 'effort_level': 'low', 'cuisine': 'mexican', 'no_chop_compatible': True, 'main_veg': []},
+]
+
+INPUTS = {'week_of': '2026-10-19', 'schedule': {'busy_days': ['thu', 'fri']}, 'preferences': {}}
+
+
+def _plans(**kwargs):
+    index = RecipeIndex(RECIPES)
+    filtered = filter_recipes(index, INPUTS, kwargs.pop('recent', set()))
+    return plan_alternatives(filtered, INPUTS, all_recipes=index, **kwargs)
+
+
+def _check_constraints(dinners):
+    days = [d for d in ('mon', 'tue', 'wed', 'thu', 'fri') if d in dinners]
+    assert len(days) == 5
+    assert len({dinners[d]['meal_type'] for d in days}) == 5
+    assert len({dinners[d]['id'] for d in days}) == 5
+    assert all(dinners[d].get('no_chop_compatible') for d in ('thu', 'fri'))
+    assert dinners['from_scratch_day'] == 'mon'
+    assert dinners['mon']['effort_level'] == 'normal'
+
+
+def test_top_k_plans_are_valid_distinct_and_ranked():
+    plans = _plans(k=3)
+    assert len(plans) == 3
+    for plan in plans:
+        _check_constraints(plan['dinners'])
+        assert plan['relaxed_days'] == []
+    assert [p['score'] for p in plans] == sorted((p['score'] for p in plans), reverse=True)
+    ids = [{r['id'] for d, r in p['dinners'].items() if d != 'from_scratch_day'} for p in plans]
+    assert all(len(a - b) >= 2 for i, a in enumerate(ids) for b in ids[i + 1:])
+
+
+def test_inventory_and_recent_window_steer_the_best_plan():
+    inventory = {'fridge_items': {'spinach', 'carrot'}, 'pantry_items': set(), 'freshness': {}}
+    best = _plans(k=1, inventory=inventory)[0]['dinners']
+    assert best['mon']['id'] == 'curry'
+    assert 'bowl' in {r['id'] for d, r in best.items() if d != 'from_scratch_day'}
+
+    best = _plans(k=1, recent={'curry'})[0]['dinners']
+    assert 'curry' not in {r['id'] for d, r in best.items() if d != 'from_scratch_day'}
+
+
+def test_locked_days_and_rollovers_are_kept():
+    index = RecipeIndex(RECIPES)
+    inputs = dict(INPUTS, rollover=[{'recipe_id': 'stirfry'}])
+    week = {'dinners': [{'day': 'mon', 'recipe_ids': ['ramen']}]}
+    plans = plan_alternatives(filter_recipes(index, inputs, set()), inputs, week, index, k=2)
+    for plan in plans:
+        dinners = plan['dinners']
+        assert dinners['mon']['id'] == 'ramen'
+        assert dinners['tue']['id'] == 'stirfry'
+        # First non-busy day is taken, so there is no from-scratch day
+        assert 'from_scratch_day' not in dinners
+        assert 'pasta' not in {r['id'] for d, r in dinners.items()}  # same meal type as ramen
+
+
+def test_relaxes_rules_when_pool_is_too_small():
+    small = [r for r in RECIPES if r['id'] in ('curry', 'salad', 'stirfry', 'bowl', 'ramen')]
+    index = RecipeIndex(small)
+    plan = plan_alternatives(filter_recipes(index, INPUTS, set()), INPUTS, all_recipes=index, k=1)[0]
+    assert plan['relaxed_days'] == ['thu', 'fri']  # no no-chop recipes at all
+
+
+def test_alternatives_endpoint():
+    client = FakeSupabaseClient({
+        'meal_plans': [{'household_id': H1, 'week_of': '2026-10-19', 'plan_data': INPUTS,
+                        'history_data': {'week_of': '2026-10-19', 'dinners': [{'day': 'mon', 'recipe_ids': ['curry']}]}}],
+        'recipes': [{'household_id': H1, 'id': r['id'], 'name': r['name'],
+                     'metadata': {k: v for k, v in r.items() if k not in ('id', 'name')}} for r in RECIPES],
+        'inventory_items': [],
+    })
+    try:
+        with patch.object(storage, 'supabase', client):
+            res = app.test_client().post('/api/plan/alternatives', json={
+                'week_of': '2026-10-19', 'k': 2, 'locked_days': ['mon'],
+                'selections': [{'day': 'tue', 'slot': 'dinner', 'recipe_id': 'salad'}],
+            })
+            bad = app.test_client().post('/api/plan/alternatives', json={'week_of': '2026-10-19', 'k': 'many'})
+    finally:
+        storage.bump_catalog_version(H1)  # don't leak the fake catalog into other tests
+    body = res.get_json()
+    assert res.status_code == 200, body
+    assert len(body['alternatives']) == 2
+    for alt in body['alternatives']:
+        by_day = {d['day']: d['recipe_id'] for d in alt['dinners']}
+        assert by_day['mon'] == 'curry' and by_day['tue'] == 'salad'
+        assert len(by_day) == 5
+    assert bad.status_code == 400
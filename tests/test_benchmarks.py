@@ -0,0 +1,29 @@
+"""
+Tests for the offline benchmark harness.
+"""
+from api.utils import storage
+from scripts.benchmarks.suite import compare, run_suite
+
+
+def _run(median_ms):
+    return {'results': {'small': {'compute_analytics': {'median_ms': median_ms}}}}
+
+
+def test_suite_runs_offline():
+    client = storage.supabase
+    results = run_suite(['small'], names=['compute_analytics', 'get_shopping_list'], repeat=1)
+    timings = results['results']['small']
+    assert set(timings) == {'compute_analytics', 'get_shopping_list'}
+    assert all(t['median_ms'] >= 0 and t['repeat'] == 1 for t in timings.values())
+    assert results['meta']['scales']['small']['recipes'] == 200
+    # The harness restores the real client afterwards
+    assert storage.supabase is client
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = _run(10.0)
+    assert compare(_run(11.0), baseline) == [('small', 'compute_analytics', 10.0, 11.0, 1.1, False)]
+    assert compare(_run(20.0), baseline)[0][5] is True
+    # Doubling a sub-millisecond timing is noise, not a regression
+    assert compare(_run(0.2), _run(0.1))[0][5] is False
+    assert compare(_run(1.0), {'results': {}}) == []
@@ -0,0 +1,76 @@
+"""
+Tests for StorageEngine.bulk_upsert_inventory: one read, batched delete, one upsert.
+"""
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+
+from api.utils import storage
+
+app = Flask(__name__)
+
+
+def _run(items, existing_rows, catalog_rows=()):
+    client = MagicMock()
+    table = client.table.return_value
+    responses = iter([MagicMock(data=existing_rows), MagicMock(data=[]), MagicMock(data=[])])
+    with app.test_request_context() as ctx, \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.object(storage, 'execute_with_retry', side_effect=lambda q: next(responses)) as execute, \
+         patch.object(storage.StorageEngine, '_get_catalog_rows', return_value=list(catalog_rows)), \
+         patch.object(storage.StorageEngine, 'save_recipe') as save_recipe:
+        ctx.request.household_id = 'h1'
+        storage.StorageEngine.bulk_upsert_inventory(items)
+    return table, execute, save_recipe
+
+
+def test_merges_existing_rows_and_writes_once():
+    existing = [{'id': 'a', 'category': 'fridge', 'item': 'Spinach', 'quantity': 2, 'unit': 'bunch',
+                 'metadata': {'location': 'crisper', 'quantity': 2}}]
+    items = [
+        {'category': 'fridge', 'item': 'Spinach', 'updates': {'added': '2026-10-18'}},
+        {'category': 'pantry', 'item': 'Rice', 'updates': {'quantity': 3, 'unit': 'cup'}},
+    ]
+    table, execute, _ = _run(items, existing)
+
+    assert execute.call_count == 2  # one select + one upsert, no deletes
+    table.select.return_value.eq.return_value.in_.assert_called_once_with("item", ['Spinach', 'Rice'])
+    rows, = table.upsert.call_args.args
+    assert table.upsert.call_args.kwargs == {'on_conflict': 'household_id,category,item'}
+    assert rows == [
+        {'household_id': 'h1', 'category': 'fridge', 'item': 'Spinach', 'quantity': 2, 'unit': 'bunch',
+         'metadata': {'location': 'crisper', 'quantity': 2, 'added': '2026-10-18'}},
+        {'household_id': 'h1', 'category': 'pantry', 'item': 'Rice', 'quantity': 3, 'unit': 'cup',
+         'metadata': {}},
+    ]
+
+
+def test_increment_and_batched_delete():
+    existing = [
+        {'id': 'a', 'category': 'fridge', 'item': 'Dal', 'quantity': 2, 'unit': 'serving', 'metadata': {}},
+        {'id': 'b', 'category': 'fridge', 'item': 'Kale', 'quantity': 1, 'unit': 'count', 'metadata': {}},
+    ]
+    items = [
+        {'category': 'fridge', 'item': 'Dal', 'increment': True, 'updates': {'quantity': 3, 'unit': 'serving'}},
+        {'category': 'fridge', 'item': 'Kale', 'delete': True},
+    ]
+    table, execute, _ = _run(items, existing)
+
+    assert execute.call_count == 3
+    table.delete.return_value.eq.return_value.in_.assert_called_once_with("id", ['b'])
+    rows, = table.upsert.call_args.args
+    assert len(rows) == 1
+    assert rows[0]['quantity'] == 5
+    assert rows[0]['metadata']['quantity'] == 5
+
+
+def test_new_freezer_meals_are_captured_as_recipes():
+    items = [
+        {'category': 'freezer_backup', 'item': 'Palak Paneer', 'updates': {'quantity': 4}},
+        {'category': 'freezer_backup', 'item': 'Chana Masala', 'updates': {'quantity': 2}},
+    ]
+    _, _, save_recipe = _run(items, [], catalog_rows=[{'id': 'chana_masala'}])
+
+    save_recipe.assert_called_once()
+    assert save_recipe.call_args.args[0] == 'palak_paneer'
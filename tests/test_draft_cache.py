@@ -0,0 +1,110 @@
+"""
+Tests for the content-addressed draft cache behind /api/plan/draft.
+"""
+import shutil
+from pathlib import Path
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from api.index import app
+from api.services.draft_cache import DraftCache, draft_key
+from api.utils import storage
+from api.utils.fake_supabase import FakeSupabaseClient
+
+H1 = '00000000-0000-0000-0000-000000000001'
+WEEK = '2026-10-19'
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+RECIPES = [
+    {'id': 'curry', 'name': 'Curry', 'meal_type': 'soup_stew', 'effort_level': 'normal', 'main_veg': ['spinach']},
+    {'id': 'tacos', 'name': 'Tacos', 'meal_type': 'tacos_wraps', 'effort_level': 'low', 'no_chop_compatible': True, 'main_veg': []},
+    {'id': 'pizza', 'name': 'Pizza', 'meal_type': 'pizza', 'effort_level': 'low', 'no_chop_compatible': True, 'main_veg': []},
+    {'id': 'salad', 'name': 'Salad', 'meal_type': 'salad', 'effort_level': 'low', 'main_veg': ['cucumber']},
+    {'id': 'bowl', 'name': 'Bowl', 'meal_type': 'grain_bowl', 'effort_level': 'high', 'main_veg': ['carrots']},
+    {'id': 'ramen', 'name': 'Ramen', 'meal_type': 'pasta_noodles', 'effort_level': 'normal', 'main_veg': []},
+]
+
+
+def test_key_ignores_generated_fields_and_tracks_inputs():
+    plan = {'week_of': WEEK, 'schedule': {'busy_days': ['thu']}}
+    key = draft_key(H1, WEEK, plan, {'weeks': []}, 1, {'fridge': []})
+    generated = dict(plan, dinners=[{'day': 'mon'}], workflow={'status': 'plan_complete'})
+    assert draft_key(H1, WEEK, generated, {'weeks': []}, 1, {'fridge': []}) == key
+    assert draft_key(H1, WEEK, plan, {'weeks': []}, 2, {'fridge': []}) != key
+    assert draft_key(H1, WEEK, plan, {'weeks': []}, 1, {'fridge': [{'item': 'kale'}]}) != key
+    assert draft_key(H1, WEEK, dict(plan, schedule={}), {'weeks': []}, 1, {'fridge': []}) != key
+    # Inventory freshness depends on the day, so tomorrow's key differs
+    assert draft_key(H1, WEEK, plan, {'weeks': []}, 1, {'fridge': []}, on=date.today()) == key
+    assert draft_key(H1, WEEK, plan, {'weeks': []}, 1, {'fridge': []}, on=date(2026, 1, 1)) != key
+
+
+def test_lru_eviction_and_copies():
+    cache = DraftCache(max_size=2)
+    cache.set('a', {'dinners': []}, {})
+    cache.set('b', {}, {})
+    cache.get('a')
+    cache.set('c', {}, {})
+    assert cache.get('b') is None  # least recently used
+    plan, _ = cache.get('a')
+    plan['dinners'].append('mutated')
+    assert cache.get('a')[0] == {'dinners': []}
+
+
+@pytest.fixture
+def draft_client(tmp_path, monkeypatch):
+    # generate_meal_plan reads data/history.yml and writes its HTML plan
+    # relative to the working directory
+    shutil.copytree(REPO_ROOT / 'templates', tmp_path / 'templates')
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'data' / 'history.yml').write_text('weeks: []\n')
+    monkeypatch.chdir(tmp_path)
+    client = FakeSupabaseClient({
+        'meal_plans': [{'household_id': H1, 'week_of': WEEK, 'status': 'planning',
+                        'plan_data': {'week_of': WEEK, 'schedule': {'busy_days': ['thu', 'fri']},
+                                      'meals_covered': {'dinner': True, 'kids_lunch': False, 'adult_lunch': False}},
+                        'history_data': {'week_of': WEEK, 'dinners': [], 'lunches': {}, 'snacks': {}}}],
+        'recipes': [{'household_id': H1, 'id': r['id'], 'name': r['name'],
+                     'metadata': {k: v for k, v in r.items() if k not in ('id', 'name')}} for r in RECIPES],
+        'inventory_items': [],
+    })
+    monkeypatch.setattr('api.routes.meals.draft_cache', DraftCache())
+    with patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.object(storage.StorageEngine, 'save_analytics_rollups'), \
+         patch.object(storage.StorageEngine, 'index_logged_meals'):
+        yield app.test_client(), client
+    storage.bump_catalog_version(H1)  # don't leak the fake catalog into other tests
+
+
+def test_repeated_draft_is_served_from_cache(draft_client):
+    http, client = draft_client
+    body = {'week_of': WEEK, 'locked_days': [], 'selections': [{'day': 'mon', 'slot': 'dinner', 'recipe_id': 'ramen'}]}
+
+    first = http.post('/api/plan/draft', json=body).get_json()
+    assert first['status'] == 'success', first
+    assert 'cached' not in first
+    assert client.stats()['by_table']['POST meal_plans'] == 1
+
+    # Double click: the inputs now include the saved draft, and still hit
+    second = http.post('/api/plan/draft', json=body).get_json()
+    assert second['cached'] is True
+    assert second['history_data'] == first['history_data']
+    assert client.stats()['by_table']['POST meal_plans'] == 1  # already saved, nothing to write
+
+    changed = dict(body, selections=[{'day': 'mon', 'slot': 'dinner', 'recipe_id': 'curry'}])
+    third = http.post('/api/plan/draft', json=changed).get_json()
+    assert 'cached' not in third
+    assert [d for d in third['history_data']['dinners'] if d['day'] == 'mon'][0]['recipe_id'] == 'curry'
+
+
+def test_regenerate_skips_the_cache(draft_client):
+    http, client = draft_client
+    body = {'week_of': WEEK, 'locked_days': [], 'selections': [{'day': 'mon', 'slot': 'dinner', 'recipe_id': 'ramen'}]}
+    http.post('/api/plan/draft', json=body)
+    assert http.post('/api/plan/draft', json=body).get_json()['cached'] is True
+
+    regenerated = http.post('/api/plan/draft', json=dict(body, regenerate=True)).get_json()
+    assert regenerated['status'] == 'success', regenerated
+    assert 'cached' not in regenerated
@@ -0,0 +1,73 @@
+"""
+Tests for the in-process fake Supabase backend.
+"""
+from unittest.mock import patch
+
+from flask import Flask
+
+from api.utils import storage
+from api.utils.fake_supabase import FakeSupabaseClient
+
+app = Flask(__name__)
+
+H1 = 'h1'
+
+
+def _client():
+    return FakeSupabaseClient({
+        'meal_plans': [
+            {'household_id': H1, 'week_of': '2026-09-28', 'status': 'archived', 'history_data': {'dinners': [{'day': 'mon'}]}},
+            {'household_id': H1, 'week_of': '2026-10-05', 'status': 'active', 'history_data': None},
+            {'household_id': H1, 'week_of': '2026-10-12', 'status': 'planning', 'history_data': {'dinners': []}},
+            {'household_id': 'h2', 'week_of': '2026-10-12', 'status': 'active', 'history_data': {}},
+        ]
+    })
+
+
+def test_filters_order_and_projection():
+    client = _client()
+    res = (client.table('meal_plans').select('week_of, d:history_data->dinners')
+           .eq('household_id', H1).not_.is_('history_data', 'null').order('week_of', desc=True).execute())
+    assert res.data == [{'week_of': '2026-10-12', 'd': []}, {'week_of': '2026-09-28', 'd': [{'day': 'mon'}]}]
+
+    res = client.table('meal_plans').select('week_of').neq('status', 'archived').lte('week_of', '2026-10-05').execute()
+    assert res.data == [{'week_of': '2026-10-05'}]
+
+    res = client.table('meal_plans').select('week_of').in_('status', ['active', 'planning']).order('week_of').range(1, 2).execute()
+    assert [r['week_of'] for r in res.data] == ['2026-10-12', '2026-10-12']
+
+
+def test_upsert_update_and_delete():
+    client = _client()
+    table = lambda: client.table('meal_plans')
+    table().upsert({'household_id': H1, 'week_of': '2026-10-12', 'status': 'active'}, on_conflict='household_id, week_of').execute()
+    table().upsert({'household_id': H1, 'week_of': '2026-10-19', 'status': 'planning'}, on_conflict='household_id,week_of').execute()
+
+    rows = table().select('*').eq('household_id', H1).eq('week_of', '2026-10-12').execute().data
+    assert len(rows) == 1 and rows[0]['status'] == 'active' and rows[0]['history_data'] == {'dinners': []}
+
+    updated = table().update({'status': 'archived'}).match({'household_id': H1, 'status': 'active'}).execute().data
+    assert sorted(r['week_of'] for r in updated) == ['2026-10-05', '2026-10-12']
+
+    table().delete().eq('household_id', 'h2').execute()
+    assert client.stats()['rows'] == {'meal_plans': 4}
+    assert client.stats()['by_table']['PATCH meal_plans'] == 1
+
+
+def test_storage_engine_and_request_cache_run_against_fake():
+    client = _client()
+    with app.test_request_context() as ctx, \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.object(storage.StorageEngine, 'save_analytics_rollups'), \
+         patch.object(storage.StorageEngine, 'index_logged_meals'):
+        ctx.request.household_id = H1
+        history = storage.StorageEngine.get_history(fields=['dinners'])
+        storage.StorageEngine.get_history(fields=['dinners'])
+        assert client.stats()['round_trips'] == 1  # second read served by the request cache
+
+        storage.StorageEngine.update_meal_plan('2026-10-05', history_data={'dinners': [{'day': 'tue'}]})
+        history = storage.StorageEngine.get_history(fields=['dinners'])
+
+    assert [w['week_of'] for w in history['weeks']] == ['2026-10-12', '2026-10-05', '2026-09-28']
+    assert history['weeks'][1]['dinners'] == [{'day': 'tue'}]
@@ -0,0 +1,80 @@
+"""
+Tests for the concurrent storage fan-out helper and its use in /api/status.
+"""
+import time
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, g
+
+from api.utils import storage
+from api.utils.fanout import fan_out
+
+app = Flask(__name__)
+
+
+def test_runs_concurrently_in_request_context():
+    def slow(value):
+        def call():
+            time.sleep(0.2)
+            return (value, storage.get_household_id(), g.get('_storage_read_cache') is not None)
+        return call
+
+    with app.test_request_context() as ctx:
+        ctx.request.household_id = 'h1'
+        started = time.perf_counter()
+        results = fan_out(slow('a'), slow('b'), slow('c'))
+        elapsed = time.perf_counter() - started
+
+    assert results == [('a', 'h1', True), ('b', 'h1', True), ('c', 'h1', True)]
+    assert elapsed < 0.5
+
+
+def test_workers_share_request_read_cache():
+    with app.test_request_context():
+        cache = storage._request_cache()
+        fan_out(lambda: storage._request_cache().setdefault('k', 1), lambda: None)
+        assert cache == {'k': 1}
+
+
+def test_errors_propagate_after_all_calls_finish():
+    finished = []
+
+    def ok():
+        time.sleep(0.05)
+        finished.append(True)
+
+    def boom():
+        raise ValueError('boom')
+
+    with app.test_request_context():
+        with pytest.raises(ValueError):
+            fan_out(boom, ok)
+    assert finished == [True]
+
+
+def test_serial_outside_request():
+    assert fan_out(lambda: 1, lambda: 2) == [1, 2]
+
+
+def test_status_issues_reads_once():
+    from api.routes import status
+
+    plan = {'week_of': '2026-10-12', 'status': 'active', 'plan_data': {}, 'history_data': {}}
+    with app.test_request_context('/api/status') as ctx, \
+         patch.object(status, '_load_config', return_value={'timezone': 'UTC'}), \
+         patch.object(status, '_fetch_week_plan', return_value=plan) as week_plan, \
+         patch.object(status, '_fetch_next_week', return_value={'week_of': '2026-10-19', 'status': 'planning'}), \
+         patch.object(status, '_fetch_available_weeks', return_value=[{'week_of': '2026-10-12'}]), \
+         patch.object(storage.StorageEngine, 'sweep_expired_weeks_if_due') as sweep, \
+         patch.object(storage.StorageEngine, 'get_pending_recipes', return_value=['dal']), \
+         patch.object(storage.StorageEngine, 'get_workflow_state', return_value=('active', {})):
+        ctx.request.household_id = 'h1'
+        response = status._get_current_status(week_override='2026-10-12')
+        body = response.get_json()
+
+    sweep.assert_called_once()
+    week_plan.assert_called_once_with('2026-10-12')
+    assert body['pending_recipes'] == ['dal']
+    assert body['next_week'] == {'week_of': '2026-10-19', 'status': 'planning'}
+    assert body['available_weeks'] == [{'week_of': '2026-10-12'}]
@@ -0,0 +1,89 @@
+"""
+Tests for windowed/projected history loading.
+"""
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+
+from api.utils import storage
+from scripts.workflow.selection import get_recent_recipes, latest_weeks
+
+app = Flask(__name__)
+
+
+def _get_history(rows, **kwargs):
+    client = MagicMock()
+    query = client.table.return_value.select.return_value
+    query.gte.return_value = query
+    query.lt.return_value = query
+    query.eq.return_value = query
+    query.order.return_value = query
+    query.limit.return_value = query
+    query.execute.return_value = MagicMock(data=rows)
+    with app.test_request_context() as ctx, patch.object(storage, 'supabase', client):
+        ctx.request.household_id = 'h1'
+        result = storage.StorageEngine.get_history(**kwargs)
+    return client, query, result
+
+
+def test_projection_and_window_are_server_side():
+    rows = [{'week_of': '2026-10-12', 'dinners': [{'recipe_id': 'dal'}]},
+            {'week_of': '2026-10-05', 'dinners': None}]
+    client, query, result = _get_history(rows, since='2026-09-21', limit=4, fields=['dinners'])
+
+    client.table.return_value.select.assert_called_once_with("week_of, dinners:history_data->dinners")
+    query.gte.assert_called_once_with("week_of", "2026-09-21")
+    query.order.assert_called_once_with("week_of", desc=True)
+    query.limit.assert_called_once_with(4)
+    assert result == {'weeks': [{'week_of': '2026-10-12', 'dinners': [{'recipe_id': 'dal'}]},
+                                {'week_of': '2026-10-05'}]}
+
+
+def test_full_history_by_default():
+    rows = [{'history_data': {'week_of': '2026-10-12', 'dinners': []}}]
+    client, query, result = _get_history(rows)
+    client.table.return_value.select.assert_called_once_with("history_data")
+    assert not query.gte.called and not query.limit.called
+    assert result == {'weeks': [{'week_of': '2026-10-12', 'dinners': []}]}
+
+
+def test_invalid_fields_are_rejected():
+    client, _, result = _get_history([], fields=['dinners->0'])
+    assert result == {'weeks': []}
+    assert not client.table.called
+
+
+def test_recent_recipes_ignore_list_order():
+    weeks = [{'week_of': f'2026-09-{d:02d}', 'dinners': [{'recipe_id': f'r{d}'}]} for d in (28, 21, 14, 7)]
+    # Newest-first (DB) and oldest-first (history.yml) give the same answer
+    assert get_recent_recipes({'weeks': weeks}, 3) == {'r28', 'r21', 'r14'}
+    assert get_recent_recipes({'weeks': weeks[::-1]}, 3) == {'r28', 'r21', 'r14'}
+    assert [w['week_of'] for w in latest_weeks({'weeks': weeks}, 2)] == ['2026-09-21', '2026-09-28']
+
+
+def test_window_excludes_the_planned_week_and_later():
+    client, query, _ = _get_history([], since='2026-09-28', before='2026-10-19')
+    query.gte.assert_called_once_with("week_of", "2026-09-28")
+    query.lt.assert_called_once_with("week_of", "2026-10-19")
+
+    client, query, _ = _get_history([], week_of='2026-10-19', limit=1)
+    query.eq.assert_any_call("week_of", "2026-10-19")
+    query.limit.assert_called_once_with(1)
+    assert not query.gte.called
+
+
+def test_recent_recipes_skip_the_planned_week():
+    weeks = [{'week_of': f'2026-{m}-{d:02d}', 'dinners': [{'recipe_id': f'r{d}'}]}
+             for m, d in (('10', 26), ('10', 19), ('10', 12), ('10', 5), ('09', 28))]
+    assert get_recent_recipes({'weeks': weeks}, 3, before='2026-10-19') == {'r12', 'r5', 'r28'}
+
+
+def test_replan_loads_the_recent_recipe_window():
+    from api.index import app as api_app
+    active = {'week_of': '2026-10-19', 'plan_data': {'week_of': '2026-10-19'}}
+    with patch.object(storage.StorageEngine, 'get_active_week', return_value=active), \
+         patch.object(storage.StorageEngine, 'get_inventory', return_value={}), \
+         patch.object(storage.StorageEngine, 'get_history', return_value={'weeks': []}) as get_history, \
+         patch('api.routes.meals.replan_meal_plan', return_value=(None, None)):
+        api_app.test_client().post('/api/replan', json={'strategy': 'fresh'})
+    get_history.assert_called_once_with(since='2026-09-28')
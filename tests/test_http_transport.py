@@ -0,0 +1,76 @@
+"""
+Tests for the pooled Supabase HTTP transport.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+
+from api.utils import http_transport
+from api.utils.http_transport import InstrumentedTransport, TransportConfig
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'[]'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_config_from_env():
+    env = {
+        'SUPABASE_HTTP_MAX_CONNECTIONS': '8',
+        'SUPABASE_HTTP_MAX_KEEPALIVE': '16',
+        'SUPABASE_HTTP_KEEPALIVE_EXPIRY': '5',
+        'SUPABASE_HTTP2': 'true',
+    }
+    with patch.dict('os.environ', env):
+        config = TransportConfig.from_env()
+    assert config.max_connections == 8
+    assert config.max_keepalive == 8  # capped at max_connections
+    assert config.keepalive_expiry == 5.0
+    assert config.http2 is True
+    assert TransportConfig().http2 is False
+
+
+def test_keepalive_connections_are_reused():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    transport = InstrumentedTransport(TransportConfig(max_connections=2))
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}/rest/v1/recipes'
+        # Closing a client must not close the shared pool
+        for _ in range(2):
+            with httpx.Client(transport=transport) as client:
+                for _ in range(3):
+                    assert client.get(url).status_code == 200
+
+        stats = transport.stats()
+        assert stats['requests'] == 6
+        assert stats['in_flight'] == 0
+        assert stats['connections_opened'] >= 1
+        assert stats['connections_opened'] + stats['connections_reused'] == 6
+        assert stats['connections_reused'] >= 2
+        assert stats['in_use'] + stats['idle'] == stats['connections']
+    finally:
+        transport.shutdown()
+        server.shutdown()
+
+
+def test_supabase_client_uses_shared_transport():
+    with patch.object(http_transport, '_transport', None):
+        client = http_transport.create_pooled_client('https://example.supabase.co', 'header.payload.signature')
+        transport = http_transport.get_transport()
+        assert client.postgrest.session._transport is transport
+        assert client.auth._http_client._transport is transport
+        assert http_transport.get_pool_stats()['config']['http2'] is False
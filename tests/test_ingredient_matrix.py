@@ -0,0 +1,49 @@
+"""
+Tests for the recipes x ingredients scoring matrix.
+"""
+from scripts.ingredient_matrix import IngredientMatrix, score_rows
+from scripts.recipe_index import RecipeIndex
+from scripts.workflow.selection import score_catalog_by_inventory, score_recipe_by_inventory
+
+RECIPES = [
+    {'id': 'tacos', 'name': 'Tacos', 'main_veg': ['Bell Peppers', 'onion', 'onion']},
+    {'id': 'soup', 'name': 'Soup', 'main_veg': ['carrots', 'celery', 'kale', 'spinach', 'onion']},
+    {'id': 'toast', 'name': 'Toast', 'main_veg': []},
+    {'id': 'salad', 'name': 'Salad', 'main_veg': ['kale']},
+    {'id': 'curry', 'name': 'Curry', 'main_veg': ['spinach', 'chickpeas', 'cauliflower', 'carrots']},
+    {'id': 'greens', 'name': 'Greens', 'main_veg': ['kale', 'kale', 'kale', 'kale']},
+]
+
+INVENTORY = {
+    'fridge_items': {'onion', 'kale', 'spinach', 'carrot'},
+    'pantry_items': {'onion', 'chickpea', 'celery'},
+    'freshness': {'kale': 6, 'onion': 1},
+    'freezer_backups': [],
+}
+
+
+def test_dot_counts_duplicates():
+    matrix = IngredientMatrix([['a', 'b', 'a'], [], ['c']])
+    assert matrix.dot({'a': 2, 'c': 1, 'unknown': 5}) == [4.0, 0.0, 1.0]
+    assert IngredientMatrix([[], []]).dot({'a': 1}) == [0.0, 0.0]
+
+
+def test_dot_and_score_rows_on_selected_rows():
+    matrix = IngredientMatrix([['a', 'b', 'a'], [], ['c']])
+    assert matrix.dot({'a': 2, 'c': 1}, row_ids=[2, 0]) == [1.0, 4.0]
+    assert matrix.dot({'a': 2}, row_ids=[]) == []
+    index = RecipeIndex(RECIPES)
+    assert score_rows(index.inventory_matrix, INVENTORY, [5, 3]) == [100.0, 30.0]
+
+
+def test_catalog_scores_match_per_recipe_scorer():
+    index = RecipeIndex(RECIPES)
+    scored = score_catalog_by_inventory(index, INVENTORY, with_details=True)
+    assert list(scored) == [r['id'] for r in RECIPES]
+    for recipe in RECIPES:
+        assert scored[recipe['id']] == score_recipe_by_inventory(recipe['id'], recipe, INVENTORY, index)
+    # Fridge beats pantry; aging fridge items get the bonus; capped at 100
+    assert scored['salad'][0] == 30.0
+    assert scored['soup'][0] == 95.0
+    assert scored['greens'][0] == 100.0
+    assert score_catalog_by_inventory(RECIPES, INVENTORY)['toast'] == 0.0
@@ -0,0 +1,45 @@
+"""
+Tests for the shared ingredient normalizer.
+"""
+from scripts.ingredient_normalizer import (
+    IngredientNormalizer,
+    canonical_ingredient,
+    get_normalizer,
+    normalize_ingredient,
+    strip_leading_quantity,
+)
+
+
+def test_basic_rules():
+    assert normalize_ingredient('Sweet Potatoes') == 'sweet_potato'
+    assert normalize_ingredient('Berries') == 'berry'
+    assert normalize_ingredient('Carrots (diced), peeled') == 'carrot'
+    assert normalize_ingredient('Swiss') == 'swiss'
+    assert normalize_ingredient('') == ''
+    assert normalize_ingredient(None) == ''
+
+
+def test_taxonomy_tables_are_applied():
+    assert normalize_ingredient('Hummus') == 'hummus'
+    assert normalize_ingredient('Curry Leaves') == 'curry_leaf'
+    assert normalize_ingredient('Red Onions') == 'red_onion'
+    assert canonical_ingredient('Red Onions') == 'onion'
+    assert canonical_ingredient('cherry tomatoes') == 'tomato'
+
+
+def test_custom_tables_and_memo():
+    normalizer = IngredientNormalizer(aliases={'scallion': 'green_onion'}, cache_size=2)
+    assert normalizer.canonical('Scallions') == 'green_onion'
+    assert normalizer.canonical('Scallions') == 'green_onion'
+    info = normalizer.cache_info()['canonical']
+    assert info['hits'] == 1
+    assert info['maxsize'] == 2
+
+
+def test_default_normalizer_is_shared():
+    assert get_normalizer() is get_normalizer()
+
+
+def test_strip_leading_quantity():
+    assert strip_leading_quantity('1/2 tsp turmeric') == 'turmeric'
+    assert strip_leading_quantity('green chilies') == 'green chilies'
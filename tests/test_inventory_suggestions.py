@@ -0,0 +1,95 @@
+"""
+The indexed get_substitutions / get_waste_not_suggestions must return exactly
+what the original full-scan scoring returned.
+"""
+import random
+from unittest.mock import patch
+
+from scripts import inventory_intelligence as ii
+from scripts.inventory_intelligence import IngredientIndex, normalize_ingredient
+
+VEG = ['Spinach', 'Sweet Potatoes', 'tomatoes', 'Bell Pepper', 'rice', 'Kale', 'carrot', 'peas', 'tofu (firm)']
+WORDS = ['Curry', 'Fried Rice', 'Spinach', 'Sweet Potato', 'Soup', 'Tofu', 'Bowl', 'Pasta', 'Kale Salad', 'Tomato']
+
+
+def _catalog(seed, n=120):
+    rng = random.Random(seed)
+    recipes = []
+    for i in range(n):
+        recipes.append({
+            'id': f'r{i}',
+            'name': ' '.join(rng.sample(WORDS, rng.randint(1, 3))),
+            'main_veg': rng.sample(VEG, rng.randint(0, 3)),
+            'effort_level': rng.choice(['low', 'normal']),
+        })
+    return recipes
+
+
+def _reference_fridge_shop(recipes, inventory_set):
+    scored = []
+    for recipe in recipes:
+        score, matches = 0, []
+        for veg in (recipe.get('main_veg') or []):
+            if normalize_ingredient(veg) in inventory_set:
+                score += 2
+                matches.append(veg)
+        norm_title = normalize_ingredient(recipe.get('name', ''))
+        for item in inventory_set:
+            if item in norm_title and len(item) > 3:
+                score += 1
+        if score > 0:
+            scored.append({'recipe': recipe, 'score': score, 'matches': matches})
+    scored.sort(key=lambda x: x['score'], reverse=True)
+    return scored
+
+
+def _reference_waste_not(recipes, inventory_set, leftovers):
+    scored = []
+    for recipe in recipes:
+        score, rationale = 0, []
+        for lo in leftovers:
+            if lo in normalize_ingredient(recipe.get('name', '')):
+                score += 10
+                rationale.append(f"Uses leftover {lo}")
+        for veg in (recipe.get('main_veg') or []):
+            norm_veg = normalize_ingredient(veg)
+            if norm_veg in inventory_set:
+                score += 3
+                rationale.append(f"Uses {veg}")
+                if norm_veg in leftovers:
+                    score += 5
+            if score > 0:
+                scored.append({'recipe': recipe, 'score': score, 'rationale': list(set(rationale))})
+    scored.sort(key=lambda x: x.get('score', 0), reverse=True)
+    return scored
+
+
+def test_title_substring_lookup_is_exact():
+    index = IngredientIndex(_catalog(1))
+    for fragment in ['', 'ri', 'rice', 'sweet_potato', 'potato_curry', 'zzz', 'oup']:
+        expected = [p for p, t in enumerate(index.titles) if fragment in t]
+        assert sorted(index.positions_with_title_substring(fragment)) == expected
+
+
+def test_fridge_shop_ranking_matches_full_scan():
+    for seed in range(5):
+        recipes = _catalog(seed)
+        rng = random.Random(seed + 100)
+        inventory_set = {normalize_ingredient(v) for v in rng.sample(VEG, 4)}
+        ranked = ii._rank_fridge_shop(IngredientIndex(recipes), inventory_set)
+        assert ranked == _reference_fridge_shop(recipes, inventory_set)
+
+
+def test_waste_not_matches_full_scan():
+    for seed in range(5):
+        recipes = _catalog(seed)
+        rng = random.Random(seed + 200)
+        fridge = [{'item': v, 'is_leftover': rng.random() < 0.5} for v in rng.sample(VEG, 4)]
+        inventory_set = {normalize_ingredient(i['item']) for i in fridge}
+        leftovers = [normalize_ingredient(i['item']) for i in fridge if i['is_leftover']]
+        with patch.object(ii, 'get_inventory_items', return_value=(inventory_set, {'fridge': fridge})), \
+             patch.object(ii.StorageEngine, 'get_recipes', return_value=recipes):
+            result = ii.get_waste_not_suggestions(limit=1000)
+        expected = _reference_waste_not(recipes, inventory_set, leftovers)
+        assert [(r['recipe']['id'], r['score'], sorted(r['rationale'])) for r in result] == \
+               [(r['recipe']['id'], r['score'], sorted(r['rationale'])) for r in expected]
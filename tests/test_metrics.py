@@ -0,0 +1,84 @@
+"""
+Tests for the Prometheus metrics endpoint.
+"""
+from unittest.mock import patch
+
+from flask import Blueprint, Flask, jsonify
+
+from api.utils import metrics, storage, tracing
+from api.utils.fake_supabase import FakeSupabaseClient
+from api.utils.storage import SWRCache
+
+
+def _app(client):
+    app = tracing.init_app(Flask(__name__))
+    bp = Blueprint('plans', __name__)
+
+    @bp.route('/plans/<week_of>')
+    def plans(week_of):
+        query = lambda: client.table('meal_plans').select('*').eq('week_of', week_of)
+        storage.execute_with_retry(query())
+        storage.execute_with_retry(query())  # request cache hit
+        return jsonify({})
+
+    app.register_blueprint(bp)
+    return app
+
+
+def _samples(text):
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in text.splitlines() if line and not line.startswith('#')}
+
+
+def test_request_histogram_and_query_counters():
+    metrics.reset()
+    with patch.object(tracing, 'SLOW_REQUEST_MS', 10 ** 9):
+        client = _app(FakeSupabaseClient()).test_client()
+        client.get('/plans/2026-10-05')
+        client.get('/plans/2026-10-12')
+    samples = _samples(metrics.render())
+
+    labels = 'blueprint="plans",route="/plans/<week_of>",method="GET",status="200"'
+    # Both weeks land on the route template, not the raw path
+    assert samples[f'mealplanner_request_duration_seconds_count{{{labels}}}'] == 2
+    assert samples[f'mealplanner_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 2
+    assert samples['mealplanner_supabase_queries_total{table="meal_plans",method="GET"}'] == 2
+    assert samples['mealplanner_supabase_query_cache_hits_total{table="meal_plans",method="GET"}'] == 2
+    assert samples['mealplanner_supabase_query_errors_total{table="meal_plans",method="GET"}'] == 0
+
+
+def test_swr_cache_counts_hits_stale_and_misses():
+    cache = SWRCache(fresh_ttl=300, stale_ttl=600, name='test_swr')
+    cache.get('k')
+    cache.set('k', 1)
+    cache.get('k')
+    with patch('api.utils.storage.time.time', return_value=10 ** 10):
+        cache.get('k')  # past the stale window: a miss
+    assert cache.get_stats()['hits'] == 1
+    assert cache.get_stats()['misses'] == 2
+
+    samples = _samples(metrics.render())
+    assert samples['mealplanner_cache_lookups_total{cache="swr_test_swr",result="hit"}'] == 1
+    assert samples['mealplanner_cache_lookups_total{cache="swr_test_swr",result="miss"}'] == 2
+    assert 'mealplanner_cache_lookups_total{cache="prep_tasks",result="hit"}' in samples
+    assert 'mealplanner_cache_lookups_total{cache="auth_token",result="miss"}' in samples
+    storage.SWR_CACHES.pop('test_swr')
+
+
+def test_families_are_grouped():
+    metrics.reset()
+    metrics.observe_query('recipes', 'GET', 0.01)
+    metrics.observe_query('inventory_items', 'GET', 0.02, retries=1)
+    names = [line.split()[2] for line in metrics.render().splitlines() if line.startswith('# TYPE')]
+    assert len(names) == len(set(names))
+
+
+def test_metrics_endpoint():
+    from api.index import app
+    with patch.dict('os.environ', {'METRICS_TOKEN': 'secret'}):
+        client = app.test_client()
+        assert client.get('/api/metrics').status_code == 401
+        res = client.get('/api/metrics', headers={'Authorization': 'Bearer secret'})
+    assert res.status_code == 200
+    assert res.content_type.startswith('text/plain')
+    assert '# TYPE mealplanner_cache_lookups_total counter' in res.get_data(as_text=True)
@@ -0,0 +1,152 @@
+"""
+Tests for the incrementally maintained pending-recipes index (meal_log_index).
+"""
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+
+from api.utils import storage
+
+app = Flask(__name__)
+
+CATALOG = [{'id': 'street_tacos', 'name': 'Street Tacos'}]
+
+
+def _week(*meals):
+    return {'dinners': [{'day': d, 'actual_meal': m} for d, m in zip(['mon', 'tue', 'wed', 'thu'], meals)]}
+
+
+def test_get_pending_reads_index_and_refilters():
+    client = MagicMock()
+    rows = [{'unmatched': ['Grandma Dal', 'Street Tacos']}, {'unmatched': ['Grandma Dal', 'Kale Soup']}]
+    with app.test_request_context() as ctx, \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage.StorageEngine, '_ensure_pending_index') as ensure, \
+         patch.object(storage, 'execute_with_retry', return_value=MagicMock(data=rows)), \
+         patch.object(storage.StorageEngine, '_get_catalog_rows', return_value=CATALOG), \
+         patch.object(storage.StorageEngine, '_get_config_key', return_value=['Kale Soup']):
+        ctx.request.household_id = 'h1'
+        pending = storage.StorageEngine.get_pending_recipes()
+
+    ensure.assert_called_once_with('h1')
+    client.table.assert_called_with('meal_log_index')
+    assert pending == ['Grandma Dal']
+
+
+def test_index_logged_meals_upserts_one_row_per_week():
+    client = MagicMock()
+    with app.test_request_context() as ctx, \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.object(storage, 'execute_with_retry'), \
+         patch.object(storage.StorageEngine, '_get_catalog_rows', return_value=CATALOG), \
+         patch.object(storage.StorageEngine, '_get_config_key', return_value=[]):
+        ctx.request.household_id = 'h1'
+        storage.StorageEngine.index_logged_meals({
+            '2026-10-05': _week('Street Tacos', 'Leftovers'),
+            '2026-10-12': _week('Grandma Dal', 'Grandma Dal'),
+        })
+
+    rows, = client.table.return_value.upsert.call_args.args
+    assert client.table.return_value.upsert.call_args.kwargs == {'on_conflict': 'household_id,week_of'}
+    assert rows == [
+        {'household_id': 'h1', 'week_of': '2026-10-05', 'unmatched': []},
+        {'household_id': 'h1', 'week_of': '2026-10-12', 'unmatched': ['Grandma Dal']},
+    ]
+
+
+def test_resolve_only_rewrites_weeks_that_changed():
+    client = MagicMock()
+    index_rows = [
+        {'week_of': '2026-10-05', 'unmatched': ['Street Tacos']},
+        {'week_of': '2026-10-12', 'unmatched': ['Grandma Dal']},
+    ]
+    with app.test_request_context() as ctx, \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.object(storage, 'execute_with_retry', return_value=MagicMock(data=index_rows)), \
+         patch.object(storage.StorageEngine, '_get_catalog_rows', return_value=CATALOG), \
+         patch.object(storage.StorageEngine, '_get_config_key', return_value=[]):
+        ctx.request.household_id = 'h1'
+        storage.StorageEngine.resolve_pending_recipes()
+
+    rows, = client.table.return_value.upsert.call_args.args
+    assert rows == [{'household_id': 'h1', 'week_of': '2026-10-05', 'unmatched': []}]
+
+
+def test_ensure_index_backfills_missing_weeks_once():
+    client = MagicMock()
+    results = [
+        MagicMock(data=[{'week_of': '2026-10-05'}, {'week_of': '2026-10-12'}]),  # meal_plans weeks
+        MagicMock(data=[{'week_of': '2026-10-05'}]),  # indexed weeks
+    ]
+    with patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.object(storage, '_pending_index_checked', set()), \
+         patch.object(storage, 'execute_with_retry', side_effect=results) as execute, \
+         patch.object(storage.StorageEngine, 'rebuild_pending_index') as rebuild:
+        storage.StorageEngine._ensure_pending_index('h1')
+        storage.StorageEngine._ensure_pending_index('h1')
+
+    rebuild.assert_called_once_with('h1', weeks=['2026-10-12'])
+    assert execute.call_count == 2
+
+
+def test_update_meal_plan_indexes_history():
+    client = MagicMock()
+    history = _week('Grandma Dal')
+    with app.test_request_context() as ctx, \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.object(storage, 'execute_with_retry'), \
+         patch.object(storage.StorageEngine, 'save_analytics_rollups'), \
+         patch.object(storage.StorageEngine, 'index_logged_meals') as index:
+        ctx.request.household_id = 'h1'
+        storage.StorageEngine.update_meal_plan('2026-10-12', history_data=history)
+
+    week_history = index.call_args.args[0]['2026-10-12']
+    assert storage._logged_meal_names(week_history) == ['Grandma Dal']
+
+
+def test_ensure_index_is_not_reprobed_without_service_role():
+    client = MagicMock()
+    results = [
+        MagicMock(data=[{'week_of': '2026-10-05'}, {'week_of': '2026-10-12'}]),
+        MagicMock(data=[{'week_of': '2026-10-05'}]),
+    ]
+    with patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', False), \
+         patch.object(storage, '_pending_index_checked', set()), \
+         patch.object(storage, 'execute_with_retry', side_effect=results) as execute, \
+         patch.object(storage.StorageEngine, 'rebuild_pending_index') as rebuild:
+        storage.StorageEngine._ensure_pending_index('h1')
+        storage.StorageEngine._ensure_pending_index('h1')
+
+    assert not rebuild.called
+    assert execute.call_count == 2
+
+
+def test_delete_recipe_only_touches_weeks_that_logged_it():
+    from api.utils.fake_supabase import FakeSupabaseClient
+    client = FakeSupabaseClient({
+        'recipes': [{'household_id': 'h1', 'id': 'street_tacos', 'name': 'Street Tacos', 'metadata': {}}],
+        'meal_plans': [
+            {'household_id': 'h1', 'week_of': '2026-10-05', 'history_data': _week('Street Tacos', 'Grandma Dal')},
+            {'household_id': 'h1', 'week_of': '2026-10-12', 'history_data': _week('Kale Soup')},
+        ],
+        'meal_log_index': [
+            {'household_id': 'h1', 'week_of': '2026-10-05', 'unmatched': ['Grandma Dal']},
+            {'household_id': 'h1', 'week_of': '2026-10-12', 'unmatched': ['Kale Soup']},
+        ],
+        'households': [{'id': 'h1', 'config': {}}],
+    })
+    with app.test_request_context() as ctx, \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True):
+        ctx.request.household_id = 'h1'
+        storage.StorageEngine.delete_recipe('street_tacos')
+        storage.bump_catalog_version('h1')  # don't leak the fake catalog into other tests
+
+    index = {r['week_of']: r['unmatched'] for r in client.store.tables['meal_log_index']}
+    assert index == {'2026-10-05': ['Grandma Dal', 'Street Tacos'], '2026-10-12': ['Kale Soup']}
+    assert client.stats()['by_table']['POST meal_log_index'] == 1
@@ -102,36 +102,26 @@ effort_level: normal
         # Should have at least 4 tasks
         self.assertGreaterEqual(len(tasks), 4)
         
-    def test_td_008_pending_recipes_caching(self):
-        """Test TD-008: Pending recipes cache with SWR semantics."""
+    def test_td_008_pending_recipes_matching(self):
+        """Test TD-008: Pending recipes come from logged meal names with no recipe match."""
         from api.utils import storage
 
-        # Clear any existing cache
-        storage._pending_recipes_cache.invalidate()
-
-        # Verify cache starts empty
-        stats = storage._pending_recipes_cache.get_stats()
-        self.assertEqual(stats['entries'], 0)
-
-        # Manually add a cache entry for testing
-        test_household = "test-household-123"
-        storage._pending_recipes_cache.set(test_household, ["Test Recipe"])
-
-        # Verify cache has entry
-        stats = storage._pending_recipes_cache.get_stats()
-        self.assertEqual(stats['entries'], 1)
-        self.assertIn(test_household, stats['keys'])
-
-        # Verify invalidate clears specific entry
-        storage.invalidate_pending_recipes_cache(test_household)
-        stats = storage._pending_recipes_cache.get_stats()
-        self.assertNotIn(test_household, stats['keys'])
+        week = {
+            'dinners': [
+                {'day': 'mon', 'actual_meal': 'Grandma Dal '},
+                {'day': 'tue', 'actual_meal': 'Takeout'},
+                {'day': 'wed', 'actual_meal': 'Tacos'},
+            ],
+            'daily_feedback': {
+                'mon': {'kids_lunch_made': 'Pasta Salad', 'home_snack_made': 'Grandma Dal'},
+            }
+        }
+        names = storage._logged_meal_names(week)
+        self.assertEqual(names, ['Grandma Dal', 'Tacos', 'Pasta Salad'])
 
-        # Add another entry and test global invalidation
-        storage._pending_recipes_cache.set("another-household", ["Another Recipe"])
-        storage.invalidate_pending_recipes_cache()  # Clear all
-        stats = storage._pending_recipes_cache.get_stats()
-        self.assertEqual(stats['entries'], 0)
+        catalog = [{'id': 'tacos', 'name': 'Street Tacos'}, {'id': 'x', 'name': 'Pasta Salad'}]
+        self.assertEqual(storage._unmatched_meal_names(names, catalog, []), ['Grandma Dal'])
+        self.assertEqual(storage._unmatched_meal_names(names, catalog, ['grandma dal']), [])
 
     def test_swr_cache_fresh_status(self):
         """Test SWR cache returns 'fresh' status for recent entries."""
@@ -0,0 +1,190 @@
+"""
+Tests for speculative pre-generation of the upcoming week.
+"""
+import shutil
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from api.index import app
+from api.services.draft_cache import DraftCache
+from api.services import pregeneration
+from api.services.pregeneration import JobQueue
+from api.utils import CACHE, storage
+from api.utils.fake_supabase import FakeSupabaseClient
+from scripts.workflow import generate_meal_plan
+from scripts.workflow.actions import create_new_week
+
+H1 = '00000000-0000-0000-0000-000000000001'
+LAST_WEEK = '2026-10-12'
+WEEK = '2026-10-19'
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+RECIPES = [
+    {'id': 'curry', 'name': 'Curry', 'meal_type': 'soup_stew', 'effort_level': 'normal', 'main_veg': ['spinach']},
+    {'id': 'tacos', 'name': 'Tacos', 'meal_type': 'tacos_wraps', 'effort_level': 'low', 'no_chop_compatible': True, 'main_veg': []},
+    {'id': 'pizza', 'name': 'Pizza', 'meal_type': 'pizza', 'effort_level': 'low', 'no_chop_compatible': True, 'main_veg': []},
+    {'id': 'salad', 'name': 'Salad', 'meal_type': 'salad', 'effort_level': 'low', 'main_veg': ['cucumber']},
+    {'id': 'bowl', 'name': 'Bowl', 'meal_type': 'grain_bowl', 'effort_level': 'high', 'main_veg': ['carrots']},
+    {'id': 'ramen', 'name': 'Ramen', 'meal_type': 'pasta_noodles', 'effort_level': 'normal', 'main_veg': []},
+    {'id': 'stir_fry', 'name': 'Stir Fry', 'meal_type': 'stir_fry', 'effort_level': 'normal', 'main_veg': ['broccoli']},
+]
+
+
+def test_job_queue_runs_in_household_context_and_dedups():
+    job_app = Flask(__name__)
+    jobs = JobQueue()
+    release = threading.Event()
+    seen = []
+
+    def job(week_of):
+        release.wait(5)
+        seen.append((storage.get_household_id(), week_of))
+
+    assert jobs.submit(job_app, 'h2', WEEK, job)
+    assert not jobs.submit(job_app, 'h2', WEEK, job)  # already queued
+    release.set()
+    jobs.join()
+    assert seen == [('h2', WEEK)]
+    assert jobs.get_stats() == {'pending': 0, 'completed': 1, 'failed': 0}
+
+
+@pytest.fixture
+def planner(tmp_path, monkeypatch):
+    # generate_meal_plan reads data/history.yml and writes its HTML plan
+    # relative to the working directory
+    shutil.copytree(REPO_ROOT / 'templates', tmp_path / 'templates')
+    (tmp_path / 'data').mkdir()
+    (tmp_path / 'data' / 'history.yml').write_text('weeks: []\n')
+    monkeypatch.chdir(tmp_path)
+    client = FakeSupabaseClient({
+        'meal_plans': [{'household_id': H1, 'week_of': LAST_WEEK, 'status': 'active',
+                        'plan_data': {'week_of': LAST_WEEK},
+                        'history_data': {'week_of': LAST_WEEK, 'dinners': [
+                            {'day': 'mon', 'recipe_id': 'curry', 'recipe_ids': ['curry']}]}}],
+        'recipes': [{'household_id': H1, 'id': r['id'], 'name': r['name'],
+                     'metadata': {k: v for k, v in r.items() if k not in ('id', 'name')}} for r in RECIPES],
+        'inventory_items': [],
+        'households': [{'id': H1, 'config': {'schedule': {'busy_days': ['thu']},
+                                             'meals_covered': {'dinner': True}}}],
+    })
+    monkeypatch.delitem(CACHE, 'config', raising=False)
+    jobs = JobQueue()
+    monkeypatch.setattr('api.services.pregeneration.job_queue', jobs)
+    monkeypatch.setattr('api.routes.meals.draft_cache', DraftCache())
+    with patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.object(storage.StorageEngine, 'save_analytics_rollups'), \
+         patch.object(storage.StorageEngine, 'index_logged_meals'):
+        yield app.test_client(), jobs, client
+    storage.bump_catalog_version(H1)  # don't leak the fake catalog into other tests
+
+
+def test_review_submit_pregenerates_create_week_and_draft(planner):
+    http, jobs, client = planner
+    before = pregeneration.get_stats()
+    with patch('api.services.pregeneration.create_new_week', wraps=create_new_week) as create, \
+         patch('api.services.pregeneration.generate_meal_plan', wraps=generate_meal_plan) as generate, \
+         patch('api.routes.meals.create_new_week') as route_create, \
+         patch('api.routes.meals.generate_meal_plan') as route_generate:
+        res = http.post('/api/reviews/submit', json={'week_of': LAST_WEEK, 'reviews': []})
+        assert res.get_json()['status'] == 'success'
+        jobs.join()
+        assert (create.call_count, generate.call_count) == (1, 1)
+        # Stored in the database, so any instance can serve them
+        rows = client.store.tables['provisional_plans']
+        assert sorted(r['kind'] for r in rows) == ['draft', 'proposal']
+        assert not (Path('public') / 'plans' / f'{WEEK}-weekly-plan.html').exists()  # data only
+
+        created = http.post('/api/create-week', json={'week_of': WEEK}).get_json()
+        assert created['pregenerated'] is True
+        draft = http.post('/api/plan/draft', json={
+            'week_of': WEEK, 'selections': [], 'locked_days': [], 'leftovers': [], 'exclude_defaults': []}).get_json()
+        assert draft['cached'] is True
+        assert len(draft['history_data']['dinners']) == 5
+        route_create.assert_not_called()  # nothing regenerated
+        route_generate.assert_not_called()
+    assert client.store.tables['provisional_plans'] == []  # served once
+    stats = pregeneration.get_stats()
+    assert stats['proposal']['hits'] == before['proposal']['hits'] + 1
+    assert stats['draft']['hits'] == before['draft']['hits'] + 1
+
+
+class _Saturday(date):
+    @classmethod
+    def today(cls):
+        return cls(2026, 10, 17)
+
+
+def test_pregenerated_on_an_earlier_day_and_another_instance_is_served(planner):
+    http, jobs, _ = planner
+    with patch('api.services.draft_cache.date', _Saturday):  # e.g. the weekend cron
+        http.post('/api/reviews/submit', json={'week_of': LAST_WEEK, 'reviews': []})
+        jobs.join()
+    storage.bump_catalog_version(H1)  # served as if by another instance, whose local counter differs
+
+    assert http.post('/api/create-week', json={'week_of': WEEK}).get_json()['pregenerated'] is True
+    with patch('api.routes.meals.generate_meal_plan') as route_generate:
+        draft = http.post('/api/plan/draft', json={
+            'week_of': WEEK, 'selections': [], 'locked_days': [], 'leftovers': [], 'exclude_defaults': []}).get_json()
+    assert draft['cached'] is True
+    route_generate.assert_not_called()
+
+
+def test_changed_inputs_are_not_served(planner):
+    http, jobs, client = planner
+    http.post('/api/reviews/submit', json={'week_of': LAST_WEEK, 'reviews': []})
+    jobs.join()
+    # A recipe was added meanwhile
+    client.store.tables['recipes'].append({'household_id': H1, 'id': 'soup', 'name': 'Soup', 'metadata': {}})
+    storage.bump_catalog_version(H1)
+
+    with patch('api.routes.meals.create_new_week', wraps=create_new_week) as create:
+        created = http.post('/api/create-week', json={'week_of': WEEK}).get_json()
+    assert created['pregenerated'] is False
+    create.assert_called_once()
+    draft = http.post('/api/plan/draft', json={'week_of': WEEK, 'locked_days': [], 'exclude_defaults': []}).get_json()
+    assert draft['status'] == 'success'
+    assert 'cached' not in draft
+
+
+def test_cron_works_through_households_within_its_budget():
+    today = datetime.now().date()
+    this_week = (today - timedelta(days=today.weekday())).isoformat()
+    next_week = (today - timedelta(days=today.weekday()) + timedelta(days=7)).isoformat()
+    client = FakeSupabaseClient({
+        'meal_plans': [{'household_id': h, 'week_of': this_week} for h in ('h1', 'h2', 'h3', 'h4')]
+                      + [{'household_id': 'h4', 'week_of': next_week}],  # already created
+        'provisional_plans': [{'household_id': 'h0', 'week_of': '2020-01-06', 'kind': 'proposal'}],
+    })
+    seen = []
+    clock = [0.0]
+
+    def job(week_of):
+        clock[0] += 5  # each household takes 5 of the 8 seconds
+        seen.append((storage.get_household_id(), week_of))
+        storage.StorageEngine.save_provisional_plan(week_of, 'proposal', 'k', {})
+
+    http = app.test_client()
+    with patch.dict('os.environ', {'CRON_SECRET': 's3cret'}), \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.object(pregeneration, 'PREGENERATE_CRON_BUDGET', 8), \
+         patch.object(pregeneration, 'time', SimpleNamespace(monotonic=lambda: clock[0])), \
+         patch.object(pregeneration, 'pregenerate_week', job):
+        assert http.get('/api/cron/pregenerate-next-week').status_code == 401
+        auth = {'Authorization': 'Bearer s3cret'}
+        first = http.get('/api/cron/pregenerate-next-week', headers=auth).get_json()
+        second = http.get('/api/cron/pregenerate-next-week', headers=auth).get_json()
+        third = http.get('/api/cron/pregenerate-next-week', headers=auth).get_json()
+    assert (first['households'], first['remaining']) == (2, 1)
+    assert (second['households'], second['remaining']) == (1, 0)
+    assert third['households'] == 0
+    assert sorted(seen) == [('h1', next_week), ('h2', next_week), ('h3', next_week)]
+    # Rows for past weeks are dropped
+    assert {r['week_of'] for r in client.store.tables['provisional_plans']} == {next_week}
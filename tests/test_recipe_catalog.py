@@ -0,0 +1,122 @@
+"""
+Tests for the process-wide recipe catalog cache and version invalidation.
+"""
+import time
+from unittest.mock import patch, MagicMock
+
+from flask import Flask
+
+from api.utils import storage
+
+app = Flask(__name__)
+
+ROWS = [
+    {'id': 'dal', 'name': 'Dal', 'metadata': {'cuisine': 'indian', 'main_veg': ['spinach']}},
+    {'id': 'tacos', 'name': 'Tacos', 'metadata': {'meal_type': 'tacos_wraps'}},
+]
+
+
+def _mock_supabase(shared_version=None):
+    """Client whose recipes queries return ROWS; households reports `shared_version`."""
+    builder = MagicMock()
+    builder.select.return_value = builder
+    builder.eq.return_value = builder
+    builder.upsert.return_value = builder
+    builder.execute.return_value.data = ROWS
+    households = MagicMock()
+    households.select.return_value = households
+    households.eq.return_value = households
+    households.execute.side_effect = lambda: MagicMock(data=[{'catalog_version': shared_version[0]}]
+                                                         if shared_version else [])
+    client = MagicMock()
+    client.table.side_effect = lambda name: households if name == 'households' else builder
+    return client, builder
+
+
+def _request(h_id='catalog-test'):
+    ctx = app.test_request_context()
+    ctx.request.household_id = h_id
+    return ctx
+
+
+@patch('api.utils.storage.IS_SERVICE_ROLE', True)
+def test_catalog_is_loaded_once_until_a_recipe_write():
+    client, builder = _mock_supabase()
+    with patch('api.utils.storage.supabase', client), _request('h-write'):
+        storage.StorageEngine.get_recipes()
+        storage.StorageEngine.get_recipe_catalog()
+        assert builder.execute.call_count == 1
+
+        version = storage.get_catalog_version()
+        storage.StorageEngine.save_recipe('dal', 'Dal', {}, '# Dal')
+        assert storage.get_catalog_version() != version
+
+        storage.StorageEngine.get_recipes()
+        # one upsert + pending-index prune (index read, catalog reload; its
+        # config read goes to households); the reload is shared with get_recipes
+        assert builder.execute.call_count == 3
+
+
+def test_catalog_is_per_household():
+    client, builder = _mock_supabase()
+    with patch('api.utils.storage.supabase', client):
+        with _request('h-a'):
+            storage.StorageEngine.get_recipes()
+        with _request('h-b'):
+            storage.StorageEngine.get_recipes()
+    assert builder.execute.call_count == 2
+
+
+def test_catalog_returns_flattened_copies():
+    client, _ = _mock_supabase()
+    with patch('api.utils.storage.supabase', client), _request('h-copy'):
+        catalog = storage.StorageEngine.get_recipe_catalog()
+        assert catalog[0] == {'id': 'dal', 'name': 'Dal', 'cuisine': 'indian', 'main_veg': ['spinach']}
+        catalog[0]['name'] = 'Changed'
+        assert storage.StorageEngine.get_recipe_catalog()[0]['name'] == 'Dal'
+
+
+def test_write_on_another_instance_is_seen_through_shared_version():
+    shared = [7]
+    client, builder = _mock_supabase(shared)
+    with patch('api.utils.storage.supabase', client):
+        with _request('h-shared'):
+            storage.StorageEngine.get_recipes()
+        with _request('h-shared'):
+            storage.StorageEngine.get_recipes()
+        assert builder.execute.call_count == 1  # version unchanged: cached
+
+        shared[0] = 8  # the recipes trigger ran for a write elsewhere
+        with _request('h-shared'):
+            storage.StorageEngine.get_recipes()
+    assert builder.execute.call_count == 2
+
+
+def test_unversioned_catalog_expires_quickly():
+    client, builder = _mock_supabase()
+    with patch('api.utils.storage.supabase', client), _request('h-ttl'):
+        storage.StorageEngine.get_recipes()
+        storage.StorageEngine.get_recipes()
+        assert builder.execute.call_count == 1
+        with patch('api.utils.storage.time.time', return_value=time.time() + storage.CATALOG_UNVERSIONED_TTL + 1):
+            storage.StorageEngine.get_recipes()
+    assert builder.execute.call_count == 2
+
+
+def test_fingerprint_is_the_shared_version_on_every_instance():
+    client, _ = _mock_supabase([7])
+    with patch('api.utils.storage.supabase', client), _request('h-fp'):
+        fingerprint = storage.get_catalog_fingerprint()
+        storage.bump_catalog_version()  # this instance's counter only
+        assert storage.get_catalog_fingerprint() == fingerprint == 7
+
+
+def test_unversioned_fingerprint_follows_the_catalog_content():
+    client, builder = _mock_supabase()
+    with patch('api.utils.storage.supabase', client), _request('h-fp-content'):
+        fingerprint = storage.get_catalog_fingerprint()
+        storage.bump_catalog_version()
+        assert storage.get_catalog_fingerprint() == fingerprint  # reloaded, same rows
+        storage.bump_catalog_version()
+        builder.execute.return_value.data = ROWS + [{'id': 'soup', 'name': 'Soup', 'metadata': {}}]
+        assert storage.get_catalog_fingerprint() != fingerprint
@@ -0,0 +1,64 @@
+"""
+Tests for RecipeIndex and the selectors that consume it.
+"""
+import yaml
+
+from scripts.recipe_index import RecipeIndex
+from scripts.snack_selector import SnackSelector
+from scripts.lunch_selector import LunchSelector
+from scripts.workflow.selection import select_dinners, score_recipe_by_inventory
+
+RECIPES = [
+    {'id': 'tacos', 'name': 'Tacos', 'meal_type': 'tacos_wraps', 'effort_level': 'normal', 'main_veg': ['Bell Peppers', 'onion']},
+    {'id': 'soup', 'name': 'Soup', 'meal_type': 'soup_stew', 'effort_level': 'low', 'no_chop_compatible': True, 'main_veg': ['carrots']},
+    {'id': 'hummus', 'name': 'Hummus', 'meal_type': 'sauce_dip', 'main_veg': []},
+    {'id': 'toast', 'name': 'Toast', 'meal_type': 'breakfast', 'snack_suitable': True, 'lunch_suitable': True},
+    {'id': 'tacos', 'name': 'Duplicate Tacos', 'meal_type': 'tacos_wraps'},
+]
+
+
+def test_lookups_and_buckets():
+    index = RecipeIndex(RECIPES)
+    assert index.get('tacos')['name'] == 'Tacos'  # first occurrence wins
+    assert index.get('missing') is None
+    assert index.by_meal_type['soup_stew'] == ['soup']
+    assert index.by_effort_level['normal'] == ['tacos']
+    assert index.by_flag['no_chop_compatible'] == ['soup']
+    assert index.ids_with_main_veg('pepper') == ['tacos']
+    assert index.normalized_main_veg('tacos') == ['pepper', 'onion']
+
+
+def test_select_preserves_catalog_order():
+    index = RecipeIndex(RECIPES)
+    picked = index.select(meal_types={'sauce_dip', 'tacos_wraps'}, flags=['snack_suitable'])
+    assert [r['id'] for r in picked] == ['tacos', 'hummus', 'toast']
+
+
+def test_selectors_accept_index():
+    index = RecipeIndex(RECIPES)
+    assert [r['id'] for r in SnackSelector(index).snack_recipes] == ['hummus', 'toast']
+    lunch = LunchSelector(recipes=index, config_path='missing.yml')
+    assert [r['id'] for r in lunch.lunch_recipes] == ['tacos', 'soup', 'toast']
+    assert lunch._find_recipe_by_id('soup')['name'] == 'Soup'
+
+
+def test_scoring_matches_list_lookup():
+    inventory = {'fridge_items': {'pepper'}, 'pantry_items': {'onion'}, 'freshness': {'pepper': 6}}
+    by_list = score_recipe_by_inventory('tacos', {}, inventory, RECIPES)
+    by_index = score_recipe_by_inventory('tacos', {}, inventory, RecipeIndex(RECIPES))
+    assert by_list == by_index
+    assert by_index[0] == 35.0
+
+
+def test_select_dinners_same_result_with_index():
+    with open('recipes/index.yml') as f:
+        recipes = yaml.safe_load(f)
+    inputs = {
+        'schedule': {'busy_days': ['tue', 'thu']},
+        'rollover': [{'recipe_id': recipes[10]['id']}],
+    }
+    history = {'dinners': [{'day': 'mon', 'recipe_ids': [recipes[0]['id'], recipes[1]['id']]}]}
+    filtered = [r for r in recipes if r.get('meal_type') not in (None, 'unknown')]
+    from_list = select_dinners(list(filtered), inputs, history, recipes)
+    from_index = select_dinners(list(filtered), inputs, history, RecipeIndex(recipes))
+    assert from_list == from_index
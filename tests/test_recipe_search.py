@@ -0,0 +1,72 @@
+"""
+Tests for the ranked recipe search index.
+"""
+from collections import OrderedDict
+from unittest.mock import patch
+
+from scripts.recipe_search import RecipeSearchIndex, sync_search_index
+
+RECIPES = [
+    {'id': 'chana_masala', 'name': 'Chana Masala', 'cuisine': 'indian', 'tags': ['batch'], 'main_veg': ['tomato']},
+    {'id': 'tomato_soup', 'name': 'Tomato Soup', 'cuisine': 'american', 'tags': ['quick'], 'main_veg': ['tomato']},
+    {'id': 'palak_paneer', 'name': 'Palak Paneer', 'cuisine': 'indian', 'tags': [], 'main_veg': ['spinach']},
+    {'id': 'black_bean_tacos', 'name': 'Black Bean Tacos', 'cuisine': 'mexican', 'tags': ['quick'], 'main_veg': []},
+]
+
+
+def _ids(results):
+    return [r['id'] for r in results]
+
+
+def test_name_matches_rank_above_other_fields():
+    index = RecipeSearchIndex(RECIPES)
+    # 'tomato' is in Tomato Soup's name but only main_veg for Chana Masala
+    assert _ids(index.search('tomato')) == ['tomato_soup', 'chana_masala']
+    assert _ids(index.search('indian')) == ['chana_masala', 'palak_paneer']
+
+
+def test_prefix_and_typo_tolerance():
+    index = RecipeSearchIndex(RECIPES)
+    assert _ids(index.search('pan')) == ['palak_paneer']
+    assert _ids(index.search('masla')) == ['chana_masala']
+    assert _ids(index.search('blak bean')) == ['black_bean_tacos']
+    assert index.search('zzz') == []
+
+
+def test_recipes_matching_more_words_come_first():
+    index = RecipeSearchIndex(RECIPES)
+    assert _ids(index.search('quick tomato'))[:2] == ['tomato_soup', 'chana_masala']
+
+
+def test_sync_reindexes_only_changed_recipes():
+    index = RecipeSearchIndex(RECIPES)
+    renamed = [dict(RECIPES[0], name='Chickpea Curry')] + RECIPES[1:3]
+    assert index.sync(renamed) == 2  # one renamed, one removed
+    assert _ids(index.search('chickpea')) == ['chana_masala']
+    assert index.search('masala') == []
+    assert index.search('tacos') == []
+    assert index.sync(renamed) == 0
+
+
+def test_sync_search_index_reuses_household_index():
+    first = sync_search_index('test-household', RECIPES)
+    assert sync_search_index('test-household', RECIPES[:1]) is first
+    assert _ids(first.search('soup')) == []
+
+
+def test_search_indexes_are_bounded():
+    from scripts import recipe_search
+    with patch.object(recipe_search, '_search_indexes', OrderedDict()) as indexes, \
+         patch.object(recipe_search, 'SEARCH_INDEX_CACHE_SIZE', 2):
+        first = sync_search_index('h1', RECIPES)
+        sync_search_index('h2', RECIPES)
+        assert sync_search_index('h1', RECIPES) is first
+        sync_search_index('h3', RECIPES)
+        assert list(indexes) == ['h1', 'h3']
+
+
+def test_inner_word_fragment_falls_back_to_substring():
+    index = RecipeSearchIndex(RECIPES)
+    assert _ids(index.search('neer')) == ['palak_paneer']
+    assert _ids(index.search('ck bean')) == ['black_bean_tacos']
+    assert index.search('xyz') == []
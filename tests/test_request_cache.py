@@ -0,0 +1,75 @@
+"""
+Tests for the request-scoped read cache in execute_with_retry.
+"""
+from flask import Flask
+
+from api.utils import storage
+
+
+class FakeQuery:
+    """Minimal stand-in for a PostgREST builder: shape attributes + execute()."""
+
+    def __init__(self, table, method="GET", params="household_id=eq.h1", data=None):
+        self.path = f"/{table}"
+        self.http_method = method
+        self.params = params
+        self.headers = {}
+        self.calls = 0
+        self._data = data if data is not None else [{'id': 1, 'nested': {'x': 1}}]
+
+    def execute(self):
+        self.calls += 1
+        result = type('Res', (), {})()
+        result.data = [dict(row) for row in self._data]
+        return result
+
+
+app = Flask(__name__)
+
+
+def test_repeated_reads_hit_cache():
+    with app.test_request_context():
+        q = FakeQuery("inventory_items")
+        storage.execute_with_retry(q)
+        storage.execute_with_retry(q)
+        assert q.calls == 1
+
+
+def test_cached_result_is_isolated_from_caller_mutation():
+    with app.test_request_context():
+        q = FakeQuery("meal_plans")
+        first = storage.execute_with_retry(q)
+        first.data[0]['nested']['x'] = 99
+        second = storage.execute_with_retry(q)
+        assert second.data[0]['nested']['x'] == 1
+
+
+def test_write_invalidates_only_touched_table():
+    with app.test_request_context():
+        inv = FakeQuery("inventory_items")
+        plans = FakeQuery("meal_plans")
+        storage.execute_with_retry(inv)
+        storage.execute_with_retry(plans)
+
+        storage.execute_with_retry(FakeQuery("inventory_items", method="PATCH"))
+
+        storage.execute_with_retry(inv)
+        storage.execute_with_retry(plans)
+        assert inv.calls == 2
+        assert plans.calls == 1
+
+
+def test_cache_does_not_leak_across_requests():
+    q = FakeQuery("households")
+    with app.test_request_context():
+        storage.execute_with_retry(q)
+    with app.test_request_context():
+        storage.execute_with_retry(q)
+    assert q.calls == 2
+
+
+def test_no_caching_outside_app_context():
+    q = FakeQuery("recipes")
+    storage.execute_with_retry(q)
+    storage.execute_with_retry(q)
+    assert q.calls == 2
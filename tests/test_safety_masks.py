@@ -0,0 +1,78 @@
+"""
+Tests for the avoid-ingredient bitmasks and the selectors that use them.
+"""
+from scripts.recipe_index import RecipeIndex
+from scripts.safety_masks import SafetyMasks
+from scripts.snack_selector import SnackSelector
+from scripts.lunch_selector import LunchSelector
+from scripts.workflow.selection import filter_recipes
+
+RECIPES = [
+    {'id': 'pb_bars', 'name': 'PB Bars', 'meal_type': 'snack_bar', 'avoid_contains': ['peanuts', 'oats']},
+    {'id': 'hummus', 'name': 'Hummus', 'meal_type': 'sauce_dip', 'avoid_contains': ['Sesame']},
+    {'id': 'salad', 'name': 'Salad', 'meal_type': 'salad', 'avoid_contains': []},
+    {'id': 'pasta', 'name': 'Pasta', 'meal_type': 'pasta_noodles', 'avoid_contains': ['eggs']},
+]
+
+KIDS = {
+    'akira': {'avoid_ingredients': ['peanuts']},
+    'bea': {'avoid_ingredients': ['sesame', 'shellfish']},
+}
+
+
+def _legacy_safe(recipe, profiles):
+    contains = set(recipe.get('avoid_contains', []))
+    return all(not set(p.get('avoid_ingredients', [])) & contains for p in profiles.values())
+
+
+def test_masks_match_set_intersection():
+    masks = SafetyMasks(RECIPES)
+    assert masks.bits == {'peanuts': 1, 'oats': 2, 'sesame': 4, 'eggs': 8}
+    assert masks.recipe_masks['pb_bars'] == 3
+    # Terms no recipe contains get no bit
+    assert masks.avoid_mask(['shellfish']) == 0
+    assert masks.avoid_mask(['Peanuts ', 'eggs']) == 9
+
+    combined = masks.combined_mask(KIDS)
+    for recipe in RECIPES:
+        legacy = _legacy_safe(recipe, {'akira': KIDS['akira']})
+        assert masks.is_safe(recipe, masks.avoid_mask(['peanuts'])) == legacy
+    assert [r['id'] for r in RECIPES if masks.is_safe(r, combined)] == ['salad', 'pasta']
+
+
+def test_avoid_masks_are_memoized_by_contents():
+    masks = SafetyMasks(RECIPES)
+    masks.avoid_mask(['eggs', 'peanuts'])
+    masks.avoid_mask(['peanuts', 'eggs'])
+    assert len(masks._avoid_masks) == 1
+
+
+def test_unindexed_recipe_and_conflicts():
+    masks = SafetyMasks(RECIPES)
+    fallback = {'name': 'Fruit', 'id': 'fruit', 'avoid_contains': ['sesame', 'kiwi']}
+    assert not masks.is_safe(fallback, masks.avoid_mask(['sesame']))
+    assert masks.conflicts(RECIPES[0], masks.avoid_mask(['oats', 'peanuts'])) == ['peanuts', 'oats']
+    assert masks.conflicts(RECIPES[2], masks.combined_mask(KIDS)) == []
+
+
+def test_selectors_use_index_masks():
+    index = RecipeIndex(RECIPES)
+    snacks = SnackSelector(index, kid_profiles=KIDS)
+    assert not snacks.is_safe(index.get('pb_bars'))
+    assert not snacks.is_safe(index.get('hummus'))
+
+    lunch = LunchSelector(config_path='/nonexistent.yml', recipes=index)
+    assert lunch._is_safe(index.get('pb_bars'))  # no profiles configured
+    lunch.kid_profiles = KIDS
+    assert not lunch._is_safe(index.get('pb_bars'))
+    assert lunch._is_safe(index.get('pasta'))
+    conflicts = lunch._resolve_profile_conflicts(index.get('hummus'))
+    assert conflicts['akira'] == 'Hummus'
+    assert 'Contains Sesame' in conflicts['bea']
+
+
+def test_filter_recipes_accepts_index_or_list():
+    inputs = {'preferences': {'avoid_ingredients': ['eggs']}}
+    expected = ['salad']
+    assert [r['id'] for r in filter_recipes(RECIPES, inputs, set())] == expected
+    assert [r['id'] for r in filter_recipes(RecipeIndex(RECIPES), inputs, set())] == expected
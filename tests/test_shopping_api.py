@@ -19,8 +19,8 @@ class TestShoppingAPI(unittest.TestCase):
     def tearDown(self):
         self.household_patcher.stop()
 
-    @patch('api.utils.storage.StorageEngine.update_inventory_item')
-    def test_smart_action_add_to_inventory(self, mock_update):
+    @patch('api.utils.storage.StorageEngine.bulk_upsert_inventory')
+    def test_smart_action_add_to_inventory(self, mock_upsert):
         """Test adding an item to inventory via smart-update API."""
         payload = {
             'week_of': '2026-01-26',
@@ -38,10 +38,11 @@ class TestShoppingAPI(unittest.TestCase):
         self.assertEqual(data['status'], 'success')
         
         # Verify call to storage
-        mock_update.assert_called_once()
-        args, kwargs = mock_update.call_args
-        self.assertEqual(args[0], 'pantry')
-        self.assertEqual(args[1], 'Onion')
+        mock_upsert.assert_called_once_with([{
+            'category': 'pantry',
+            'item': 'Onion',
+            'updates': {'quantity': 1, 'unit': 'count'}
+        }])
 
     @patch('api.utils.storage.StorageEngine.update_meal_plan')
     @patch('api.utils.storage.supabase.table')
@@ -0,0 +1,67 @@
+"""
+Tests for the set-based expired-week sweeper.
+"""
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+
+from api.utils import storage
+
+app = Flask(__name__)
+
+
+def _client(rows):
+    client = MagicMock()
+    builder = client.table.return_value.update.return_value.neq.return_value.lte.return_value
+    builder.execute.return_value = MagicMock(data=rows)
+    return client, builder
+
+
+def test_single_update_across_households():
+    rows = [{'household_id': 'h1', 'week_of': '2026-10-05'}, {'household_id': 'h2', 'week_of': '2026-10-05'}]
+    client, _ = _client(rows)
+    with patch.object(storage, 'supabase', client), patch.object(storage, 'IS_SERVICE_ROLE', True):
+        archived = storage.StorageEngine.sweep_expired_weeks(today=date(2026, 10, 18))
+
+    table = client.table.return_value
+    table.update.assert_called_once_with({'status': 'archived'})
+    table.update.return_value.neq.assert_called_once_with('status', 'archived')
+    table.update.return_value.neq.return_value.lte.assert_called_once_with('week_of', '2026-10-11')
+    assert archived == rows
+    assert not table.update.return_value.eq.called  # not household-scoped
+
+
+def test_if_due_only_sweeps_once_per_interval():
+    client, builder = _client([])
+    with app.test_request_context(), \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True), \
+         patch.dict(storage._last_sweep, {'at': 0.0}):
+        storage.StorageEngine.sweep_expired_weeks_if_due()
+        storage.StorageEngine.sweep_expired_weeks_if_due()
+    assert builder.execute.call_count == 1
+
+
+def test_cold_instance_leaves_the_sweep_to_cron():
+    client, builder = _client([])
+    # The last sweep time starts at import, not at the epoch
+    with app.test_request_context(), \
+         patch.object(storage, 'supabase', client), \
+         patch.object(storage, 'IS_SERVICE_ROLE', True):
+        storage.StorageEngine.sweep_expired_weeks_if_due()
+    assert not builder.execute.called
+
+
+def test_cron_endpoint_requires_secret():
+    from api.routes.status import status_bp
+    cron_app = Flask(__name__)
+    cron_app.register_blueprint(status_bp)
+    client = cron_app.test_client()
+    with patch.dict('os.environ', {'CRON_SECRET': 's3cret'}), \
+         patch.object(storage.StorageEngine, 'sweep_expired_weeks', return_value=[]) as sweep:
+        assert client.get('/api/cron/sweep-expired-weeks').status_code == 401
+        res = client.get('/api/cron/sweep-expired-weeks', headers={'Authorization': 'Bearer s3cret'})
+    assert res.status_code == 200
+    assert res.get_json()['archived'] == 0
+    sweep.assert_called_once()
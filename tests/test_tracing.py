@@ -0,0 +1,77 @@
+"""
+Tests for per-request query tracing and the Server-Timing header.
+"""
+from unittest.mock import patch
+
+from flask import Flask, jsonify
+
+from api.utils import storage, tracing
+from api.utils.fake_supabase import FakeSupabaseClient
+from api.utils.fanout import fan_out
+
+
+def _app(client):
+    app = tracing.init_app(Flask(__name__))
+
+    @app.route('/plans')
+    def plans():
+        query = lambda: client.table('meal_plans').select('*').eq('household_id', 'h1').gte('week_of', '2026-10-01')
+        storage.execute_with_retry(query())
+        storage.execute_with_retry(query())  # request cache hit
+        fan_out(lambda: storage.execute_with_retry(client.table('recipes').select('id')),
+                lambda: storage.execute_with_retry(client.table('inventory_items').select('id')))
+        return jsonify(tracing.current_trace())
+
+    return app
+
+
+def _client():
+    return FakeSupabaseClient({'meal_plans': [{'household_id': 'h1', 'week_of': '2026-10-05'}]})
+
+
+def test_summarize_filters_drops_values():
+    params = 'select=%2A&household_id=eq.abc&week_of=gte.2026-10-01&history_data=not.is.null&order=week_of.desc&limit=3'
+    assert tracing.summarize_filters(params) == 'household_id=eq,week_of=gte,history_data=not.is,order,limit'
+
+
+def test_trace_and_server_timing_header():
+    with patch.object(tracing, 'SERVER_TIMING', 'full'), patch.object(tracing, 'SLOW_REQUEST_MS', 10 ** 9):
+        res = _app(_client()).test_client().get('/plans')
+
+    trace = res.get_json()
+    assert [(q['table'], q['cached']) for q in trace[:2]] == [('meal_plans', False), ('meal_plans', True)]
+    # Queries issued from fan-out workers land in the same trace
+    assert sorted(q['table'] for q in trace[2:]) == ['inventory_items', 'recipes']
+    assert trace[0]['filters'] == 'household_id=eq,week_of=gte'
+    assert trace[0]['rows'] == 1 and trace[0]['bytes'] > 0
+
+    header = res.headers['Server-Timing']
+    assert header.startswith('app;dur=')
+    assert 'db;dur=' in header and 'desc="3 queries, 1 cached"' in header
+    assert 'q1;dur=' in header and 'GET meal_plans [household_id=eq,week_of=gte] rows=1' in header
+
+
+def test_summary_mode_and_slow_log(capsys):
+    with patch.object(tracing, 'SERVER_TIMING', 'summary'), \
+         patch.object(tracing, 'SLOW_REQUEST_MS', 0), \
+         patch.object(tracing, 'SLOW_REQUEST_SAMPLE_RATE', 1.0):
+        res = _app(_client()).test_client().get('/plans')
+
+    assert 'q1;' not in res.headers['Server-Timing']
+    out = capsys.readouterr().out
+    assert 'SLOW REQUEST' in out and '"path": "/plans"' in out and '"queries": 3' in out
+
+
+def test_failed_queries_are_recorded():
+    class Broken:
+        http_method, path, params = 'GET', '/recipes', ''
+
+        def execute(self):
+            raise ValueError('boom')
+
+    with Flask(__name__).test_request_context():
+        try:
+            storage.execute_with_retry(Broken())
+        except ValueError:
+            pass
+        assert tracing.current_trace()[0]['error'] == 'boom'